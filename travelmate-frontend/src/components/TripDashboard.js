@@ -19,6 +19,7 @@ import api from '../services/api';
 
 const TripDashboard = () => {
   const [trips, setTrips] = useState([]);
+  const [nextPage, setNextPage] = useState(null);
   const [newTrip, setNewTrip] = useState({
     destination: '',
     travel_start: '',
@@ -41,9 +42,22 @@ const TripDashboard = () => {
     }
   }, [navigate]);
 
+  // The trip list is cursor-paginated: each page links to the next one
   const fetchTrips = () => {
     api.get('/api/trips/')
-      .then(res => setTrips(res.data))
+      .then(res => {
+        setTrips(res.data.results);
+        setNextPage(res.data.next);
+      })
+      .catch(err => console.error('Error fetching trips:', err));
+  };
+
+  const fetchMoreTrips = () => {
+    api.get(nextPage)
+      .then(res => {
+        setTrips(prevTrips => [...prevTrips, ...res.data.results]);
+        setNextPage(res.data.next);
+      })
       .catch(err => console.error('Error fetching trips:', err));
   };
 
@@ -135,6 +149,14 @@ const TripDashboard = () => {
           ))}
         </Grid>
 
+        {nextPage && (
+          <Box sx={{ display: 'flex', justifyContent: 'center', mt: 3 }}>
+            <Button variant="outlined" onClick={fetchMoreTrips}>
+              Load More Trips
+            </Button>
+          </Box>
+        )}
+
         <Fade in={true} timeout={1000}>
           <Paper sx={{ padding: '1.5rem', marginTop: '2rem' }} elevation={3}>
             <Typography variant="h5" gutterBottom>
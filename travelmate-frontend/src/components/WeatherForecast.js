@@ -51,19 +51,16 @@ const WeatherForecast = () => {
   const [showAllDays, setShowAllDays] = useState(false);
 
   useEffect(() => {
-    // Fetch trip details
+    // Fetch the trip, its forecast and clothing recommendations in one request
     const fetchTripDetails = async () => {
       try {
-        const tripResponse = await api.get(`/api/trips/${tripId}/`);
-        setTrip(tripResponse.data);
-        
-        // Fetch weather data
-        const weatherResponse = await api.get(`/api/trips/${tripId}/weather/`);
-        setWeatherData(weatherResponse.data);
-        
-        // Fetch clothing recommendations
-        const recommendationsResponse = await api.get(`/api/trips/${tripId}/clothing-recommendations/`);
-        setRecommendations(recommendationsResponse.data);
+        const { data } = await api.get(`/api/trips/${tripId}/bundle/`);
+        setTrip(data.trip);
+        setWeatherData(data.forecast || null);
+        setRecommendations(data.recommendations || null);
+        if (data.error) {
+          setError(data.error);
+        }
         
         setLoading(false);
       } catch (err) {
@@ -13,4 +13,31 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'travelmate.settings')
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+from trips.services.http_client import close_async_client  # noqa: E402
+
+
+async def application(scope, receive, send):
+    """
+    Django's ASGI application, plus lifespan events: pooled upstream
+    connections (trips.services.http_client) are closed on shutdown
+    """
+    if scope['type'] != 'lifespan':
+        return await django_application(scope, receive, send)
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            await close_async_client()
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+# Keep upcoming trips' forecasts warm from inside this process (for
+# deployments without a shared cache or a separate prefetch_forecasts worker)
+from django.conf import settings  # noqa: E402
+
+if getattr(settings, 'WEATHER_PREFETCH_IN_PROCESS', False):
+    from trips.services.prefetch import start_background_prefetcher
+    start_background_prefetcher()
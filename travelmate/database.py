@@ -0,0 +1,79 @@
+# travelmate/database.py
+#
+# Builds DATABASES['default'] from settings.DATABASE_PROFILE, so the same
+# knobs (persistent connections, lock wait, cache sizes) apply whether the
+# project runs on SQLite or PostgreSQL.
+
+# SQLite settings applied to every new connection. WAL lets readers carry on
+# while a write commits; synchronous=NORMAL is durable across application
+# crashes under WAL (only a power loss can drop the last commits).
+DEFAULT_SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'cache_size': -20000,  # Negative values are KiB: 20 MB of page cache
+    'mmap_size': 128 * 1024 * 1024,
+    'temp_store': 'MEMORY',
+}
+
+
+def sqlite_init_command(pragmas, busy_timeout_ms):
+    """PRAGMA statements for a new SQLite connection, as one init_command"""
+    statements = [f"PRAGMA {name}={value}" for name, value in pragmas.items()]
+    statements.append(f"PRAGMA busy_timeout={int(busy_timeout_ms)}")
+    return ';'.join(statements)
+
+
+def build(profile, base_dir):
+    """
+    Django database settings for a profile
+
+    Args:
+        profile (dict): settings.DATABASE_PROFILE, with keys
+            engine ('sqlite' or 'postgresql'), conn_max_age (seconds to keep
+            connections open, None for unlimited), busy_timeout_ms (how long
+            a query waits on a lock), and name, sqlite_pragmas,
+            postgresql (HOST, PORT, USER, PASSWORD) and statement_timeout_ms
+            where they apply
+        base_dir (Path): Project directory (default SQLite file location)
+
+    Returns:
+        dict: A DATABASES entry
+    """
+    engine = profile.get('engine', 'sqlite')
+    busy_timeout_ms = profile.get('busy_timeout_ms', 5000)
+    database = {
+        'CONN_MAX_AGE': profile.get('conn_max_age', 60),
+        # Persistent connections are checked before reuse, so a restarted
+        # database server doesn't fail the first request of every worker
+        'CONN_HEALTH_CHECKS': True,
+    }
+
+    if engine == 'sqlite':
+        pragmas = {**DEFAULT_SQLITE_PRAGMAS, **profile.get('sqlite_pragmas', {})}
+        database.update({
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': profile.get('name') or base_dir / 'db.sqlite3',
+            'OPTIONS': {
+                'init_command': sqlite_init_command(pragmas, busy_timeout_ms),
+                # Take the write lock when a transaction starts instead of on
+                # its first write: a deferred transaction that reads, then
+                # writes, fails with "database is locked" straight away
+                # (without waiting) if another connection wrote in between
+                'transaction_mode': 'IMMEDIATE',
+                'timeout': busy_timeout_ms / 1000,
+            },
+        })
+    elif engine == 'postgresql':
+        options = [f"-c lock_timeout={int(busy_timeout_ms)}"]
+        if profile.get('statement_timeout_ms'):
+            options.append(f"-c statement_timeout={int(profile['statement_timeout_ms'])}")
+        database.update({
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': profile.get('name') or 'travelmate',
+            'OPTIONS': {'options': ' '.join(options)},
+            **profile.get('postgresql', {}),
+        })
+    else:
+        raise ValueError(f"Unknown database engine {engine!r} (expected 'sqlite' or 'postgresql')")
+
+    return database
@@ -2,6 +2,8 @@
 import os
 from pathlib import Path
 
+from . import database
+
 # Build paths inside the project
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -33,12 +35,14 @@ CSRF_TRUSTED_ORIGINS = [
 ]
 
 MIDDLEWARE = [
+    'trips.middleware.MetricsMiddleware',  # First, so its timings cover the rest of the chain
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'trips.middleware.ProfilingMiddleware',  # After authentication, so staff sessions are known
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -63,14 +67,85 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'travelmate.wsgi.application'
 
-# Database (using SQLite for simplicity)
+# Database: SQLite by default, tuned for concurrent web workers (WAL, busy timeout,
+# immediate write transactions, persistent connections). Set
+# TRAVELMATE_DB_ENGINE=postgresql and the TRAVELMATE_DB_* variables below to
+# run on PostgreSQL with the same knobs. See travelmate/database.py
+DATABASE_PROFILE = {
+    'engine': os.environ.get('TRAVELMATE_DB_ENGINE', 'sqlite'),
+    'name': os.environ.get('TRAVELMATE_DB_NAME'),  # Default: db.sqlite3 / travelmate
+    'conn_max_age': int(os.environ.get('TRAVELMATE_DB_CONN_MAX_AGE', 60)),  # Seconds to reuse a connection
+    'busy_timeout_ms': int(os.environ.get('TRAVELMATE_DB_BUSY_TIMEOUT_MS', 5000)),  # Wait on locks this long
+    'sqlite_pragmas': {},  # Overrides for database.DEFAULT_SQLITE_PRAGMAS
+    'postgresql': {
+        'HOST': os.environ.get('TRAVELMATE_DB_HOST', 'localhost'),
+        'PORT': os.environ.get('TRAVELMATE_DB_PORT', '5432'),
+        'USER': os.environ.get('TRAVELMATE_DB_USER', 'travelmate'),
+        'PASSWORD': os.environ.get('TRAVELMATE_DB_PASSWORD', ''),
+    },
+}
+
 DATABASES = {
+    'default': database.build(DATABASE_PROFILE, BASE_DIR)
+}
+
+# Cache (swap in Redis or Memcached here to share cached forecasts
+# between worker processes)
+CACHES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
     }
 }
 
+# Weather forecast cache
+WEATHER_CACHE_ALIAS = 'default'  # Shared tier; None keeps it in-process only
+WEATHER_CACHE_MAX_ENTRIES = 1024  # Size of the in-process LRU tier
+WEATHER_CACHE_PRECISION = 2  # Decimal places kept when rounding coordinates
+WEATHER_MODEL_RUN_INTERVAL = 3600  # Seconds between Open-Meteo model updates
+# Forecasts are fresh until the next model run (soft TTL). For this many
+# seconds more (hard TTL) they are still served straight away while a
+# background refresh runs, so Open-Meteo brownouts only make data older
+WEATHER_CACHE_STALE_TTL = 6 * 3600
+WEATHER_REVALIDATE_WORKERS = 2  # Threads refreshing stale forecasts in the background
+WEATHER_EXTENSION_CLIMATOLOGY = True  # Blend days beyond the 16-day horizon toward seasonal normals
+
+# Forecast prefetching for upcoming trips (`manage.py prefetch_forecasts --loop`)
+WEATHER_PREFETCH_INTERVAL = 60  # Seconds between scans for missing/expired forecasts
+WEATHER_PREFETCH_RATE = 1.0  # Maximum Open-Meteo requests per second (each covers up to 100 locations)
+WEATHER_PREFETCH_UNIT = 'fahrenheit'  # Unit the views request
+WEATHER_PREFETCH_IN_PROCESS = False  # Run the prefetcher in a thread of each web process instead
+
+# Server-rendered pages
+LOGIN_URL = 'admin:login'
+DASHBOARD_PAGE_SIZE = 20  # Trips per page on /trips/
+WEATHER_FRAGMENT_TTL = 24 * 3600  # Rendered weather fragments (keyed on the forecast, so safe to keep)
+WEATHER_HTTP_MAX_AGE = 300  # Cache-Control max-age for forecast and recommendation responses
+SEARCH_HTTP_MAX_AGE = 24 * 3600  # Cache-Control max-age for city search results (public)
+
+# How long (seconds) an unknown destination stays cached as "not found"
+GEOCODE_NEGATIVE_TTL = 7 * 24 * 3600
+
+# Offline city gazetteer used by city search (built with `manage.py load_gazetteer`)
+GAZETTEER_PATH = BASE_DIR / 'data' / 'gazetteer.tsv.gz'
+
+# Outbound HTTP (Open-Meteo weather and geocoding APIs)
+OUTBOUND_HTTP_POOL_SIZE = 20  # Keep-alive connections per upstream host
+OUTBOUND_HTTP_CONNECT_TIMEOUT = 3.05  # Seconds
+OUTBOUND_HTTP_READ_TIMEOUT = 10.0  # Seconds
+OUTBOUND_HTTP_RETRIES = 2  # Extra attempts on connection errors, timeouts and 429/5xx
+OUTBOUND_HTTP_BACKOFF = 0.2  # Base delay (seconds) for jittered exponential backoff
+OUTBOUND_BREAKER_FAILURE_THRESHOLD = 5  # Consecutive failures before failing fast
+OUTBOUND_BREAKER_RESET_TIMEOUT = 30.0  # Seconds before a trial call is let through
+REQUEST_METRICS = True  # Per-request timings (Server-Timing) and Prometheus metrics at /metrics
+METRICS_SERVER_TIMING = True  # Add the Server-Timing header to responses
+METRICS_TOKEN = os.environ.get('TRAVELMATE_METRICS_TOKEN', '')  # Bearer token for scrapers (staff can always read)
+REQUEST_PROFILING = True  # Profile requests that send X-Profile (staff, or a signed token)
+PROFILING_SAMPLE_INTERVAL = 0.001  # Seconds between stack samples in sampling mode
+PROFILING_TOKEN_MAX_AGE = 3600  # Seconds a token from `manage.py profile_token` stays valid
+PROFILING_KEEP = 200  # Stored request profiles; older ones are deleted
+PROFILING_MIN_FRACTION = 0.001  # Collapsed stacks below this share of a request's time are merged into [pruned]
+PROFILING_MAX_COLLAPSED_BYTES = 256 * 1024  # Cap on the collapsed stacks stored per profile
+
 # REST Framework Settings
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
@@ -79,8 +154,20 @@ REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticated',
     ),
+    # orjson-backed when installed (see trips/jsonlib.py)
+    'DEFAULT_RENDERER_CLASSES': (
+        'trips.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ),
+    'DEFAULT_PARSER_CLASSES': (
+        'trips.renderers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ),
 }
 
+FAST_JSON = True  # Use orjson for API and upstream JSON when it is installed
+
 
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
@@ -2,6 +2,7 @@
 from django.contrib import admin
 from django.urls import path, include
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
+from trips.metrics import metrics_view
 
 
 urlpatterns = [
@@ -10,5 +11,6 @@ urlpatterns = [
     path('api/trips/', include('trips.urls')),  # or separate out API endpoints as needed
     path('token/', TokenObtainPairView.as_view(), name='token_obtain_pair'),
     path('token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
+    path('metrics', metrics_view, name='metrics'),  # Prometheus scrape endpoint
     # other URL configurations...
 ]
@@ -14,3 +14,11 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'travelmate.settings')
 
 application = get_wsgi_application()
+
+# Keep upcoming trips' forecasts warm from inside this process (for
+# deployments without a shared cache or a separate prefetch_forecasts worker)
+from django.conf import settings  # noqa: E402
+
+if getattr(settings, 'WEATHER_PREFETCH_IN_PROCESS', False):
+    from trips.services.prefetch import start_background_prefetcher
+    start_background_prefetcher()
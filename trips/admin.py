@@ -1,6 +1,10 @@
 # trips/admin.py
 from django.contrib import admin
-from .models import Trip, KeyFeature, UserStory, Profile
+from django.http import Http404, HttpResponse
+from django.shortcuts import get_object_or_404
+from django.urls import path, reverse
+from django.utils.html import format_html_join
+from .models import Trip, KeyFeature, UserStory, Profile, GeocodeCacheEntry, RequestProfile
 
 @admin.register(Trip)
 class TripAdmin(admin.ModelAdmin):
@@ -17,3 +21,54 @@ class UserStoryAdmin(admin.ModelAdmin):
 @admin.register(Profile)
 class ProfileAdmin(admin.ModelAdmin):
     list_display = ('user', 'traveler_type')
+
+@admin.register(GeocodeCacheEntry)
+class GeocodeCacheEntryAdmin(admin.ModelAdmin):
+    list_display = ('name', 'latitude', 'longitude', 'hit_count', 'updated_at')
+    search_fields = ('name',)
+
+
+@admin.register(RequestProfile)
+class RequestProfileAdmin(admin.ModelAdmin):
+    list_display = ('created_at', 'method', 'path', 'mode', 'status_code', 'duration_ms', 'user', 'downloads')
+    list_filter = ('mode', 'method')
+    search_fields = ('path', 'view_name')
+    exclude = ('pstats', 'collapsed')
+    readonly_fields = ('created_at', 'user', 'method', 'path', 'view_name', 'mode', 'status_code',
+                       'duration_ms', 'sample_count', 'downloads')
+
+    def get_queryset(self, request):
+        # The list never shows the blobs; downloads load them one at a time
+        return super().get_queryset(request).defer('pstats', 'collapsed')
+
+    def has_add_permission(self, request):
+        return False  # Profiles are only created by ProfilingMiddleware
+
+    def get_urls(self):
+        return [
+            path('<int:pk>/download/<str:kind>/', self.admin_site.admin_view(self.download),
+                 name='trips_requestprofile_download'),
+        ] + super().get_urls()
+
+    @admin.display(description='Download')
+    def downloads(self, obj):
+        links = [('collapsed', 'Collapsed stacks')]
+        if obj.mode == 'deterministic':  # Only cProfile runs have pstats data
+            links.insert(0, ('pstats', 'pstats'))
+        return format_html_join(' | ', '<a href="{}">{}</a>', (
+            (reverse('admin:trips_requestprofile_download', args=(obj.pk, kind)), label) for kind, label in links
+        ))
+
+    def download(self, request, pk, kind):
+        """The stored profile as a .pstats (load with pstats.Stats) or .collapsed file"""
+        profile = get_object_or_404(RequestProfile, pk=pk)
+        if not self.has_view_permission(request, profile):
+            raise Http404
+        if kind == 'pstats' and profile.pstats is not None:
+            response = HttpResponse(bytes(profile.pstats), content_type='application/octet-stream')
+        elif kind == 'collapsed':
+            response = HttpResponse(profile.collapsed, content_type='text/plain; charset=utf-8')
+        else:
+            raise Http404
+        response['Content-Disposition'] = f'attachment; filename="request-{profile.pk}.{kind}"'
+        return response
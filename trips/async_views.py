@@ -0,0 +1,151 @@
+# trips/async_views.py
+#
+# Native async versions of the weather and city search endpoints. Under ASGI
+# these don't hold a worker thread while waiting on Open-Meteo, so a single
+# worker can serve many concurrent forecast requests.
+from asgiref.sync import sync_to_async
+from django.views.decorators.http import require_GET
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+
+from .models import Trip, Profile
+from .renderers import FastJsonResponse
+from .services.geocoding_service import AsyncGeocodingService
+from .services.weather_service import AsyncWeatherService
+from .conditional import (
+    SEARCH_CACHE_CONTROL, WEATHER_CACHE_CONTROL, add_validators, not_modified
+)
+from .views import (
+    recommendations_etag, refresh_recommendations, search_etag, search_limit, search_validators,
+    trip_forecast_data, trip_forecast_days, weather_etag
+)
+
+
+async def authenticate(request):
+    """
+    Authenticate a request with its JWT bearer token, like the DRF views do
+
+    Returns:
+        User: The authenticated user, or None
+    """
+    try:
+        result = await sync_to_async(JWTAuthentication().authenticate)(request)
+    except AuthenticationFailed:
+        return None
+    return result[0] if result else None
+
+
+def unauthorized():
+    return FastJsonResponse(
+        {"detail": "Authentication credentials were not provided or are invalid."},
+        status=401
+    )
+
+
+@require_GET
+async def trip_weather_forecast(request, trip_id):
+    """Get weather forecast for a specific trip"""
+    user = await authenticate(request)
+    if user is None:
+        return unauthorized()
+
+    try:
+        trip = await Trip.objects.aget(pk=trip_id, user=user)
+    except Trip.DoesNotExist:
+        return FastJsonResponse({"error": "Trip not found or unauthorized."}, status=404)
+
+    if not trip.latitude or not trip.longitude:
+        return FastJsonResponse(
+            {"error": "No location coordinates available for this destination."},
+            status=400
+        )
+
+    weather_data = await AsyncWeatherService.get_weather_forecast(
+        latitude=trip.latitude,
+        longitude=trip.longitude,
+        days=trip_forecast_days(trip),
+        temperature_unit="fahrenheit"
+    )
+
+    if not weather_data:
+        return FastJsonResponse({"error": "Unable to fetch weather data at this time."}, status=503)
+
+    etag = weather_etag(trip, weather_data)
+    response = not_modified(request, etag, cache_control=WEATHER_CACHE_CONTROL)
+    if response is not None:
+        return response
+
+    return add_validators(
+        FastJsonResponse(trip_forecast_data(weather_data, trip)), etag, cache_control=WEATHER_CACHE_CONTROL
+    )
+
+
+@require_GET
+async def trip_clothing_recommendations(request, trip_id):
+    """Get clothing recommendations based on weather and traveler type"""
+    user = await authenticate(request)
+    if user is None:
+        return unauthorized()
+
+    try:
+        trip = await Trip.objects.aget(pk=trip_id, user=user)
+    except Trip.DoesNotExist:
+        return FastJsonResponse({"error": "Trip not found or unauthorized."}, status=404)
+
+    if not trip.latitude or not trip.longitude:
+        return FastJsonResponse(
+            {"error": "No location coordinates available for this destination."},
+            status=400
+        )
+
+    # Default to casual traveler if no profile
+    profile = await Profile.objects.filter(user=user).afirst()
+    is_business = profile is not None and profile.traveler_type == 'business'
+
+    weather_data = await AsyncWeatherService.get_weather_forecast(
+        latitude=trip.latitude,
+        longitude=trip.longitude
+    )
+
+    if not weather_data:
+        return FastJsonResponse({"error": "Unable to fetch weather data at this time."}, status=503)
+
+    # Only written when the forecast or traveler type changed
+    changed_fields = refresh_recommendations(trip, weather_data, is_business)
+    if changed_fields:
+        await trip.asave(update_fields=changed_fields)
+
+    etag = recommendations_etag(trip)
+    response = not_modified(request, etag, cache_control=WEATHER_CACHE_CONTROL)
+    if response is not None:
+        return response
+
+    return add_validators(FastJsonResponse({
+        "traveler_type": "business" if is_business else "casual",
+        "recommendations": trip.recommendations
+    }), etag, cache_control=WEATHER_CACHE_CONTROL)
+
+
+@require_GET
+async def search_cities(request):
+    """Search for cities using the Open-Meteo geocoding API"""
+    query = request.GET.get('q', '')
+    if not query or len(query) < 2:
+        return FastJsonResponse(
+            {"error": "Please provide a search query with at least 2 characters."},
+            status=400
+        )
+
+    limit = search_limit(request)
+    etag = search_etag(query, limit)
+    response = not_modified(request, etag, cache_control=SEARCH_CACHE_CONTROL)
+    if response is not None:
+        return response
+
+    cities = await AsyncGeocodingService.search_cities(query, limit)
+
+    return search_validators(FastJsonResponse({
+        "query": query,
+        "count": len(cities),
+        "cities": cities
+    }), etag, cities)
@@ -0,0 +1,18 @@
+"""
+Benchmarks for the trips app, run with `python manage.py benchmark <name>`.
+
+Each module listed in BENCHMARKS provides `add_arguments(parser)` and
+`run(**options)`, which returns a dict of results.
+"""
+
+BENCHMARKS = {
+    'async_views': 'trips.benchmarks.async_views',
+    'forecast_extension': 'trips.benchmarks.forecast_extension',
+    'gazetteer': 'trips.benchmarks.gazetteer',
+    'json_rendering': 'trips.benchmarks.json_rendering',
+    'load_test': 'trips.benchmarks.load_test',
+    'sqlite_locking': 'trips.benchmarks.sqlite_locking',
+    'suite': 'trips.benchmarks.suite',
+    'trip_days': 'trips.benchmarks.trip_days',
+    'trip_listing': 'trips.benchmarks.trip_listing',
+}
@@ -0,0 +1,107 @@
+"""
+Sync vs async throughput of the trip weather endpoint.
+
+The sync view is driven by a fixed pool of worker threads, like a threaded
+WSGI server; the async view is driven by concurrent tasks on one event loop,
+like a single ASGI worker. Every request is for a different destination, so
+each one waits on the (stubbed) upstream for the configured latency.
+"""
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+
+from django.contrib.auth.models import User
+from django.test import AsyncClient, Client
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from trips.models import Trip
+from .stub import OpenMeteoStub
+from .utils import benchmark_database, reset_caches, summarize, use_stub
+
+
+def add_arguments(parser):
+    parser.add_argument('--requests', type=int, default=200, help='Requests per run')
+    parser.add_argument('--threads', type=int, default=8, help='Worker threads for the sync view')
+    parser.add_argument('--concurrency', type=int, default=200, help='Concurrent tasks for the async view')
+    parser.add_argument('--latency', type=float, default=0.2, help='Upstream latency in seconds')
+
+
+def _create_trips(count):
+    user = User.objects.create_user('benchmark', password='benchmark')
+    today = date.today()
+    Trip.objects.bulk_create(
+        Trip(
+            user=user,
+            destination=f"Destination {i}",
+            latitude=round(-60 + (i * 0.37) % 120, 2),
+            longitude=round(-170 + (i * 0.73) % 340, 2),
+            travel_start=today,
+            travel_end=today + timedelta(days=4),
+        )
+        for i in range(count)
+    )
+    token = str(RefreshToken.for_user(user).access_token)
+    return list(Trip.objects.values_list('id', flat=True)), f"Bearer {token}"
+
+
+def _run_sync(trip_ids, auth, threads):
+    local = threading.local()
+
+    def fetch(trip_id):
+        if not hasattr(local, 'client'):
+            local.client = Client()
+        started = time.perf_counter()
+        response = local.client.get(f'/api/trips/{trip_id}/weather/', headers={'Authorization': auth})
+        assert response.status_code == 200, response.status_code
+        return time.perf_counter() - started
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        durations = list(pool.map(fetch, trip_ids))
+    return time.perf_counter() - started, durations
+
+
+async def _run_async(trip_ids, auth, concurrency):
+    client = AsyncClient()
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def fetch(trip_id):
+        async with semaphore:
+            started = time.perf_counter()
+            response = await client.get(f'/api/async/trips/{trip_id}/weather/', headers={'Authorization': auth})
+            assert response.status_code == 200, response.status_code
+            return time.perf_counter() - started
+
+    started = time.perf_counter()
+    durations = await asyncio.gather(*(fetch(trip_id) for trip_id in trip_ids))
+    return time.perf_counter() - started, durations
+
+
+def run(requests=200, threads=8, concurrency=200, latency=0.2, **options):
+    results = {}
+    with benchmark_database(), OpenMeteoStub(latency=latency) as stub, use_stub(stub):
+        trip_ids, auth = _create_trips(requests)
+
+        for name, runner in (
+            ('sync', lambda: _run_sync(trip_ids, auth, threads)),
+            ('async', lambda: asyncio.run(_run_async(trip_ids, auth, concurrency))),
+        ):
+            reset_caches()
+            stub.reset()
+            elapsed, durations = runner()
+            results[name] = {
+                'elapsed_s': round(elapsed, 4),
+                'throughput_rps': round(len(durations) / elapsed, 2),
+                'upstream_calls': stub.request_count(),
+                'latency': summarize(durations),
+            }
+
+    results['config'] = {
+        'requests': requests,
+        'threads': threads,
+        'concurrency': concurrency,
+        'upstream_latency_s': latency,
+    }
+    return results
@@ -0,0 +1,83 @@
+"""
+Comparison of benchmark results against a saved baseline.
+
+`python manage.py benchmark <name> --output base.json` saves a run;
+`--baseline base.json` compares a later run with it, metric by metric, and
+lists the ones that got slower or faster by more than the tolerance.
+"""
+import json
+
+# Summary statistics compared by default (lower is better); min/max are too
+# noisy to gate on
+DEFAULT_METRICS = ('p50_ms', 'p95_ms')
+
+# Changes smaller than this are noise whatever their relative size
+MIN_DELTA_MS = 0.01
+
+
+def load(path):
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save(results, path):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+        f.write('\n')
+
+
+def flatten(results, prefix=''):
+    """
+    Numeric leaves of a nested results dict
+
+    Returns:
+        dict: Dotted path (e.g. 'cases.api.trip_list.p50_ms') -> value
+    """
+    values = {}
+    for key, value in results.items():
+        path = f"{prefix}{key}"
+        if isinstance(value, dict):
+            values.update(flatten(value, f"{path}."))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            values[path] = value
+    return values
+
+
+def compare(results, baseline, metrics=DEFAULT_METRICS, tolerance=0.10, min_delta_ms=MIN_DELTA_MS):
+    """
+    Compare a run with a baseline
+
+    Args:
+        results (dict): Results of the current run
+        baseline (dict): Results of the baseline run
+        metrics (tuple): Names of the statistics to compare (lower is better)
+        tolerance (float): Relative change allowed before a metric counts as
+            a regression or improvement (0.10 = 10%)
+        min_delta_ms (float): Absolute change (ms) below which a metric is
+            unchanged
+
+    Returns:
+        dict: Lists of regressions and improvements (each with the metric,
+            baseline and current values and the relative change), the number
+            of unchanged metrics, and the metrics only present in one run
+    """
+    current = {path: value for path, value in flatten(results).items() if path.rsplit('.', 1)[-1] in metrics}
+    previous = {path: value for path, value in flatten(baseline).items() if path.rsplit('.', 1)[-1] in metrics}
+
+    comparison = {'tolerance': tolerance, 'regressions': [], 'improvements': [], 'unchanged': 0}
+    for path in sorted(current.keys() & previous.keys()):
+        before, after = previous[path], current[path]
+        change = (after - before) / before if before else 0.0
+        entry = {'metric': path, 'baseline': before, 'current': after, 'change': round(change, 4)}
+        if abs(after - before) < min_delta_ms or abs(change) <= tolerance:
+            comparison['unchanged'] += 1
+        elif change > 0:
+            comparison['regressions'].append(entry)
+        else:
+            comparison['improvements'].append(entry)
+
+    comparison['regressions'].sort(key=lambda entry: -entry['change'])
+    comparison['improvements'].sort(key=lambda entry: entry['change'])
+    comparison['only_in_baseline'] = sorted(previous.keys() - current.keys())
+    comparison['only_in_results'] = sorted(current.keys() - previous.keys())
+    return comparison
@@ -0,0 +1,37 @@
+"""
+Forecast extension beyond the 16-day API horizon.
+
+Times WeatherService.extend_forecast on a synthetic 16-day Open-Meteo response
+extended to each requested length, and checks that extending the same forecast
+twice gives identical results.
+"""
+import time
+
+from trips.benchmarks.stub import forecast_payload
+from trips.services.forecast import Forecast
+from trips.services.weather_service import WeatherService
+from .utils import summarize
+
+
+def add_arguments(parser):
+    parser.add_argument('--days', type=int, nargs='+', default=[30, 90, 180, 365],
+                        help='Total forecast lengths to extend to')
+    parser.add_argument('--repeat', type=int, default=500, help='Timed extensions per length')
+
+
+def run(days=(30, 90, 180, 365), repeat=500, **options):
+    base = Forecast.from_api(forecast_payload(40.71, -74.01, 16))
+    results = {}
+    for total_days in days:
+        durations = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            data = WeatherService.extend_forecast(base, total_days)
+            durations.append(time.perf_counter() - started)
+
+        again = WeatherService.extend_forecast(base, total_days)
+        results[str(total_days)] = {
+            'deterministic': again == data,
+            'extend': summarize(durations),
+        }
+    return results
@@ -0,0 +1,80 @@
+"""
+Offline gazetteer prefix lookups over a synthetic set of places.
+
+Builds a Gazetteer from generated place names (with accented variants and a
+long-tailed population distribution) and times search() for random name
+prefixes of 2-8 characters, including prefixes with no match.
+"""
+import random
+import time
+
+from trips.services.gazetteer import Gazetteer
+from .utils import summarize
+
+SYLLABLES = [
+    'san', 'ta', 'mar', 'ber', 'lin', 'par', 'is', 'lon', 'don', 'ro', 'ma', 'to', 'ky', 'o',
+    'new', 'york', 'ca', 'ir', 'del', 'hi', 'sao', 'pau', 'lo', 'mos', 'cow', 'ist', 'an', 'bul',
+    'ko', 'ln', 'mun', 'chen', 'zu', 'rich', 'ge', 'ne', 'va', 'li', 'ma', 'bo', 'go', 'ta',
+]
+ACCENTED = {'a': 'á', 'e': 'é', 'o': 'ö', 'u': 'ü', 'n': 'ñ', 'c': 'ç'}
+
+
+def synthetic_places(count, seed=0):
+    """Generate (name, ascii_name, admin1, country, lat, lon, population) rows"""
+    rng = random.Random(seed)
+    rows = []
+    for _ in range(count):
+        ascii_name = ''.join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))).title()
+        if rng.random() < 0.2:
+            name = ''.join(ACCENTED.get(char, char) if rng.random() < 0.3 else char for char in ascii_name)
+        else:
+            name = ascii_name
+        rows.append((
+            name,
+            ascii_name,
+            f"Region {rng.randint(1, 50)}",
+            f"Country {rng.randint(1, 200)}",
+            round(rng.uniform(-90, 90), 4),
+            round(rng.uniform(-180, 180), 4),
+            int(rng.paretovariate(1.2) * 500),
+        ))
+    return rows
+
+
+def add_arguments(parser):
+    parser.add_argument('--places', type=int, default=150000, help='Number of synthetic places')
+    parser.add_argument('--lookups', type=int, default=20000, help='Number of timed searches')
+    parser.add_argument('--limit', type=int, default=10, help='Results per search')
+
+
+def run(places=150000, lookups=20000, limit=10, **options):
+    rows = synthetic_places(places)
+
+    started = time.perf_counter()
+    gazetteer = Gazetteer(rows)
+    build_s = time.perf_counter() - started
+
+    rng = random.Random(1)
+    queries = []
+    for _ in range(lookups):
+        name = rng.choice(rows)[0]
+        query = name[:rng.randint(2, 8)]
+        if rng.random() < 0.05:
+            query = 'zq' + query  # No place starts with this
+        queries.append(query)
+
+    durations = []
+    misses = 0
+    for query in queries:
+        started = time.perf_counter()
+        results = gazetteer.search(query, limit)
+        durations.append(time.perf_counter() - started)
+        misses += not results
+
+    return {
+        'places': len(gazetteer),
+        'precomputed_prefixes': len(gazetteer._top),
+        'build_s': round(build_s, 3),
+        'misses': misses,
+        'lookup': summarize(durations),
+    }
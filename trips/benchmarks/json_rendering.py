@@ -0,0 +1,59 @@
+"""
+JSON encoding and decoding of forecast payloads.
+
+Renders the trip weather response (a 16-day forecast extended to each
+requested length, with trip days marked) through DRF's stock JSONRenderer and
+through FastJSONRenderer, and decodes the raw upstream payload with the
+standard library and with trips.jsonlib. Both renderers must produce the same
+document.
+"""
+import json
+import time
+from datetime import date, timedelta
+from types import SimpleNamespace
+
+from rest_framework.renderers import JSONRenderer
+
+from trips import jsonlib
+from trips.benchmarks.stub import forecast_payload
+from trips.renderers import FastJSONRenderer
+from trips.services.forecast import Forecast
+from trips.services.weather_service import WeatherService
+from trips.views import trip_forecast_data
+from .utils import summarize
+
+
+def add_arguments(parser):
+    parser.add_argument('--days', type=int, nargs='+', default=[16, 365],
+                        help='Forecast lengths to render')
+    parser.add_argument('--repeat', type=int, default=1000, help='Timed renders per length and backend')
+
+
+def timed(func, arg, repeat):
+    durations = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func(arg)
+        durations.append(time.perf_counter() - started)
+    return summarize(durations)
+
+
+def run(days=(16, 365), repeat=1000, **options):
+    base = Forecast.from_api(forecast_payload(40.71, -74.01, 16))
+    trip = SimpleNamespace(travel_start=date.today() + timedelta(days=3), travel_end=date.today() + timedelta(days=10))
+    stock, fast = JSONRenderer(), FastJSONRenderer()
+
+    results = {'backend': jsonlib.BACKEND}
+    for total_days in days:
+        data = trip_forecast_data(WeatherService.extend_forecast(base, total_days), trip)
+        encoded = stock.render(data)
+
+        results[str(total_days)] = {
+            'bytes': len(encoded),
+            'identical': json.loads(fast.render(data)) == json.loads(encoded),
+            'render_stdlib': timed(stock.render, data, repeat),
+            'render_fast': timed(fast.render, data, repeat),
+            'parse_stdlib': timed(json.loads, encoded, repeat),
+            'parse_fast': timed(jsonlib.loads, encoded, repeat),
+        }
+    return results
@@ -0,0 +1,313 @@
+"""
+Multi-user load test of the API under a realistic traffic mix, with SLOs.
+
+Seeds a throwaway database with users (casual and business Profiles) and a
+skewed trip distribution, then serves the project from a threaded WSGI
+server on localhost with Open-Meteo stubbed. Virtual users log in through
+/token/ and then run a weighted mix of scenarios at the configured
+concurrency: dashboard loads, weather page loads, city autocomplete bursts
+and trip writes. Reports throughput and p50/p95/p99 per endpoint, each
+checked against its SLOs.
+
+Client and server share one process (and its GIL), so absolute numbers are
+pessimistic; compare runs with --baseline rather than reading them as
+production latencies.
+"""
+import random
+import tempfile
+import threading
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+import requests
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.servers.basehttp import ThreadedWSGIServer, WSGIRequestHandler
+from django.core.wsgi import get_wsgi_application
+from django.test.utils import override_settings
+
+from trips.models import Profile, Trip
+from .stub import OpenMeteoStub
+from .utils import benchmark_database, summarize, use_stub
+
+PASSWORD = 'load-test-password'
+
+# Hashers for --password-hasher fast. The default PBKDF2 costs ~0.5 s of CPU
+# per login, which with client and server in one process stalls every
+# other request
+FAST_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher']
+
+# Destinations with rough popularity weights
+CITIES = (
+    ('Paris', 48.85, 2.35, 10), ('London', 51.51, -0.13, 10), ('New York', 40.71, -74.01, 9),
+    ('Tokyo', 35.69, 139.69, 7), ('Barcelona', 41.39, 2.17, 6), ('Rome', 41.90, 12.50, 6),
+    ('Chicago', 41.88, -87.63, 5), ('San Francisco', 37.77, -122.42, 5), ('Berlin', 52.52, 13.40, 4),
+    ('Sydney', -33.87, 151.21, 3), ('Singapore', 1.29, 103.85, 3), ('Toronto', 43.65, -79.38, 3),
+    ('Mexico City', 19.43, -99.13, 2), ('Cape Town', -33.93, 18.42, 2), ('Reykjavik', 64.15, -21.94, 1),
+    ('Kyoto', 35.01, 135.77, 1), ('Lisbon', 38.72, -9.14, 2), ('Denver', 39.74, -104.99, 2),
+)
+
+# Trips per user: most have a handful, a few plan a lot
+TRIPS_PER_USER = ((0, 5), (1, 20), (2, 20), (3, 15), (5, 15), (8, 10), (15, 10), (40, 5))
+
+DEFAULT_MIX = 'dashboard=35,weather=30,autocomplete=25,write=10'
+
+# Default SLOs per endpoint (milliseconds)
+DEFAULT_SLOS = {
+    'login': {'p95_ms': 800},
+    'dashboard': {'p95_ms': 150, 'p99_ms': 300},
+    'weather': {'p95_ms': 250, 'p99_ms': 500},
+    'autocomplete': {'p95_ms': 100, 'p99_ms': 200},
+    'trip_create': {'p95_ms': 200},
+    'trip_update': {'p95_ms': 200},
+}
+
+
+def add_arguments(parser):
+    parser.add_argument('--users', type=int, default=200, help='Users to seed')
+    parser.add_argument('--concurrency', type=int, default=16, help='Virtual users running at once')
+    parser.add_argument('--duration', type=float, default=30.0, help='Seconds to generate load for')
+    parser.add_argument('--session-actions', type=int, default=10,
+                        help='Scenarios a virtual user runs before logging in as someone else')
+    parser.add_argument('--mix', default=DEFAULT_MIX, help='Scenario weights, e.g. dashboard=35,weather=30,...')
+    parser.add_argument('--slo', action='append', default=[], metavar='ENDPOINT.STAT=MS',
+                        help='Override an SLO, e.g. weather.p95_ms=300 (repeatable)')
+    parser.add_argument('--max-error-rate', type=float, default=0.01, help='Error rate SLO for every endpoint')
+    parser.add_argument('--latency', type=float, default=0.05, help='Upstream (Open-Meteo stub) latency in seconds')
+    parser.add_argument('--seed', type=int, default=1, help='Random seed for the population and the traffic')
+    parser.add_argument('--password-hasher', choices=('fast', 'default'), default='fast',
+                        help="'fast' (MD5) keeps logins from starving the shared GIL; "
+                             "'default' uses settings.PASSWORD_HASHERS")
+    parser.add_argument('--fail-on-slo', action='store_true', help='Exit with an error if any SLO is missed')
+
+
+def parse_weights(value):
+    """'a=3,b=1' -> {'a': 3.0, 'b': 1.0}"""
+    weights = {}
+    for part in value.split(','):
+        if part.strip():
+            name, _, weight = part.partition('=')
+            weights[name.strip()] = float(weight)
+    return weights
+
+
+def parse_slos(overrides):
+    """DEFAULT_SLOS with 'endpoint.stat=ms' overrides applied"""
+    slos = {endpoint: dict(targets) for endpoint, targets in DEFAULT_SLOS.items()}
+    for override in overrides:
+        target, _, value = override.partition('=')
+        endpoint, _, stat = target.partition('.')
+        slos.setdefault(endpoint, {})[stat] = float(value)
+    return slos
+
+
+def seed_population(users, rng):
+    """
+    Create users with Profiles and trips
+
+    Returns:
+        list: (username, [trip ids]) for every user
+    """
+    password = make_password(PASSWORD)  # Hashed once; hashing per user would dominate seeding
+    User.objects.bulk_create(User(username=f'load{i}', password=password) for i in range(users))
+    accounts = list(User.objects.filter(username__startswith='load').order_by('id'))
+    Profile.objects.bulk_create(
+        Profile(user=user, traveler_type='business' if rng.random() < 0.3 else 'casual') for user in accounts
+    )
+    business = set(Profile.objects.filter(traveler_type='business').values_list('user_id', flat=True))
+
+    today = date.today()
+    counts, count_weights = zip(*TRIPS_PER_USER)
+    city_weights = [city[3] for city in CITIES]
+    trips = []
+    for user in accounts:
+        for _ in range(rng.choices(counts, count_weights)[0]):
+            name, latitude, longitude, _ = rng.choices(CITIES, city_weights)[0]
+            when = rng.random()
+            if when < 0.2:
+                offset = rng.randint(-365, -1)  # Past trips
+            elif when < 0.7:
+                offset = rng.randint(0, 16)  # Within the forecast horizon
+            else:
+                offset = rng.randint(17, 180)
+            length = rng.randint(1, 4) if user.pk in business else rng.randint(2, 14)
+            start = today + timedelta(days=offset)
+            trips.append(Trip(
+                user=user, destination=name, latitude=latitude, longitude=longitude,
+                travel_start=start, travel_end=start + timedelta(days=length),
+                activities='Meetings' if user.pk in business else 'Sightseeing and food',
+                packing_list=['passport', 'charger'],
+            ))
+    Trip.objects.bulk_create(trips, batch_size=2000)
+
+    trip_ids = {}
+    for trip_id, user_id in Trip.objects.values_list('id', 'user_id'):
+        trip_ids.setdefault(user_id, []).append(trip_id)
+    return [(user.username, trip_ids.get(user.pk, [])) for user in accounts]
+
+
+class _QuietHandler(WSGIRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+class _Recorder:
+    """Per-endpoint latencies and errors, shared by the virtual users"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.durations = {}
+        self.errors = {}
+
+    def add(self, endpoint, duration, ok):
+        with self._lock:
+            self.durations.setdefault(endpoint, []).append(duration)
+            if not ok:
+                self.errors[endpoint] = self.errors.get(endpoint, 0) + 1
+
+
+class VirtualUser:
+    """One browser session: logs in, then runs scenarios"""
+
+    def __init__(self, base_url, recorder, rng):
+        self.base_url = base_url
+        self.recorder = recorder
+        self.rng = rng
+        self.session = requests.Session()
+        self.trip_ids = []
+
+    def request(self, endpoint, method, path, ok_statuses=(200,), **kwargs):
+        started = time.perf_counter()
+        try:
+            response = self.session.request(method, self.base_url + path, timeout=30, **kwargs)
+            ok = response.status_code in ok_statuses
+        except requests.exceptions.RequestException:
+            response, ok = None, False
+        self.recorder.add(endpoint, time.perf_counter() - started, ok)
+        return response if ok else None
+
+    def login(self, username, trip_ids):
+        self.trip_ids = list(trip_ids)
+        self.session.headers.pop('Authorization', None)
+        response = self.request('login', 'POST', '/token/', json={'username': username, 'password': PASSWORD})
+        if response is not None:
+            self.session.headers['Authorization'] = f"Bearer {response.json()['access']}"
+        return response is not None
+
+    def dashboard(self):
+        self.request('dashboard', 'GET', '/api/trips/')
+
+    def weather(self):
+        if not self.trip_ids:
+            return self.dashboard()
+        self.request('weather', 'GET', f'/api/trips/{self.rng.choice(self.trip_ids)}/bundle/')
+
+    def autocomplete(self):
+        # One request per keystroke after the second character
+        name = self.rng.choice(CITIES)[0]
+        for length in range(2, min(len(name), 6) + 1):
+            self.request('autocomplete', 'GET', '/api/cities/search/', params={'q': name[:length]})
+
+    def write(self):
+        if self.trip_ids and self.rng.random() < 0.5:
+            trip_id = self.rng.choice(self.trip_ids)
+            self.request('trip_update', 'PATCH', f'/api/trips/{trip_id}/',
+                         json={'activities': f"Updated plan {self.rng.randint(0, 10 ** 6)}"})
+            return
+        name, latitude, longitude, _ = self.rng.choice(CITIES)
+        start = date.today() + timedelta(days=self.rng.randint(0, 60))
+        response = self.request('trip_create', 'POST', '/api/trips/', ok_statuses=(201,), json={
+            'destination': name, 'latitude': latitude, 'longitude': longitude,
+            'travel_start': start.isoformat(), 'travel_end': (start + timedelta(days=4)).isoformat(),
+        })
+        if response is not None:
+            self.trip_ids.append(response.json()['id'])
+
+
+def _drive(base_url, accounts, mix, session_actions, deadline, recorder, seed):
+    rng = random.Random(seed)
+    user = VirtualUser(base_url, recorder, rng)
+    scenarios, weights = zip(*mix.items())
+    while time.monotonic() < deadline:
+        username, trip_ids = rng.choice(accounts)
+        if not user.login(username, trip_ids):
+            continue
+        for _ in range(session_actions):
+            if time.monotonic() >= deadline:
+                break
+            getattr(user, rng.choices(scenarios, weights)[0])()
+
+
+def report(recorder, elapsed, slos, max_error_rate):
+    """Per-endpoint throughput and latency, with each SLO marked met or missed"""
+    endpoints = {}
+    for endpoint, durations in sorted(recorder.durations.items()):
+        errors = recorder.errors.get(endpoint, 0)
+        stats = {
+            'errors': errors,
+            'error_rate': round(errors / len(durations), 4),
+            'throughput_rps': round(len(durations) / elapsed, 2),
+            **summarize(durations),
+        }
+        checks = {'error_rate': {'target': max_error_rate, 'ok': stats['error_rate'] <= max_error_rate}}
+        for stat, target in slos.get(endpoint, {}).items():
+            checks[stat] = {'target': target, 'ok': stats.get(stat, 0) <= target}
+        stats['slo'] = checks
+        stats['slo_ok'] = all(check['ok'] for check in checks.values())
+        endpoints[endpoint] = stats
+    return endpoints
+
+
+def run(users=200, concurrency=16, duration=30.0, session_actions=10, mix=DEFAULT_MIX, slo=(),
+        max_error_rate=0.01, latency=0.05, seed=1, password_hasher='fast', **options):
+    weights = parse_weights(mix)
+    unknown = set(weights) - {'dashboard', 'weather', 'autocomplete', 'write'}
+    if unknown:
+        raise ValueError(f"Unknown scenarios in --mix: {', '.join(sorted(unknown))}")
+    slos = parse_slos(slo)
+    hasher_settings = {'PASSWORD_HASHERS': FAST_HASHERS} if password_hasher == 'fast' else {}
+
+    with tempfile.TemporaryDirectory(prefix='travelmate-load-') as directory, \
+            benchmark_database(str(Path(directory) / 'load.sqlite3')), \
+            override_settings(ALLOWED_HOSTS=['127.0.0.1'], **hasher_settings), \
+            OpenMeteoStub(latency=latency) as stub, use_stub(stub):
+        accounts = seed_population(users, random.Random(seed))
+
+        server = ThreadedWSGIServer(('127.0.0.1', 0), _QuietHandler, allow_reuse_address=False)
+        server.set_app(get_wsgi_application())
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        base_url = f"http://127.0.0.1:{server.server_address[1]}"
+
+        recorder = _Recorder()
+        started = time.monotonic()
+        deadline = started + duration
+        workers = [
+            threading.Thread(target=_drive, args=(
+                base_url, accounts, weights, session_actions, deadline, recorder, seed * 1000 + i
+            ))
+            for i in range(concurrency)
+        ]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        elapsed = time.monotonic() - started
+        server.shutdown()
+        server.server_close()
+
+        endpoints = report(recorder, elapsed, slos, max_error_rate)
+        total = sum(len(durations) for durations in recorder.durations.values())
+        return {
+            'config': {
+                'users': users, 'trips': Trip.objects.count(), 'concurrency': concurrency,
+                'duration': duration, 'mix': weights, 'upstream_latency': latency, 'seed': seed,
+                'password_hasher': password_hasher,
+            },
+            'seconds': round(elapsed, 2),
+            'requests': total,
+            'throughput_rps': round(total / elapsed, 2),
+            'upstream_requests': stub.request_count(),
+            'endpoints': endpoints,
+            'slo_ok': all(stats['slo_ok'] for stats in endpoints.values()),
+        }
@@ -0,0 +1,177 @@
+"""
+SQLite lock errors under concurrent writers, before and after tuning.
+
+Runs the same workload against a temporary database file with Django's
+default SQLite settings and with the settings DATABASE_PROFILE builds (WAL,
+synchronous=NORMAL, busy timeout, immediate write transactions): writer
+threads read a trip and then save new recommendations for it in one
+transaction, as trip_clothing_recommendations does, while reader threads
+list trips. Reports the share of operations that failed with "database is
+locked" and the operation latency for each profile.
+"""
+import random
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
+from contextlib import closing
+from datetime import date, timedelta
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import OperationalError, connections, transaction
+
+from travelmate import database
+from trips.models import Trip
+from .utils import summarize
+
+
+def add_arguments(parser):
+    parser.add_argument('--writers', type=int, default=8, help='Threads saving recommendations')
+    parser.add_argument('--readers', type=int, default=8, help='Threads listing trips')
+    parser.add_argument('--operations', type=int, default=200, help='Operations per thread')
+    parser.add_argument('--trips', type=int, default=200, help='Trips in the database')
+    parser.add_argument('--busy-timeout-ms', type=int, default=5000,
+                        help='Lock wait for both profiles (SQLite timeout / busy_timeout)')
+
+
+def _profiles(directory, busy_timeout_ms):
+    return {
+        # What startproject generates: rollback journal, deferred transactions
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': directory / 'default.sqlite3',
+            'OPTIONS': {'timeout': busy_timeout_ms / 1000},
+        },
+        'tuned': database.build({
+            **getattr(settings, 'DATABASE_PROFILE', {}),
+            'engine': 'sqlite',
+            'name': directory / 'tuned.sqlite3',
+            'busy_timeout_ms': busy_timeout_ms,
+        }, directory),
+    }
+
+
+def _register(alias, config):
+    # configure_settings() fills in the defaults Django expects on every alias
+    connections.settings[alias] = connections.configure_settings({'default': config})['default']
+
+
+def _unregister(alias):
+    connections.close_all()
+    connections.settings.pop(alias, None)
+    try:
+        delattr(connections._connections, alias)
+    except AttributeError:
+        pass
+
+
+def _seed(alias, count):
+    with connections[alias].schema_editor() as editor:
+        editor.create_model(User)
+        editor.create_model(Trip)
+    user = User.objects.using(alias).create(username='benchmark')
+    start = date(2025, 1, 1)
+    Trip.objects.using(alias).bulk_create([
+        Trip(
+            user=user,
+            destination=f"Destination {i}",
+            latitude=0.0,
+            longitude=0.0,
+            travel_start=start + timedelta(days=i % 365),
+            travel_end=start + timedelta(days=i % 365 + 5),
+        )
+        for i in range(count)
+    ])
+    return user.pk, list(Trip.objects.using(alias).values_list('pk', flat=True))
+
+
+def _is_locked(error):
+    return 'locked' in str(error) or 'busy' in str(error)
+
+
+def _writer(alias, trip_ids, operations, seed, durations, errors):
+    rng = random.Random(seed)
+    try:
+        for i in range(operations):
+            started = time.perf_counter()
+            try:
+                with transaction.atomic(using=alias):
+                    trip = Trip.objects.using(alias).get(pk=rng.choice(trip_ids))
+                    trip.recommendations = {'clothing': [f"Layer {seed}-{i}"]}
+                    trip.save(using=alias, update_fields=['recommendations', 'updated_at'])
+            except OperationalError as e:
+                if not _is_locked(e):
+                    raise
+                errors.append(e)
+            durations.append(time.perf_counter() - started)
+    finally:
+        connections[alias].close()
+
+
+def _reader(alias, user_id, operations, durations, errors):
+    try:
+        for _ in range(operations):
+            started = time.perf_counter()
+            try:
+                list(Trip.objects.using(alias).filter(user_id=user_id).order_by('travel_start')[:50])
+            except OperationalError as e:
+                if not _is_locked(e):
+                    raise
+                errors.append(e)
+            durations.append(time.perf_counter() - started)
+    finally:
+        connections[alias].close()
+
+
+def _run_profile(alias, config, writers, readers, operations, trips):
+    _register(alias, config)
+    try:
+        user_id, trip_ids = _seed(alias, trips)
+        connections[alias].close()
+
+        results = {'writes': ([], []), 'reads': ([], [])}
+        threads = [
+            threading.Thread(target=_writer, args=(alias, trip_ids, operations, seed, *results['writes']))
+            for seed in range(writers)
+        ] + [
+            threading.Thread(target=_reader, args=(alias, user_id, operations, *results['reads']))
+            for _ in range(readers)
+        ]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+        with closing(sqlite3.connect(config['NAME'])) as check:
+            journal_mode = check.execute('PRAGMA journal_mode').fetchone()[0]
+        report = {'journal_mode': journal_mode, 'seconds': round(elapsed, 3)}
+        for kind, (durations, errors) in results.items():
+            report[kind] = {
+                'lock_errors': len(errors),
+                'lock_error_rate': round(len(errors) / len(durations), 4) if durations else 0.0,
+                **summarize(durations),
+            }
+        return report
+    finally:
+        _unregister(alias)
+
+
+def run(writers=8, readers=8, operations=200, trips=200, busy_timeout_ms=5000, **options):
+    directory = Path(tempfile.mkdtemp(prefix='travelmate-locking-'))
+    results = {
+        'writers': writers,
+        'readers': readers,
+        'operations_per_thread': operations,
+        'busy_timeout_ms': busy_timeout_ms,
+    }
+    try:
+        for name, config in _profiles(directory, busy_timeout_ms).items():
+            results[name] = _run_profile(f"benchmark_{name}", config, writers, readers, operations, trips)
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+    return results
@@ -0,0 +1,245 @@
+import json
+import os
+import threading
+import time
+from datetime import date, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlencode, urlparse
+
+import requests
+
+# Real endpoints behind each stub path, used when recording
+UPSTREAMS = {
+    '/v1/forecast': 'https://api.open-meteo.com/v1/forecast',
+    '/v1/search': 'https://geocoding-api.open-meteo.com/v1/search',
+}
+
+
+def forecast_payload(latitude, longitude, days, temperature_unit='fahrenheit'):
+    """Build a synthetic Open-Meteo forecast response for one location"""
+    start = date.today()
+    base = 60.0 if temperature_unit == 'fahrenheit' else 15.0
+    unit = '°F' if temperature_unit == 'fahrenheit' else '°C'
+    return {
+        'latitude': latitude,
+        'longitude': longitude,
+        'timezone': 'GMT',
+        'current_weather': {'temperature': base, 'windspeed': 8.0, 'weathercode': 2},
+        'daily_units': {
+            'time': 'iso8601',
+            'temperature_2m_max': unit,
+            'temperature_2m_min': unit,
+            'precipitation_sum': 'mm',
+            'precipitation_probability_max': '%',
+        },
+        'daily': {
+            'time': [(start + timedelta(days=i)).isoformat() for i in range(days)],
+            'temperature_2m_max': [round(base + 10 + (i % 5), 1) for i in range(days)],
+            'temperature_2m_min': [round(base - 5 + (i % 3), 1) for i in range(days)],
+            'precipitation_sum': [round((i % 4) * 1.5, 1) for i in range(days)],
+            'precipitation_probability_max': [(i * 17) % 100 for i in range(days)],
+        },
+    }
+
+
+def geocoding_payload(name, count):
+    """Build a synthetic Open-Meteo geocoding response"""
+    return {
+        'results': [
+            {
+                'name': f"{name.title()}{'' if i == 0 else f' {i}'}",
+                'country': 'Stubland',
+                'admin1': 'Benchmark Province',
+                'latitude': round(10 + i * 0.5, 4),
+                'longitude': round(20 + i * 0.5, 4),
+            }
+            for i in range(count)
+        ]
+    }
+
+
+def _rebase_dates(body, start):
+    """Shift a forecast body's days so the first one is `start`"""
+    for location in body if isinstance(body, list) else [body]:
+        daily = location.get('daily') or {}
+        if daily.get('time'):
+            daily['time'] = [(start + timedelta(days=i)).isoformat() for i in range(len(daily['time']))]
+    return body
+
+
+class Recordings:
+    """
+    Open-Meteo responses recorded to a JSON file, replayed by OpenMeteoStub
+
+    Responses are keyed on the request path and query. Forecast days are
+    shifted to start today when replayed, so trips dated relative to today
+    line up with a recording made on any day. In record mode, requests
+    without a recording are sent to the real API (UPSTREAMS) and the file is
+    written on save().
+    """
+
+    def __init__(self, path, record=False):
+        self.path = path
+        self.record = record
+        self.responses = {}
+        self.misses = 0
+        self._lock = threading.Lock()
+        if os.path.exists(path):
+            with open(path, encoding='utf-8') as f:
+                self.responses = json.load(f)['responses']
+
+    @staticmethod
+    def key(path, params):
+        return f"{path}?{urlencode(sorted(params.items()))}"
+
+    def get(self, path, params):
+        """
+        Returns:
+            The recorded (or, in record mode, freshly fetched) body, or None
+        """
+        key = self.key(path, params)
+        with self._lock:
+            body = self.responses.get(key)
+        if body is None and self.record and path in UPSTREAMS:
+            response = requests.get(UPSTREAMS[path], params=params, timeout=30)
+            response.raise_for_status()
+            body = response.json()
+            with self._lock:
+                self.responses[key] = body
+        if body is None:
+            with self._lock:
+                self.misses += 1
+            return None
+        body = json.loads(json.dumps(body))  # Replays must not share state
+        return _rebase_dates(body, date.today()) if path == '/v1/forecast' else body
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        with open(self.path, 'w', encoding='utf-8') as f:
+            json.dump({'recorded_on': date.today().isoformat(), 'responses': self.responses},
+                      f, indent=1, sort_keys=True, ensure_ascii=False)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    # Headers and body are written separately; without TCP_NODELAY each
+    # response stalls ~40 ms on Nagle's algorithm and delayed ACKs
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        stub = self.server.stub
+        url = urlparse(self.path)
+        params = {key: values[0] for key, values in parse_qs(url.query).items()}
+        stub.record(url.path)
+        if stub.latency:
+            time.sleep(stub.latency)
+        if stub.status != 200:
+            self.send_error(stub.status)
+            return
+
+        body = stub.recordings.get(url.path, params) if stub.recordings is not None else None
+        if body is None:
+            body = self._synthetic(url.path, params)
+        if body is None:
+            self.send_error(404)
+            return
+
+        content = json.dumps(body).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    @staticmethod
+    def _synthetic(path, params):
+        if path == '/v1/forecast':
+            latitudes = params.get('latitude', '0').split(',')
+            longitudes = params.get('longitude', '0').split(',')
+            days = int(params.get('forecast_days', 7))
+            unit = params.get('temperature_unit', 'celsius')
+            body = [
+                forecast_payload(float(latitude), float(longitude), days, unit)
+                for latitude, longitude in zip(latitudes, longitudes)
+            ]
+            return body[0] if len(body) == 1 else body
+        if path == '/v1/search':
+            return geocoding_payload(params.get('name', ''), int(params.get('count', 10)))
+        return None
+
+    def log_message(self, format, *args):
+        pass
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 1024
+
+
+class OpenMeteoStub:
+    """
+    Local stand-in for the Open-Meteo forecast and geocoding APIs
+
+    Serves recorded responses (see Recordings) or synthetic ones after an
+    optional artificial latency, and counts the requests it receives so
+    benchmarks can report upstream call rates. Setting `status` to an error
+    code simulates an upstream outage.
+
+    Usage:
+        with OpenMeteoStub(latency=0.05) as stub:
+            ...  # services now talk to stub.forecast_url / stub.geocoding_url
+    """
+
+    def __init__(self, latency=0.0, host='127.0.0.1', port=0, recordings=None):
+        self.latency = latency
+        self.recordings = recordings
+        self.status = 200
+        self._server = _Server((host, port), _Handler)
+        self._server.stub = self
+        self._thread = None
+        self._lock = threading.Lock()
+        self.requests = {}
+
+    @property
+    def base_url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def forecast_url(self):
+        return f"{self.base_url}/v1/forecast"
+
+    @property
+    def geocoding_url(self):
+        return f"{self.base_url}/v1/search"
+
+    def record(self, path):
+        with self._lock:
+            self.requests[path] = self.requests.get(path, 0) + 1
+
+    def request_count(self, path=None):
+        with self._lock:
+            if path is None:
+                return sum(self.requests.values())
+            return self.requests.get(path, 0)
+
+    def reset(self):
+        with self._lock:
+            self.requests.clear()
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+        if self.recordings is not None and self.recordings.record:
+            self.recordings.save()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
@@ -0,0 +1,186 @@
+"""
+Latency of the weather and geocoding services and the main API endpoints.
+
+Every case runs against a throwaway database and a local Open-Meteo stub.
+The stub replays recorded responses from --recordings
+(trips/benchmarks/recordings/open_meteo.json by default, with forecast days
+shifted to start today) when that file exists. No recording is shipped with
+the repo, so until one is made with `--record` on a machine that can reach
+Open-Meteo every request gets a synthetic response (stub.forecast_payload).
+`environment.upstream` in the results says which was used ('recorded',
+'mixed' or 'synthetic'), a warning is printed when a run falls back to
+synthetic responses, and `--require-recordings` makes that an error. Save a
+run with `--output` and compare a later one with `--baseline` to see
+regressions as numbers.
+
+Cases named `.cold` empty the forecast caches before every iteration, so
+they include a (local) upstream round trip.
+"""
+import os
+import platform
+import sys
+import time
+from datetime import date, timedelta
+from pathlib import Path
+from unittest import mock
+
+import django
+from django.contrib.auth.models import User
+from django.test import Client
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from trips import jsonlib
+from trips.models import Profile, Trip
+from trips.services.geocoding_service import GeocodingService
+from trips.services.weather_service import WeatherService
+from .stub import OpenMeteoStub, Recordings
+from .utils import benchmark_database, reset_caches, summarize, use_stub
+
+RECORDINGS = Path(__file__).resolve().parent / 'recordings' / 'open_meteo.json'
+
+# Destinations of the benchmark user's trips (recorded coordinates)
+DESTINATIONS = (
+    ('Paris', 48.85, 2.35),
+    ('New York', 40.71, -74.01),
+    ('Tokyo', 35.69, 139.69),
+    ('Sydney', -33.87, 151.21),
+    ('Cape Town', -33.93, 18.42),
+    ('Reykjavik', 64.15, -21.94),
+    ('Singapore', 1.29, 103.85),
+    ('Mexico City', 19.43, -99.13),
+)
+
+
+def add_arguments(parser):
+    parser.add_argument('--iterations', type=int, default=200, help='Timed runs per case')
+    parser.add_argument('--warmup', type=int, default=20, help='Untimed runs before each case')
+    parser.add_argument('--cases', default='', help='Only run cases whose name contains one of these (comma-separated)')
+    parser.add_argument('--recordings', default=str(RECORDINGS), help='Recorded Open-Meteo responses')
+    parser.add_argument('--record', action='store_true',
+                        help='Fetch unrecorded requests from Open-Meteo and save them to --recordings')
+    parser.add_argument('--require-recordings', action='store_true',
+                        help='Fail instead of falling back to synthetic responses')
+
+
+def _time(func, iterations, warmup, before=None):
+    for _ in range(warmup):
+        if before is not None:
+            before()
+        func()
+    durations = []
+    for _ in range(iterations):
+        if before is not None:
+            before()
+        started = time.perf_counter()
+        func()
+        durations.append(time.perf_counter() - started)
+    return summarize(durations)
+
+
+def _create_user():
+    user = User.objects.create_user('benchmark', password='benchmark')
+    Profile.objects.create(user=user, traveler_type='business')
+    today = date.today()
+    Trip.objects.bulk_create(
+        Trip(
+            user=user,
+            destination=name,
+            latitude=latitude,
+            longitude=longitude,
+            travel_start=today + timedelta(days=2 * i),
+            travel_end=today + timedelta(days=2 * i + 5),
+            activities='Sightseeing, museums and food tours',
+            packing_list=['passport', 'charger', 'umbrella'],
+        )
+        for i, (name, latitude, longitude) in enumerate(DESTINATIONS)
+    )
+    return user, Trip.objects.filter(user=user).order_by('travel_start').first()
+
+
+def _get(client, url, auth):
+    def request():
+        response = client.get(url, headers={'Authorization': auth})
+        assert response.status_code == 200, (url, response.status_code)
+    return request
+
+
+def _cases(user, trip):
+    """(name, function, per-iteration reset or None) for every case"""
+    _, latitude, longitude = DESTINATIONS[0]
+    forecast_16 = WeatherService.get_weather_forecast(latitude, longitude, 16)
+    client = Client()
+    auth = f"Bearer {RefreshToken.for_user(user).access_token}"
+
+    def weather():
+        WeatherService.get_weather_forecast(latitude, longitude, 7)
+
+    def search_upstream():
+        # Bypass an installed gazetteer, so every machine measures the same path
+        with mock.patch.object(GeocodingService, 'search_offline', return_value=[]):
+            GeocodingService.search_cities('Paris')
+
+    yield 'service.get_weather_forecast.cold', weather, reset_caches
+    yield 'service.get_weather_forecast.warm', weather, None
+    for days in (30, 90):
+        yield f'service.extend_forecast.{days}d', lambda days=days: WeatherService.extend_forecast(forecast_16, days), None
+    yield 'service.get_clothing_recommendations.16d', lambda: WeatherService.get_clothing_recommendations(forecast_16, True), None
+    yield 'service.search_cities', lambda: GeocodingService.search_cities('Paris'), None
+    yield 'service.search_cities.upstream', search_upstream, None
+
+    endpoints = {
+        'api.trip_list': '/api/trips/',
+        'api.trip_detail': f'/api/trips/{trip.pk}/',
+        'api.trip_weather': f'/api/trips/{trip.pk}/weather/',
+        'api.clothing_recommendations': f'/api/trips/{trip.pk}/clothing-recommendations/',
+        'api.trip_bundle': f'/api/trips/{trip.pk}/bundle/',
+        'api.trips_weather': '/api/trips/weather/',
+        'api.city_search': '/api/cities/search/?q=Paris',
+    }
+    for name, url in endpoints.items():
+        yield f'{name}.warm', _get(client, url, auth), None
+    for name in ('api.trip_weather', 'api.trip_bundle', 'api.trips_weather'):
+        yield f'{name}.cold', _get(client, endpoints[name], auth), reset_caches
+
+
+def upstream_source(replay):
+    """'recorded', 'mixed' (some requests weren't recorded) or 'synthetic'"""
+    if not replay.responses:
+        return 'synthetic'
+    return 'mixed' if replay.misses else 'recorded'
+
+
+def run(iterations=200, warmup=20, cases='', recordings=str(RECORDINGS), record=False,
+        require_recordings=False, **options):
+    selected = [name.strip() for name in cases.split(',') if name.strip()]
+    if require_recordings and not record and not os.path.exists(recordings):
+        raise ValueError(f"No recorded Open-Meteo responses at {recordings} (make them with --record)")
+    replay = Recordings(recordings, record=record)
+
+    results = {
+        'environment': {
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'json': jsonlib.BACKEND,
+            'iterations': iterations,
+        },
+        'cases': {},
+    }
+    with benchmark_database(), OpenMeteoStub(recordings=replay) as stub, use_stub(stub):
+        user, trip = _create_user()
+        for name, func, before in _cases(user, trip):
+            if selected and not any(part in name for part in selected):
+                continue
+            reset_caches()
+            results['cases'][name] = _time(func, iterations, warmup, before)
+        results['environment']['unrecorded_requests'] = replay.misses
+    results['environment']['upstream'] = upstream_source(replay)
+
+    if replay.misses:
+        message = (
+            f"{replay.misses} Open-Meteo requests had no recording in {recordings} "
+            f"and were answered with synthetic responses"
+        )
+        if require_recordings:
+            raise ValueError(message)
+        print(f"Warning: {message}", file=sys.stderr)
+    return results
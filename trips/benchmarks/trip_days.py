@@ -0,0 +1,67 @@
+"""
+Trip-day masking of long forecasts.
+
+Times flagging the days of a forecast that fall within a trip, per request,
+three ways: parsing each ISO date with strptime (the original views), comparing
+each day ordinal, and Forecast.day_mask's index range. Checks that all three
+agree.
+"""
+import time
+from datetime import date, datetime, timedelta
+
+from trips.benchmarks.stub import forecast_payload
+from trips.services.forecast import Forecast
+from trips.services.weather_service import WeatherService
+from .utils import summarize
+
+
+def add_arguments(parser):
+    parser.add_argument('--days', type=int, nargs='+', default=[16, 365],
+                        help='Forecast lengths to mask')
+    parser.add_argument('--repeat', type=int, default=2000, help='Timed masks per length and method')
+
+
+def strptime_mask(forecast, travel_start, travel_end):
+    return [
+        travel_start <= datetime.strptime(day, "%Y-%m-%d").date() <= travel_end
+        for day in forecast.dates
+    ]
+
+
+def ordinal_mask(forecast, travel_start, travel_end):
+    first, last = travel_start.toordinal(), travel_end.toordinal()
+    return [first <= ordinal <= last for ordinal in forecast.ordinals]
+
+
+def range_mask(forecast, travel_start, travel_end):
+    return forecast.day_mask(travel_start, travel_end)
+
+
+METHODS = {'strptime': strptime_mask, 'ordinal': ordinal_mask, 'range': range_mask}
+
+
+def run(days=(16, 365), repeat=2000, **options):
+    base = Forecast.from_api(forecast_payload(40.71, -74.01, 16))
+    results = {}
+    for total_days in days:
+        forecast = WeatherService.extend_forecast(base, total_days)
+        # A trip covering the middle half of the forecast
+        travel_start = date.today() + timedelta(days=total_days // 4)
+        travel_end = date.today() + timedelta(days=3 * total_days // 4)
+
+        masks = {}
+        timings = {}
+        for name, method in METHODS.items():
+            durations = []
+            for _ in range(repeat):
+                started = time.perf_counter()
+                masks[name] = method(forecast, travel_start, travel_end)
+                durations.append(time.perf_counter() - started)
+            timings[name] = summarize(durations)
+
+        results[str(total_days)] = {
+            'trip_days': sum(masks['range']),
+            'identical': masks['strptime'] == masks['ordinal'] == masks['range'],
+            **timings,
+        }
+    return results
@@ -0,0 +1,117 @@
+"""
+Trip list latency as a user's trip count grows.
+
+Seeds a throwaway database with many users' trips, then times the trip list
+endpoint page by page: the first page, pages reached by following cursors
+deep into the listing, and the same pages with a sparse fieldset. For
+comparison it also times serializing the whole table, which is what the list
+endpoint did before it was scoped and paginated. Cursor page latency should
+stay flat with depth.
+"""
+import random
+import time
+from datetime import date, timedelta
+
+from django.contrib.auth.models import User
+from django.test import Client
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from trips.models import Trip
+from trips.serializers import TripSerializer
+from .utils import benchmark_database, summarize
+
+
+def add_arguments(parser):
+    parser.add_argument('--trips', type=int, default=100000, help='Trips for the benchmarked user')
+    parser.add_argument('--other-trips', type=int, default=100000, help='Trips spread over other users')
+    parser.add_argument('--users', type=int, default=100, help='Number of other users')
+    parser.add_argument('--page-size', type=int, default=50, help='Trips per page')
+    parser.add_argument('--pages', type=int, default=50, help='Pages timed at each depth')
+    parser.add_argument('--fields', default='id,destination,travel_start,travel_end',
+                        help='Sparse fieldset for the sparse run')
+
+
+def _seed(user, count, rng, batch_size=5000):
+    start = date(2020, 1, 1)
+    batch = []
+    for i in range(count):
+        travel_start = start + timedelta(days=rng.randint(0, 3650))
+        batch.append(Trip(
+            user=user,
+            destination=f"Destination {i}",
+            latitude=round(rng.uniform(-60, 60), 2),
+            longitude=round(rng.uniform(-170, 170), 2),
+            travel_start=travel_start,
+            travel_end=travel_start + timedelta(days=rng.randint(1, 14)),
+            activities='Sightseeing, museums and food tours',
+        ))
+        if len(batch) == batch_size:
+            Trip.objects.bulk_create(batch)
+            batch = []
+    Trip.objects.bulk_create(batch)
+
+
+def _time_pages(client, auth, url, pages):
+    """Follow `next` links for the given number of pages, timing each request"""
+    durations = []
+    for _ in range(pages):
+        started = time.perf_counter()
+        response = client.get(url, headers={'Authorization': auth})
+        durations.append(time.perf_counter() - started)
+        assert response.status_code == 200, response.status_code
+        url = response.json()['next']
+        if url is None:
+            break
+    return durations, url
+
+
+def _time_unpaginated(repeat):
+    """Serialize the whole trip table, as the list endpoint did before pagination"""
+    durations = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        TripSerializer(Trip.objects.all(), many=True).data
+        durations.append(time.perf_counter() - started)
+    return durations
+
+
+def run(trips=100000, other_trips=100000, users=100, page_size=50, pages=50,
+        fields='id,destination,travel_start,travel_end', **options):
+    with benchmark_database():
+        rng = random.Random(0)
+        started = time.perf_counter()
+        user = User.objects.create_user('benchmark', password='benchmark')
+        _seed(user, trips, rng)
+        others = [User.objects.create_user(f'other{i}', password='benchmark') for i in range(users)]
+        for other in others:
+            _seed(other, other_trips // max(1, users), rng)
+        seed_s = time.perf_counter() - started
+
+        auth = f"Bearer {RefreshToken.for_user(user).access_token}"
+        client = Client()
+        url = f'/api/trips/?page_size={page_size}'
+
+        first_page, _ = _time_pages(client, auth, url, 1)
+        shallow, next_url = _time_pages(client, auth, url, pages)
+
+        # Walk halfway into the listing without timing, then time the deep pages
+        depth = trips // 2 // page_size
+        skip_started = time.perf_counter()
+        _, deep_url = _time_pages(client, auth, url, depth)
+        walk_s = time.perf_counter() - skip_started
+        deep, _ = _time_pages(client, auth, deep_url, pages) if deep_url else ([], None)
+        sparse, _ = _time_pages(client, auth, f'{deep_url}&fields={fields}', pages) if deep_url else ([], None)
+
+        return {
+            'trips': trips,
+            'other_trips': other_trips,
+            'seed_s': round(seed_s, 1),
+            'page_size': page_size,
+            'first_page': summarize(first_page),
+            'cursor_shallow': summarize(shallow),
+            'cursor_deep': summarize(deep),
+            'cursor_deep_sparse': summarize(sparse),
+            'unpaginated_full_table': summarize(_time_unpaginated(3)),
+            'deep_page': depth,
+            'walk_to_deep_page_s': round(walk_s, 1),
+        }
@@ -0,0 +1,80 @@
+import statistics
+from contextlib import contextmanager
+from unittest import mock
+
+from django.core.cache import caches
+from django.db import connection
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+from trips.services.geocoding_service import GeocodingService
+from trips.services.weather_service import FORECAST_CACHE, WeatherService
+
+
+@contextmanager
+def benchmark_database(name=None):
+    """
+    Run the enclosed block against a throwaway test database
+
+    Args:
+        name (str): Test database name. SQLite test databases are in memory
+            by default, where concurrent writers fail instead of waiting;
+            give a file path to benchmark writes from several threads
+    """
+    setup_test_environment()
+    old_name = connection.settings_dict['NAME']
+    old_test_name = connection.settings_dict['TEST'].get('NAME')
+    if name is not None:
+        connection.settings_dict['TEST']['NAME'] = name
+    connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+    try:
+        yield
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        connection.settings_dict['TEST']['NAME'] = old_test_name
+        teardown_test_environment()
+
+
+@contextmanager
+def use_stub(stub):
+    """Point the weather and geocoding services at a local OpenMeteoStub"""
+    reset_caches()
+    with mock.patch.object(WeatherService, 'BASE_URL', stub.forecast_url), \
+            mock.patch.object(GeocodingService, 'BASE_URL', stub.geocoding_url):
+        yield stub
+    reset_caches()
+
+
+def reset_caches():
+    """Empty every cache so the next run starts cold"""
+    FORECAST_CACHE.clear()
+    for cache in caches.all():
+        cache.clear()
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    index = max(0, min(len(sorted_values) - 1, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def summarize(durations):
+    """
+    Summarize a list of durations (in seconds)
+
+    Returns:
+        dict: count, mean, min, p50, p95, p99 and max in milliseconds
+    """
+    values = sorted(durations)
+    if not values:
+        return {'count': 0}
+    return {
+        'count': len(values),
+        'mean_ms': round(statistics.fmean(values) * 1000, 4),
+        'min_ms': round(values[0] * 1000, 4),
+        'p50_ms': round(percentile(values, 50) * 1000, 4),
+        'p95_ms': round(percentile(values, 95) * 1000, 4),
+        'p99_ms': round(percentile(values, 99) * 1000, 4),
+        'max_ms': round(values[-1] * 1000, 4),
+    }
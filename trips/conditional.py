@@ -0,0 +1,76 @@
+# trips/conditional.py
+#
+# HTTP conditional request helpers. Views compute a strong ETag from the
+# version of what they are about to return (trip updated_at, forecast
+# fingerprint, ...), answer a matching If-None-Match / If-Modified-Since with
+# 304 Not Modified before serializing anything, and tag full responses with
+# the same validators and a Cache-Control policy.
+import hashlib
+
+from django.conf import settings
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import http_date
+
+# Per-user API responses: browsers keep them but revalidate before reuse
+PRIVATE_CACHE_CONTROL = {'private': True, 'no_cache': True}
+
+# Forecasts change at most once per model run
+WEATHER_CACHE_CONTROL = {'private': True, 'max_age': getattr(settings, 'WEATHER_HTTP_MAX_AGE', 300)}
+
+# City search results are the same for everyone and rarely change
+SEARCH_CACHE_CONTROL = {'public': True, 'max_age': getattr(settings, 'SEARCH_HTTP_MAX_AGE', 24 * 3600)}
+
+
+def make_etag(*parts):
+    """
+    Build a strong ETag from the values that version a response
+
+    Returns:
+        str: Quoted ETag, e.g. '"3f2a..."'
+    """
+    digest = hashlib.blake2b(repr(parts).encode(), digest_size=16).hexdigest()
+    return f'"{digest}"'
+
+
+def timestamp(value):
+    """Seconds since the epoch for a datetime (None stays None)"""
+    return int(value.timestamp()) if value is not None else None
+
+
+def add_validators(response, etag, last_modified=None, cache_control=None):
+    """
+    Set ETag, Last-Modified, Cache-Control and Vary on a response
+
+    Args:
+        response: Django or DRF response
+        etag (str): Quoted ETag from make_etag()
+        last_modified (int): Seconds since the epoch, if known
+        cache_control (dict): patch_cache_control() arguments
+            (default: PRIVATE_CACHE_CONTROL)
+
+    Returns:
+        The same response
+    """
+    cache_control = PRIVATE_CACHE_CONTROL if cache_control is None else cache_control
+    response['ETag'] = etag
+    if last_modified is not None:
+        response['Last-Modified'] = http_date(last_modified)
+    patch_cache_control(response, **cache_control)
+    if cache_control.get('private'):
+        # The same URL returns different data for each JWT
+        patch_vary_headers(response, ('Authorization',))
+    return response
+
+
+def not_modified(request, etag, last_modified=None, cache_control=None):
+    """
+    Answer a conditional request whose validators still match
+
+    Returns:
+        HttpResponse: 304 Not Modified (or 412 for a failed If-Match), with
+            the validators set, or None if the full response must be built
+    """
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is None:
+        return None
+    return add_validators(response, etag, last_modified, cache_control)
@@ -0,0 +1,49 @@
+import importlib
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from trips.benchmarks import BENCHMARKS, baseline
+
+
+class Command(BaseCommand):
+    help = "Run one of the trips app benchmarks and print its results as JSON"
+
+    def add_arguments(self, parser):
+        subparsers = parser.add_subparsers(dest='benchmark', required=True)
+        for name, module_path in BENCHMARKS.items():
+            module = importlib.import_module(module_path)
+            subparser = subparsers.add_parser(name, help=(module.__doc__ or '').strip().split('\n')[0])
+            module.add_arguments(subparser)
+            subparser.add_argument('--output', help='Also write the results to this JSON file')
+            subparser.add_argument('--baseline', help='Compare the results with a previous --output file')
+            subparser.add_argument('--tolerance', type=float, default=0.10,
+                                   help='Relative change tolerated before a metric is reported (default 0.10)')
+            subparser.add_argument('--metrics', default=','.join(baseline.DEFAULT_METRICS),
+                                   help='Statistics compared with the baseline (comma-separated)')
+            subparser.add_argument('--fail-on-regression', action='store_true',
+                                   help='Exit with an error if any metric regressed')
+
+    def handle(self, *args, **options):
+        module = importlib.import_module(BENCHMARKS[options['benchmark']])
+        results = module.run(**options)
+        if options['output']:
+            baseline.save(results, options['output'])
+
+        comparison = None
+        if options['baseline']:
+            comparison = baseline.compare(
+                results,
+                baseline.load(options['baseline']),
+                metrics=tuple(name.strip() for name in options['metrics'].split(',') if name.strip()),
+                tolerance=options['tolerance'],
+            )
+
+        self.stdout.write(json.dumps(
+            {'results': results, 'comparison': comparison} if comparison else results, indent=2
+        ))
+        # Benchmarks with service level objectives (load_test) report slo_ok
+        if options.get('fail_on_slo') and results.get('slo_ok') is False:
+            raise CommandError("One or more SLOs were missed")
+        if comparison and comparison['regressions'] and options['fail_on_regression']:
+            raise CommandError(f"{len(comparison['regressions'])} metric(s) regressed beyond the tolerance")
@@ -0,0 +1,41 @@
+import json
+import sys
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from trips.services import bulk_trips
+
+
+class Command(BaseCommand):
+    help = "Create trips for a user from an NDJSON or CSV file, in chunks"
+
+    def add_arguments(self, parser):
+        parser.add_argument('username', help='Owner of the imported trips')
+        parser.add_argument('path', help="File to import ('-' for standard input)")
+        parser.add_argument('--format', dest='file_format', choices=bulk_trips.FORMATS,
+                            help='Input format (default: from the file extension, else ndjson)')
+        parser.add_argument('--chunk-size', type=int, default=bulk_trips.CHUNK_SIZE,
+                            help='Rows validated and written per transaction')
+
+    def handle(self, *args, **options):
+        try:
+            user = User.objects.get(username=options['username'])
+        except User.DoesNotExist:
+            raise CommandError(f"No user named {options['username']!r}")
+
+        path = options['path']
+        file_format = options['file_format'] or ('csv' if path.lower().endswith('.csv') else 'ndjson')
+
+        try:
+            if path == '-':
+                result = bulk_trips.import_trips(user, sys.stdin.buffer, file_format, options['chunk_size'])
+            else:
+                with open(path, 'rb') as lines:
+                    result = bulk_trips.import_trips(user, lines, file_format, options['chunk_size'])
+        except (OSError, bulk_trips.ImportFormatError) as e:
+            raise CommandError(str(e))
+
+        self.stdout.write(json.dumps(result))
+        if result['failed']:
+            self.stderr.write(self.style.WARNING(f"{result['failed']} rows could not be imported"))
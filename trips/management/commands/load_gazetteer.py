@@ -0,0 +1,76 @@
+import io
+import zipfile
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from trips.services.gazetteer import Gazetteer, reset_gazetteer
+
+
+def open_dump(path):
+    """Open a GeoNames text file, or the first .txt file inside a .zip"""
+    if str(path).endswith('.zip'):
+        archive = zipfile.ZipFile(path)
+        members = [name for name in archive.namelist() if name.endswith('.txt')]
+        if not members:
+            raise CommandError(f"No .txt file found in {path}")
+        return io.TextIOWrapper(archive.open(members[0]), encoding='utf-8')
+    return open(path, encoding='utf-8')
+
+
+def read_names(path, key_column, name_column):
+    """Read a GeoNames lookup table (countryInfo.txt, admin1CodesASCII.txt)"""
+    names = {}
+    if not path:
+        return names
+    with open_dump(path) as f:
+        for line in f:
+            if line.startswith('#') or not line.strip():
+                continue
+            columns = line.rstrip('\n').split('\t')
+            names[columns[key_column]] = columns[name_column]
+    return names
+
+
+class Command(BaseCommand):
+    help = "Build the offline city gazetteer from a GeoNames dump (e.g. cities500.zip)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('dump', help="GeoNames cities file (.txt or .zip)")
+        parser.add_argument('--countries', help="GeoNames countryInfo.txt, for country names")
+        parser.add_argument('--admin1', help="GeoNames admin1CodesASCII.txt, for state/province names")
+        parser.add_argument('--min-population', type=int, default=0,
+                            help="Skip places with fewer inhabitants")
+        parser.add_argument('--output', default=getattr(settings, 'GAZETTEER_PATH', None),
+                            help="Where to write the gazetteer (default: settings.GAZETTEER_PATH)")
+
+    def handle(self, *args, **options):
+        if not options['output']:
+            raise CommandError("No output path given and settings.GAZETTEER_PATH is not set")
+
+        countries = read_names(options['countries'], 0, 4)
+        admin1 = read_names(options['admin1'], 0, 1)
+
+        rows = []
+        with open_dump(options['dump']) as f:
+            for line in f:
+                columns = line.rstrip('\n').split('\t')
+                if len(columns) < 15 or columns[6] != 'P':
+                    continue  # Only populated places
+                population = int(columns[14] or 0)
+                if population < options['min_population']:
+                    continue
+                country_code = columns[8]
+                rows.append((
+                    columns[1],
+                    columns[2],
+                    admin1.get(f"{country_code}.{columns[10]}", ''),
+                    countries.get(country_code, country_code),
+                    float(columns[4]),
+                    float(columns[5]),
+                    population,
+                ))
+
+        count = Gazetteer.write(options['output'], rows)
+        reset_gazetteer()
+        self.stdout.write(self.style.SUCCESS(f"Wrote {count} places to {options['output']}"))
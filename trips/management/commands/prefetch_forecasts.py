@@ -0,0 +1,43 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from trips.services import prefetch
+
+
+class Command(BaseCommand):
+    help = "Refresh cached forecasts for trips that are under way or start within the forecast horizon"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--loop', action='store_true',
+                            help='Keep running, rescanning every --interval seconds')
+        parser.add_argument('--interval', type=float, default=prefetch.PREFETCH_INTERVAL,
+                            help='Seconds between scans when looping')
+        parser.add_argument('--rate', type=float, default=prefetch.PREFETCH_RATE,
+                            help='Maximum upstream requests per second')
+        parser.add_argument('--unit', default=prefetch.PREFETCH_UNIT, choices=['fahrenheit', 'celsius'],
+                            help='Temperature unit to cache forecasts in')
+        parser.add_argument('--lead', type=int, default=0,
+                            help='Also refresh forecasts expiring within this many seconds')
+
+    def report(self, stats):
+        self.stdout.write(json.dumps(stats))
+
+    def handle(self, *args, **options):
+        if options['loop']:
+            try:
+                prefetch.run_forever(
+                    interval=options['interval'],
+                    rate=options['rate'],
+                    temperature_unit=options['unit'],
+                    lead=options['lead'],
+                    report=self.report,
+                )
+            except KeyboardInterrupt:
+                pass
+            return
+
+        stats = prefetch.prefetch_once(options['rate'], options['unit'], options['lead'])
+        self.report(stats)
+        if stats['failed']:
+            self.stderr.write(self.style.WARNING(f"{stats['failed']} locations could not be refreshed"))
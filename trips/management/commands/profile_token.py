@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from trips import profiling
+
+
+class Command(BaseCommand):
+    help = "Print a signed X-Profile header value that lets a request be profiled"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--mode', choices=profiling.MODES, default=profiling.SAMPLING,
+                            help='Profiler to run (default: sampling)')
+
+    def handle(self, *args, **options):
+        self.stdout.write(profiling.make_token(options['mode']))
+        self.stderr.write(f"Valid for {profiling.TOKEN_MAX_AGE} seconds")
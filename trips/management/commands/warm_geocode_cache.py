@@ -0,0 +1,48 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Count, Max
+
+from trips.models import GeocodeCacheEntry, Trip
+from trips.services.geocoding_service import GeocodingService
+
+
+class Command(BaseCommand):
+    help = "Fill the geocode cache from the coordinates already stored on trips"
+
+    def handle(self, *args, **options):
+        # Latest coordinates per destination string, and how often it was used
+        destinations = (
+            Trip.objects.filter(latitude__isnull=False, longitude__isnull=False)
+            .values('destination')
+            .annotate(trips=Count('id'), latest=Max('id'))
+        )
+        latest_ids = [row['latest'] for row in destinations]
+        coordinates = dict(
+            (trip_id, (latitude, longitude))
+            for trip_id, latitude, longitude in
+            Trip.objects.filter(pk__in=latest_ids).values_list('id', 'latitude', 'longitude')
+        )
+
+        entries = {}
+        for row in destinations:
+            name = GeocodingService.cache_name(row['destination'])
+            if not name:
+                continue
+            latitude, longitude = coordinates[row['latest']]
+            entry = entries.get(name)
+            if entry is None:
+                entries[name] = GeocodeCacheEntry(
+                    name=name, latitude=latitude, longitude=longitude, hit_count=row['trips']
+                )
+            else:
+                # Several spellings of the destination fold to the same name
+                entry.hit_count += row['trips']
+
+        existing = set(
+            GeocodeCacheEntry.objects.filter(name__in=entries).values_list('name', flat=True)
+        )
+        new_entries = [entry for name, entry in entries.items() if name not in existing]
+        GeocodeCacheEntry.objects.bulk_create(new_entries, batch_size=500, ignore_conflicts=True)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Added {len(new_entries)} geocode cache entries ({len(existing)} already cached)"
+        ))
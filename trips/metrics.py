@@ -0,0 +1,346 @@
+# trips/metrics.py
+#
+# In-process request metrics. MetricsMiddleware (trips/middleware.py) opens a
+# RequestMetrics for each request; the hooks below (database queries,
+# upstream calls, cache lookups, timed spans) add to it and to process-wide
+# histograms and counters, which metrics_view exposes in the Prometheus text
+# format. Every hook returns straight away when settings.REQUEST_METRICS is
+# off, and the middleware removes itself, so disabled metrics cost nothing.
+import hmac
+import threading
+import time
+from bisect import bisect_left
+from contextlib import nullcontext
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.http import Http404, HttpResponse, HttpResponseForbidden
+
+ENABLED = getattr(settings, 'REQUEST_METRICS', False)
+
+# Add a Server-Timing header to responses (visible in browser dev tools)
+SERVER_TIMING = getattr(settings, 'METRICS_SERVER_TIMING', True)
+
+# Bearer token a scraper sends to /metrics; staff users can always read it
+METRICS_TOKEN = getattr(settings, 'METRICS_TOKEN', '')
+
+# Histogram bucket upper bounds, in seconds
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_current = ContextVar('request_metrics', default=None)
+
+
+class Histogram:
+    """Cumulative-bucket histogram, as Prometheus expects"""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # The last one is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self):
+        """(upper bound, observations at or below it) pairs, ending with +Inf"""
+        total = 0
+        for bound, count in zip((*self.buckets, float('inf')), self.counts):
+            total += count
+            yield bound, total
+
+
+class Registry:
+    """Process-wide histograms and counters, keyed by metric name and labels"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histograms = {}
+        self._counters = {}
+        self._help = {}
+
+    def observe(self, name, labels, value, help_text=''):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram()
+                self._help.setdefault(name, ('histogram', help_text))
+            histogram.observe(value)
+
+    def inc(self, name, labels, amount=1, help_text=''):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+            self._help.setdefault(name, ('counter', help_text))
+
+    def counters(self, name):
+        """
+        Returns:
+            list: (labels dict, value) for each counter with this name
+        """
+        with self._lock:
+            return [(dict(labels), value) for (key, labels), value in self._counters.items() if key == name]
+
+    def clear(self):
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+
+    def render(self):
+        """
+        Every metric in the Prometheus text exposition format
+
+        Returns:
+            str: The exposition, ending with a newline
+        """
+        with self._lock:
+            counters = sorted(self._counters.items())
+            histograms = sorted(
+                (key, list(histogram.cumulative()), histogram.sum, histogram.count)
+                for key, histogram in self._histograms.items()
+            )
+            described = dict(self._help)
+
+        lines = []
+        seen = set()
+
+        def header(name):
+            if name not in seen:
+                seen.add(name)
+                kind, help_text = described.get(name, ('untyped', ''))
+                if help_text:
+                    lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} {kind}")
+
+        for (name, labels), value in counters:
+            header(name)
+            lines.append(f"{name}{_labels(labels)} {_number(value)}")
+        for (name, labels), buckets, total, count in histograms:
+            header(name)
+            for bound, cumulative in buckets:
+                le = '+Inf' if bound == float('inf') else _number(bound)
+                lines.append(f"{name}_bucket{_labels(labels + (('le', le),))} {cumulative}")
+            lines.append(f"{name}_sum{_labels(labels)} {_number(total)}")
+            lines.append(f"{name}_count{_labels(labels)} {count}")
+        return '\n'.join(lines) + '\n'
+
+
+def _labels(labels):
+    if not labels:
+        return ''
+    escaped = (
+        (name, str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+        for name, value in labels
+    )
+    return '{' + ','.join(f'{name}="{value}"' for name, value in escaped) + '}'
+
+
+def _number(value):
+    return repr(round(value, 6)) if isinstance(value, float) else str(value)
+
+
+REGISTRY = Registry()
+
+
+class RequestMetrics:
+    """What one request spent its time on"""
+
+    __slots__ = ('started', 'db_queries', 'db_time', 'upstream_calls', 'upstream_time',
+                 'cache_hits', 'cache_misses', 'spans')
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.db_queries = 0
+        self.db_time = 0.0
+        self.upstream_calls = 0
+        self.upstream_time = 0.0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.spans = {}
+
+    def server_timing(self, total):
+        """
+        Returns:
+            str: Server-Timing header value (durations in milliseconds)
+        """
+        entries = [f'db;dur={self.db_time * 1000:.1f};desc="{self.db_queries} queries"']
+        if self.upstream_calls:
+            entries.append(f'upstream;dur={self.upstream_time * 1000:.1f};desc="{self.upstream_calls} calls"')
+        if self.cache_hits or self.cache_misses:
+            entries.append(f'cache;desc="{self.cache_hits} hits, {self.cache_misses} misses"')
+        entries.extend(f'{name};dur={duration * 1000:.1f}' for name, duration in self.spans.items())
+        entries.append(f'total;dur={total * 1000:.1f}')
+        return ', '.join(entries)
+
+
+def begin_request():
+    """Start collecting for the current request (returns a token for end_request)"""
+    return _current.set(RequestMetrics())
+
+
+def end_request(token, request, response):
+    """
+    Stop collecting for the current request and record its totals
+
+    Returns:
+        RequestMetrics: What the request spent
+    """
+    current = _current.get()
+    _current.reset(token)
+    total = time.perf_counter() - current.started
+
+    match = getattr(request, 'resolver_match', None)
+    view = match.view_name if match is not None else 'unresolved'
+    labels = {'view': view, 'method': request.method}
+    REGISTRY.observe('travelmate_request_duration_seconds', labels, total,
+                     'Time to build a response, by view')
+    REGISTRY.inc('travelmate_requests_total', {**labels, 'status': response.status_code},
+                 help_text='Responses, by view and status code')
+    REGISTRY.inc('travelmate_db_queries_total', {'view': view}, current.db_queries,
+                 'Database queries, by view')
+    REGISTRY.inc('travelmate_db_query_seconds_total', {'view': view}, current.db_time,
+                 'Time spent in database queries, by view')
+    for name, duration in current.spans.items():
+        REGISTRY.observe('travelmate_span_duration_seconds', {'span': name}, duration,
+                         'Time spent in instrumented steps (recommendations, rendering, ...)')
+
+    if SERVER_TIMING:
+        response['Server-Timing'] = current.server_timing(total)
+    return current
+
+
+def record_query(execute, sql, params, many, context):
+    """Database execute wrapper timing every query run during a request"""
+    current = _current.get()
+    if current is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        current.db_queries += 1
+        current.db_time += time.perf_counter() - started
+
+
+def install_query_hook(connection, **kwargs):
+    """Add record_query to a database connection (once)"""
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+if ENABLED:
+    connection_created.connect(install_query_hook, dispatch_uid='trips.metrics.install_query_hook')
+
+
+def record_upstream(host, duration, failed=False):
+    """Record one call to an upstream host (including its retries)"""
+    if not ENABLED:
+        return
+    REGISTRY.observe('travelmate_upstream_request_duration_seconds', {'host': host}, duration,
+                     'Upstream API calls (including retries), by host')
+    if failed:
+        REGISTRY.inc('travelmate_upstream_failures_total', {'host': host},
+                     help_text='Upstream API calls that failed, by host')
+    current = _current.get()
+    if current is not None:
+        current.upstream_calls += 1
+        current.upstream_time += duration
+
+
+def record_cache(cache, result):
+    """
+    Record a cache lookup
+
+    Args:
+        cache (str): Cache name (e.g. a TieredCache namespace)
+        result (str): 'hit', 'miss' or 'stale'
+    """
+    if not ENABLED:
+        return
+    REGISTRY.inc('travelmate_cache_lookups_total', {'cache': cache, 'result': result},
+                 help_text='Cache lookups, by cache and result')
+    current = _current.get()
+    if current is not None:
+        if result == 'miss':
+            current.cache_misses += 1
+        else:
+            current.cache_hits += 1
+
+
+class _Span:
+    __slots__ = ('name', 'started')
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+
+    def __exit__(self, *exc_info):
+        current = _current.get()
+        if current is not None:
+            spans = current.spans
+            spans[self.name] = spans.get(self.name, 0.0) + time.perf_counter() - self.started
+
+
+_NO_SPAN = nullcontext()
+
+
+def span(name):
+    """
+    Time a block as a named step of the current request
+
+        with metrics.span('recommendations'):
+            ...
+
+    Returns:
+        A context manager (a shared no-op one when metrics are off or there
+        is no request being measured)
+    """
+    if not ENABLED or _current.get() is None:
+        return _NO_SPAN
+    return _Span(name)
+
+
+def cache_hit_ratios():
+    """Hit ratio of each cache seen by record_cache, from the lookup counters"""
+    ratios = {}
+    for labels, value in REGISTRY.counters('travelmate_cache_lookups_total'):
+        hits, lookups = ratios.get(labels['cache'], (0, 0))
+        ratios[labels['cache']] = (hits + (value if labels['result'] != 'miss' else 0), lookups + value)
+    return {cache: hits / lookups for cache, (hits, lookups) in ratios.items() if lookups}
+
+
+def render():
+    """The registry plus derived cache hit ratios, in Prometheus text format"""
+    lines = [REGISTRY.render()]
+    ratios = cache_hit_ratios()
+    if ratios:
+        lines.append('# HELP travelmate_cache_hit_ratio Share of lookups answered from the cache\n')
+        lines.append('# TYPE travelmate_cache_hit_ratio gauge\n')
+        lines.extend(
+            f'travelmate_cache_hit_ratio{_labels((("cache", cache),))} {_number(ratio)}\n'
+            for cache, ratio in sorted(ratios.items())
+        )
+    return ''.join(lines)
+
+
+def metrics_view(request):
+    """
+    Prometheus scrape endpoint (/metrics)
+
+    Readable by staff users, or with `Authorization: Bearer <METRICS_TOKEN>`
+    when settings.METRICS_TOKEN is set. Each worker process reports its own
+    numbers.
+    """
+    if not ENABLED:
+        raise Http404("Request metrics are disabled.")
+    authorization = request.headers.get('Authorization', '')
+    token_ok = bool(METRICS_TOKEN) and hmac.compare_digest(authorization, f"Bearer {METRICS_TOKEN}")
+    if not token_ok and not (request.user.is_authenticated and request.user.is_staff):
+        return HttpResponseForbidden("Metrics are only available to staff or with the metrics token.")
+    return HttpResponse(render(), content_type='text/plain; version=0.0.4; charset=utf-8')
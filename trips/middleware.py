@@ -0,0 +1,161 @@
+# trips/middleware.py
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.urls import Resolver404, resolve
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+
+from . import metrics, profiling
+from .models import RequestProfile
+
+
+class MetricsMiddleware:
+    """
+    Measures every request (see trips/metrics.py): latency by view, database
+    queries, upstream calls, cache lookups and timed spans, reported in a
+    Server-Timing header and at /metrics
+
+    Removes itself from the middleware chain when settings.REQUEST_METRICS
+    is off. Works under both WSGI and ASGI.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not metrics.ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+        # Connections opened before the middleware loaded miss connection_created
+        for connection in connections.all(initialized_only=True):
+            metrics.install_query_hook(connection)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        token = metrics.begin_request()
+        response = self.get_response(request)
+        metrics.end_request(token, request, response)
+        return response
+
+    async def __acall__(self, request):
+        token = metrics.begin_request()
+        response = await self.get_response(request)
+        metrics.end_request(token, request, response)
+        return response
+
+
+class ProfilingMiddleware:
+    """
+    Profiles a single request through a trips view when asked to (see
+    trips/profiling.py) and stores the result as a RequestProfile
+
+    Requests without an X-Profile header or ?_profile= parameter pass
+    straight through. Under ASGI only the event loop thread is profiled;
+    sync views running in the thread pool show up as waiting.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not profiling.ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        if profiling.HEADER not in request.headers and profiling.QUERY_PARAMETER not in request.GET:
+            return self.get_response(request)
+        mode, view_name = self._profiling(request)
+        if mode is None:
+            return self.get_response(request)
+        profiler = profiling.profiler_for(mode)
+        started = time.perf_counter()
+        profiler.start()
+        try:
+            response = self.get_response(request)
+        finally:
+            profiler.stop()
+        duration = time.perf_counter() - started
+        return self._save(request, response, profiler, view_name, duration)
+
+    async def __acall__(self, request):
+        if profiling.HEADER not in request.headers and profiling.QUERY_PARAMETER not in request.GET:
+            return await self.get_response(request)
+        mode, view_name = await sync_to_async(self._profiling)(request)
+        if mode is None:
+            return await self.get_response(request)
+        profiler = profiling.profiler_for(mode)
+        started = time.perf_counter()
+        profiler.start()
+        try:
+            response = await self.get_response(request)
+        finally:
+            profiler.stop()
+        duration = time.perf_counter() - started
+        return await sync_to_async(self._save)(request, response, profiler, view_name, duration)
+
+    def _profiling(self, request):
+        """
+        Whether and how to profile a request that asked for it
+
+        Returns:
+            tuple: (mode or None, dotted name of the view)
+        """
+        mode, signed = profiling.requested_mode(request)
+        if mode is None:
+            return None, ''
+        try:
+            match = resolve(request.path_info)
+        except Resolver404:
+            return None, ''
+        view = getattr(match.func, 'view_class', match.func)  # Class-based and DRF views
+        view_name = f"{view.__module__}.{getattr(view, '__qualname__', type(view).__name__)}"
+        if not view.__module__.startswith('trips.'):
+            return None, view_name
+        if not signed and not self._is_staff(request):
+            return None, view_name
+        return mode, view_name
+
+    @staticmethod
+    def _is_staff(request):
+        """Staff session, or a staff user's JWT (API requests carry no session)"""
+        user = getattr(request, 'user', None)
+        if user is not None and user.is_staff:
+            return True
+        try:
+            authenticated = JWTAuthentication().authenticate(request)
+        except AuthenticationFailed:
+            return False
+        return authenticated is not None and authenticated[0].is_staff
+
+    @staticmethod
+    def _save(request, response, profiler, view_name, duration):
+        user = getattr(request, 'user', None)
+        entry = RequestProfile.objects.create(
+            user=user if user is not None and user.is_authenticated else None,
+            method=request.method,
+            path=request.get_full_path()[:2048],
+            view_name=view_name[:255],
+            mode=profiler.mode,
+            status_code=response.status_code,
+            duration_ms=round(duration * 1000, 3),
+            sample_count=profiler.samples,
+            pstats=profiler.pstats(),
+            collapsed=profiler.collapsed(),
+        )
+        stale = RequestProfile.objects.order_by('-created_at', '-pk').values_list('pk', flat=True)[profiling.KEEP_PROFILES:]
+        RequestProfile.objects.filter(pk__in=list(stale)).delete()
+        response['X-Profile-Id'] = str(entry.pk)
+        return response
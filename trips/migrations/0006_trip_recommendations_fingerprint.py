@@ -0,0 +1,18 @@
+# Generated by Django 5.2 on 2026-10-18 19:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('trips', '0005_geocodecacheentry'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='trip',
+            name='recommendations_fingerprint',
+            field=models.CharField(blank=True, default='', max_length=64),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2 on 2026-10-18 19:39
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('trips', '0007_trip_trip_user_start_idx'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='trip',
+            index=models.Index(fields=['travel_end'], name='trip_end_idx'),
+        ),
+    ]
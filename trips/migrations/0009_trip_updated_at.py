@@ -0,0 +1,18 @@
+# Generated by Django 5.2 on 2026-10-18 19:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('trips', '0008_trip_trip_end_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='trip',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
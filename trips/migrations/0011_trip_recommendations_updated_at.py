@@ -0,0 +1,18 @@
+# Generated by Django 5.2 on 2026-10-18 20:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('trips', '0010_requestprofile'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='trip',
+            name='recommendations_updated_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -13,8 +13,19 @@ class Trip(models.Model):
     activities = models.TextField(blank=True)
     packing_list = models.JSONField(default=list, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)  # Versions the trip for HTTP caching (ETag/Last-Modified)
     meeting_schedule = models.TextField(blank=True, null=True)
     recommendations = models.JSONField(default=dict, blank=True)  # Store AI-generated recommendations
+    recommendations_fingerprint = models.CharField(max_length=64, blank=True, default='')  # Inputs recommendations were built from
+    recommendations_updated_at = models.DateTimeField(null=True, blank=True)  # Versions the stored recommendations (updated_at is left alone)
+
+    class Meta:
+        indexes = [
+            # Serves the per-user trip listing, ordered by start date
+            models.Index(fields=['user', 'travel_start'], name='trip_user_start_idx'),
+            # Lets the forecast prefetcher skip past trips
+            models.Index(fields=['travel_end'], name='trip_end_idx'),
+        ]
 
     def __str__(self):
         return f"{self.destination} ({self.travel_start} - {self.travel_end})"
@@ -62,3 +73,49 @@ class Profile(models.Model):
         return f"{self.user.username} - {self.get_traveler_type_display()}"
 
 
+class GeocodeCacheEntry(models.Model):
+    """Geocoding result for a normalized destination name.
+
+    Unknown names are cached too (with null coordinates) so they aren't
+    looked up again on every trip save.
+    """
+    name = models.CharField(max_length=255, unique=True)  # Normalized with gazetteer.fold()
+    latitude = models.FloatField(null=True, blank=True)
+    longitude = models.FloatField(null=True, blank=True)
+    hit_count = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Geocode Cache Entry"
+        verbose_name_plural = "Geocode Cache Entries"
+
+    def __str__(self):
+        if self.latitude is None:
+            return f"{self.name} (not found)"
+        return f"{self.name} ({self.latitude}, {self.longitude})"
+
+
+class RequestProfile(models.Model):
+    """Profile of a single request, captured on demand (see trips/profiling.py)"""
+    MODES = (
+        ('deterministic', 'Deterministic (cProfile)'),
+        ('sampling', 'Sampling'),
+    )
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+    user = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    method = models.CharField(max_length=10)
+    path = models.CharField(max_length=2048)
+    view_name = models.CharField(max_length=255, blank=True)
+    mode = models.CharField(max_length=20, choices=MODES)
+    status_code = models.PositiveSmallIntegerField()
+    duration_ms = models.FloatField()
+    sample_count = models.PositiveIntegerField(default=0)  # Stack samples, or function calls for cProfile
+    pstats = models.BinaryField(null=True, blank=True)  # marshal'ed pstats data (deterministic mode only)
+    collapsed = models.TextField(blank=True)  # Collapsed stacks for flame graph tools
+
+    class Meta:
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"{self.method} {self.path} ({self.mode}, {self.duration_ms:.1f} ms)"
@@ -0,0 +1,17 @@
+# trips/pagination.py
+from rest_framework.pagination import CursorPagination
+
+
+class TripCursorPagination(CursorPagination):
+    """
+    Keyset pagination for trip listings.
+
+    Pages are fetched with `WHERE travel_start > <cursor>` on the
+    (user, travel_start) index rather than an OFFSET, so page N costs the same
+    as page 1 however many trips a user has.
+    """
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 200
+    # id breaks ties between trips starting on the same day
+    ordering = ('travel_start', 'id')
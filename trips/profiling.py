@@ -0,0 +1,248 @@
+# trips/profiling.py
+#
+# On-demand profiling of single requests (see ProfilingMiddleware in
+# trips/middleware.py). A request asks to be profiled with an X-Profile
+# header (or ?_profile=): staff users may send the mode itself, anyone else
+# needs a token signed with the project's SECRET_KEY (make_token, or
+# `python manage.py profile_token`). Profiles are stored as RequestProfile
+# rows holding the pstats data and collapsed stacks (the input format of
+# flamegraph.pl, speedscope and similar tools).
+import cProfile
+import marshal
+import os
+import sys
+import threading
+from collections import Counter
+
+from django.conf import settings
+from django.core import signing
+
+ENABLED = getattr(settings, 'REQUEST_PROFILING', False)
+
+# Seconds a signed profiling token stays valid
+TOKEN_MAX_AGE = getattr(settings, 'PROFILING_TOKEN_MAX_AGE', 3600)
+
+# Seconds between stack samples in sampling mode
+SAMPLE_INTERVAL = getattr(settings, 'PROFILING_SAMPLE_INTERVAL', 0.001)
+
+# Stored profiles kept; older ones are deleted as new ones are saved
+KEEP_PROFILES = getattr(settings, 'PROFILING_KEEP', 200)
+
+# Stacks with less than this share of a profile's time are folded into one
+# '[pruned]' entry, and at most this many bytes of stacks are stored
+MIN_FRACTION = getattr(settings, 'PROFILING_MIN_FRACTION', 0.001)
+MAX_COLLAPSED_BYTES = getattr(settings, 'PROFILING_MAX_COLLAPSED_BYTES', 256 * 1024)
+
+PRUNED = '[pruned]'
+
+HEADER = 'X-Profile'
+QUERY_PARAMETER = '_profile'
+
+DETERMINISTIC = 'deterministic'
+SAMPLING = 'sampling'
+MODES = (DETERMINISTIC, SAMPLING)
+
+_SALT = 'trips.profiling'
+
+
+def make_token(mode=SAMPLING):
+    """
+    A signed X-Profile value that lets any request be profiled (until
+    TOKEN_MAX_AGE seconds from now)
+    """
+    return signing.TimestampSigner(salt=_SALT).sign(mode)
+
+
+def requested_mode(request):
+    """
+    The profiling a request asks for
+
+    Returns:
+        tuple: (mode or None, whether the value was a valid signed token)
+    """
+    value = request.headers.get(HEADER) or request.GET.get(QUERY_PARAMETER)
+    if not value:
+        return None, False
+    if value in MODES:
+        return value, False
+    if value == '1':
+        return SAMPLING, False
+    try:
+        mode = signing.TimestampSigner(salt=_SALT).unsign(value, max_age=TOKEN_MAX_AGE)
+    except signing.BadSignature:
+        return None, False
+    return (mode, True) if mode in MODES else (None, False)
+
+
+def frame_label(filename, lineno, name):
+    """How a function appears in collapsed stacks: 'name (dir/file.py:line)'"""
+    if filename == '~':  # Built-ins have no source file
+        return name
+    short = os.sep.join(filename.split(os.sep)[-2:])
+    return f"{name} ({short}:{lineno})".replace(';', ',')
+
+
+class DeterministicProfiler:
+    """cProfile around the request; collapsed stacks are derived from the call graph"""
+
+    mode = DETERMINISTIC
+
+    def __init__(self):
+        self._profile = cProfile.Profile()
+
+    def start(self):
+        self._profile.enable()
+
+    def stop(self):
+        self._profile.disable()
+        self._profile.create_stats()
+
+    def pstats(self):
+        """The profile in pstats' file format (load with pstats.Stats(path))"""
+        return marshal.dumps(self._profile.stats)
+
+    def collapsed(self):
+        return collapse_stats(self._profile.stats)
+
+    @property
+    def samples(self):
+        return sum(calls for _, calls, _, _, _ in self._profile.stats.values())
+
+
+class SamplingProfiler:
+    """
+    Samples the request thread's stack every SAMPLE_INTERVAL seconds from a
+    helper thread, so the request itself runs at full speed
+    """
+
+    mode = SAMPLING
+
+    def __init__(self, interval=SAMPLE_INTERVAL):
+        self.interval = interval
+        self.counts = Counter()
+        self._target = threading.get_ident()
+        self._outer = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='request-profiler', daemon=True)
+
+    def start(self):
+        # Frames outside the caller (the server's and the middleware chain's
+        # above it) are the same in every sample, so they're left out
+        frame, self._outer = sys._getframe(1).f_back, 0
+        while frame is not None:
+            self._outer += 1
+            frame = frame.f_back
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self._target)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(frame_label(code.co_filename, code.co_firstlineno, code.co_name))
+                frame = frame.f_back
+            stack = stack[:len(stack) - self._outer]
+            if stack:
+                self.counts[';'.join(reversed(stack))] += 1
+
+    def pstats(self):
+        return None  # Samples carry no call counts to build pstats from
+
+    def collapsed(self):
+        return format_collapsed(self.counts)
+
+    @property
+    def samples(self):
+        return sum(self.counts.values())
+
+
+def format_collapsed(counts, min_fraction=MIN_FRACTION, max_bytes=MAX_COLLAPSED_BYTES):
+    """
+    Collapsed-stack text for weighted stacks, heaviest first
+
+    Stacks below min_fraction of the total, and any beyond max_bytes of
+    output, are summed into a single PRUNED line so the total is kept.
+
+    Args:
+        counts (Counter): 'frame;frame;...' -> weight
+
+    Returns:
+        str: One 'frame;frame;... weight' line per stack
+    """
+    threshold = sum(counts.values()) * min_fraction
+    lines, size, pruned = [], 0, 0
+    for stack, count in counts.most_common():
+        line = f"{stack} {count}\n"
+        if count < threshold or size + len(line) > max_bytes:
+            pruned += count
+            continue
+        lines.append(line)
+        size += len(line)
+    if pruned:
+        lines.append(f"{PRUNED} {pruned}\n")
+    return ''.join(lines)
+
+
+def collapse_stats(stats, min_fraction=MIN_FRACTION, max_bytes=MAX_COLLAPSED_BYTES, max_depth=200):
+    """
+    Collapsed stacks from cProfile stats, weighted in microseconds
+
+    cProfile only records caller/callee pairs, so each function's time is
+    split among the paths reaching it in proportion to the time spent
+    through each caller (the usual approximation for flame graphs of
+    deterministic profiles). Paths with less than min_fraction of the
+    profile's time aren't followed (see format_collapsed).
+
+    Args:
+        stats (dict): Profile.stats / pstats.Stats.stats
+
+    Returns:
+        str: One 'frame;frame;... microseconds' line per path
+    """
+    children = {}
+    for callee, (_, _, _, _, callers) in stats.items():
+        for caller, edge in callers.items():
+            children.setdefault(caller, []).append((callee, edge[3]))
+    # The outermost frames were entered before profiling started, so some of
+    # their calls have no recorded caller
+    roots = [
+        func for func, (_, calls, _, _, callers) in stats.items()
+        if sum(edge[0] for edge in callers.values()) < calls
+    ]
+
+    total = sum(stats[root][3] for root in roots) * 1_000_000
+    min_microseconds = max(1, total * min_fraction)
+    counts = Counter()
+
+    def walk(func, path, labels, share):
+        _, _, own, cumulative, _ = stats[func]
+        labels = labels + [frame_label(*func)]
+        weight = int(own * share * 1_000_000)
+        if weight >= min_microseconds:
+            counts[';'.join(labels)] += weight
+        if len(labels) >= max_depth:
+            return
+        for child, edge_time in children.get(func, ()):
+            child_cumulative = stats[child][3]
+            if child in path or not child_cumulative:
+                continue  # Recursion is folded into the first occurrence
+            child_share = share * min(1.0, edge_time / child_cumulative)
+            if child_cumulative * child_share * 1_000_000 >= min_microseconds:
+                walk(child, path | {child}, labels, child_share)
+
+    for root in roots:
+        walk(root, frozenset({root}), [], 1.0)
+    # Time in the subtrees that weren't followed
+    missing = int(total) - sum(counts.values())
+    if missing > 0:
+        counts[PRUNED] += missing
+    return format_collapsed(counts, min_fraction, max_bytes)
+
+
+def profiler_for(mode):
+    return DeterministicProfiler() if mode == DETERMINISTIC else SamplingProfiler()
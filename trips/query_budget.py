@@ -0,0 +1,48 @@
+# trips/query_budget.py
+#
+# Flags N+1 regressions in the HTML views: a view wrapped with
+# @query_budget(n) reports requests that run more than n database queries.
+# The exact counts are pinned by assertNumQueries tests (trips/tests).
+from functools import wraps
+
+from django.db import connection
+
+
+class QueryCounter:
+    """Counts the queries run on a connection while installed as an execute wrapper"""
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+def query_budget(limit):
+    """
+    Report requests to a view that run more database queries than expected
+
+    Queries made before the view runs (session and user lookups by
+    middleware) are not counted. Over-budget requests are logged and
+    served as usual.
+
+    Args:
+        limit (int): Maximum number of queries per request
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            counter = QueryCounter()
+            with connection.execute_wrapper(counter):
+                response = view(request, *args, **kwargs)
+                # Template responses run their queries when rendered
+                if hasattr(response, 'render') and not getattr(response, 'is_rendered', True):
+                    response.render()
+
+            if counter.count > limit:
+                print(f"Query budget exceeded: {view.__name__} ran {counter.count} queries (budget: {limit})")
+            return response
+        wrapper.query_budget = limit
+        return wrapper
+    return decorator
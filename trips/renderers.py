@@ -0,0 +1,75 @@
+# trips/renderers.py
+#
+# DRF renderer/parser and a JsonResponse replacement backed by trips.jsonlib.
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import HttpResponse
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+from . import jsonlib, metrics
+
+# Line/paragraph separators are valid JSON but not valid JavaScript
+_UNSAFE_SEPARATORS = ((b'\xe2\x80\xa8', b'\\u2028'), (b'\xe2\x80\xa9', b'\\u2029'))
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer that encodes with trips.jsonlib
+
+    Falls back to DRF's own rendering for the cases the fast path doesn't
+    cover: indented output (e.g. `Accept: application/json; indent=4`),
+    ASCII-only output (UNICODE_JSON = False) and COMPACT_JSON = False.
+    """
+
+    _default = JSONEncoder().default
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+
+        with metrics.span('render'):
+            return self._render(data, accepted_media_type, renderer_context)
+
+    def _render(self, data, accepted_media_type, renderer_context):
+        if (not jsonlib.USE_ORJSON or self.ensure_ascii or not self.compact
+                or self.get_indent(accepted_media_type, renderer_context or {})):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        ret = jsonlib.dumps(data, default=self._default)
+        if b'\xe2\x80' in ret:
+            for separator, escaped in _UNSAFE_SEPARATORS:
+                ret = ret.replace(separator, escaped)
+        return ret
+
+
+class FastJSONParser(JSONParser):
+    """JSONParser that decodes with trips.jsonlib"""
+
+    renderer_class = FastJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        if not jsonlib.USE_ORJSON:
+            return super().parse(stream, media_type, parser_context)
+
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+        try:
+            data = stream.read()
+            if encoding.lower().replace('-', '') != 'utf8':
+                data = data.decode(encoding)
+            return jsonlib.loads(data)
+        except ValueError as exc:
+            raise ParseError('JSON parse error - %s' % str(exc))
+
+
+class FastJsonResponse(HttpResponse):
+    """Drop-in for django.http.JsonResponse (dict data only) using trips.jsonlib"""
+
+    _default = DjangoJSONEncoder().default
+
+    def __init__(self, data, **kwargs):
+        kwargs.setdefault('content_type', 'application/json')
+        super().__init__(content=jsonlib.dumps(data, default=self._default), **kwargs)
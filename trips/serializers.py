@@ -2,11 +2,38 @@
 from rest_framework import serializers
 from .models import Trip, KeyFeature, UserStory
 
-class TripSerializer(serializers.ModelSerializer):
+class SparseFieldsMixin:
+    """
+    Lets clients ask for a subset of fields with `?fields=id,destination`.
+    Unknown names are ignored; without the parameter every field is returned.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        requested = requested_fields(self.context.get('request'))
+        if requested:
+            for name in set(self.fields) - requested:
+                self.fields.pop(name)
+
+
+def requested_fields(request):
+    """
+    Field names from a request's `fields` query parameter
+
+    Returns:
+        set: Requested names, or None if the parameter is absent or empty
+    """
+    if request is None or request.method != 'GET':
+        return None
+    fields = {name.strip() for name in request.query_params.get('fields', '').split(',') if name.strip()}
+    return fields or None
+
+
+class TripSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Trip
         fields = ['id', 'destination', 'latitude', 'longitude', 'travel_start', 'travel_end', 'activities', 
-                 'packing_list', 'meeting_schedule', 'recommendations', 'created_at']
+                 'packing_list', 'meeting_schedule', 'recommendations', 'created_at', 'updated_at']
 
 class KeyFeatureSerializer(serializers.ModelSerializer):
     class Meta:
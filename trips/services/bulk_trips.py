@@ -0,0 +1,245 @@
+"""
+Bulk trip import and export in NDJSON or CSV.
+
+Imports read the input a line at a time and work through it in chunks: each
+chunk is validated with TripSerializer, the distinct destinations that came
+without coordinates are geocoded once (GeocodingService.get_coordinates_many)
+and the valid trips are written with one bulk_create inside a transaction.
+Invalid rows are skipped and reported by line number. Exports stream the
+user's trips straight from a database cursor, so neither direction holds a
+whole account in memory.
+"""
+import codecs
+import csv
+from itertools import islice
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+
+from .. import jsonlib
+from ..models import Trip
+from ..serializers import TripSerializer
+from .geocoding_service import GeocodingService
+
+FORMATS = ('ndjson', 'csv')
+
+CONTENT_TYPES = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv',
+}
+
+# Trip fields read from import rows (anything else is ignored)
+IMPORT_FIELDS = (
+    'destination', 'latitude', 'longitude', 'travel_start', 'travel_end',
+    'activities', 'packing_list', 'meeting_schedule',
+)
+
+EXPORT_FIELDS = ('id',) + IMPORT_FIELDS
+
+# Columns a CSV import must have
+REQUIRED_COLUMNS = ('destination', 'travel_start', 'travel_end')
+
+CHUNK_SIZE = 500
+
+# Import errors reported back in full; the rest are only counted
+MAX_REPORTED_ERRORS = 100
+
+_encode_default = DjangoJSONEncoder().default
+
+
+class ImportFormatError(ValueError):
+    """Raised for input that can't be read as the requested format at all"""
+
+
+def format_for(content_type, default='ndjson'):
+    """Import/export format for a Content-Type or Accept value"""
+    media_type = (content_type or '').split(';')[0].strip().lower()
+    for name, known in CONTENT_TYPES.items():
+        if media_type == known:
+            return name
+    if media_type in ('application/jsonl', 'application/json-seq', 'application/json'):
+        return 'ndjson'
+    return default
+
+
+def read_ndjson(lines):
+    """
+    Rows of an NDJSON stream
+
+    Args:
+        lines (iterable): Lines of UTF-8 encoded bytes
+
+    Yields:
+        tuple: (line number, dict or None if the line isn't a JSON object)
+    """
+    for number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            row = jsonlib.loads(line)
+        except jsonlib.JSONDecodeError:
+            row = None
+        yield number, row if isinstance(row, dict) else None
+
+
+def read_csv(lines):
+    """
+    Rows of a CSV stream with a header line
+
+    Empty cells are left out (so optional fields take their defaults), and
+    packing_list may be a JSON list or a ';'-separated list.
+
+    Args:
+        lines (iterable): Lines of UTF-8 encoded bytes
+
+    Yields:
+        tuple: (line number, dict)
+    """
+    reader = csv.DictReader(codecs.iterdecode(lines, 'utf-8-sig'))
+    if reader.fieldnames is None:
+        return
+    missing = [name for name in REQUIRED_COLUMNS if name not in reader.fieldnames]
+    if missing:
+        raise ImportFormatError(f"CSV header is missing {', '.join(missing)}")
+
+    for row in reader:
+        row = {name: value for name, value in row.items() if name and value not in (None, '')}
+        packing_list = row.get('packing_list')
+        if packing_list is not None:
+            if packing_list.lstrip().startswith('['):
+                try:
+                    row['packing_list'] = jsonlib.loads(packing_list)
+                except jsonlib.JSONDecodeError:
+                    pass  # Left as a string, which the serializer reports
+            else:
+                row['packing_list'] = [item.strip() for item in packing_list.split(';') if item.strip()]
+        yield reader.line_num, row
+
+
+READERS = {'ndjson': read_ndjson, 'csv': read_csv}
+
+
+def import_trips(user, lines, file_format='ndjson', chunk_size=CHUNK_SIZE):
+    """
+    Create trips for a user from an NDJSON or CSV stream
+
+    Args:
+        user (User): Owner of the new trips
+        lines (iterable): Lines of UTF-8 encoded bytes (an open binary file,
+            or a request)
+        file_format (str): 'ndjson' or 'csv'
+        chunk_size (int): Rows validated and written per transaction
+
+    Returns:
+        dict: Counts of rows read, trips created, rows that failed and
+            destinations geocoded (and not found), plus the first
+            MAX_REPORTED_ERRORS errors as {'line': ..., 'errors': ...}
+
+    Raises:
+        ImportFormatError: If the stream can't be read as file_format
+    """
+    if file_format not in READERS:
+        raise ImportFormatError(f"Unknown format {file_format!r} (expected one of {', '.join(FORMATS)})")
+
+    result = {'rows': 0, 'created': 0, 'failed': 0, 'geocoded': 0, 'not_geocoded': 0, 'errors': []}
+
+    def fail(number, errors):
+        result['failed'] += 1
+        if len(result['errors']) < MAX_REPORTED_ERRORS:
+            result['errors'].append({'line': number, 'errors': errors})
+
+    rows = READERS[file_format](lines)
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            break
+        result['rows'] += len(chunk)
+
+        valid = []
+        for number, row in chunk:
+            if row is None:
+                fail(number, {'non_field_errors': ['Line is not a JSON object.']})
+                continue
+            serializer = TripSerializer(data={name: row[name] for name in IMPORT_FIELDS if name in row})
+            if serializer.is_valid():
+                valid.append(serializer.validated_data)
+            else:
+                fail(number, serializer.errors)
+
+        # Geocode outside the transaction, each new destination once
+        unlocated = {
+            data['destination'] for data in valid
+            if data.get('latitude') is None or data.get('longitude') is None
+        }
+        coordinates = GeocodingService.get_coordinates_many(unlocated) if unlocated else {}
+        found = sum(1 for latitude, _ in coordinates.values() if latitude is not None)
+        result['geocoded'] += found
+        result['not_geocoded'] += len(coordinates) - found
+
+        trips = []
+        for data in valid:
+            trip = Trip(user=user, **data)
+            if trip.latitude is None or trip.longitude is None:
+                name = GeocodingService.cache_name(trip.destination)
+                trip.latitude, trip.longitude = coordinates.get(name, (None, None))
+            trips.append(trip)
+
+        with transaction.atomic():
+            Trip.objects.bulk_create(trips, batch_size=chunk_size)
+        result['created'] += len(trips)
+
+    return result
+
+
+def export_trips(user, file_format='ndjson', chunk_size=2000):
+    """
+    Stream a user's trips as NDJSON or CSV
+
+    Rows are read with a server-side cursor where the database supports it
+    (QuerySet.iterator), so memory use doesn't grow with the account.
+
+    Args:
+        user (User): Owner of the trips
+        file_format (str): 'ndjson' or 'csv'
+        chunk_size (int): Rows fetched from the database at a time
+
+    Yields:
+        bytes: The export, a line (or header) at a time
+    """
+    rows = (
+        Trip.objects.filter(user=user)
+        .order_by('travel_start', 'id')
+        .values_list(*EXPORT_FIELDS)
+        .iterator(chunk_size=chunk_size)
+    )
+
+    if file_format == 'csv':
+        buffer = _LineBuffer()
+        writer = csv.writer(buffer)
+        writer.writerow(EXPORT_FIELDS)
+        yield buffer.pop()
+        packing_list = EXPORT_FIELDS.index('packing_list')
+        for row in rows:
+            row = list(row)
+            row[packing_list] = jsonlib.dumps(row[packing_list]).decode()
+            writer.writerow(row)
+            yield buffer.pop()
+        return
+
+    for row in rows:
+        yield jsonlib.dumps(dict(zip(EXPORT_FIELDS, row)), default=_encode_default) + b'\n'
+
+
+class _LineBuffer:
+    """File-like target for csv.writer that hands back each written line"""
+
+    def __init__(self):
+        self._parts = []
+
+    def write(self, value):
+        self._parts.append(value)
+
+    def pop(self):
+        line = ''.join(self._parts).encode()
+        self._parts.clear()
+        return line
@@ -0,0 +1,269 @@
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from django.core.cache import caches
+
+from .. import metrics
+
+
+# How each counter is reported to trips.metrics
+_METRIC_RESULTS = {'local_hits': 'hit', 'shared_hits': 'hit', 'misses': 'miss', 'stale_hits': 'stale'}
+
+
+class TieredCache:
+    """
+    Two-level cache: a small in-process LRU in front of a shared Django cache.
+
+    The local tier answers repeat lookups without any I/O. The shared tier
+    (any backend configured in settings.CACHES) lets several worker processes
+    reuse each other's upstream responses. Values are deep-copied on the way
+    in and out so callers may freely mutate what they get back.
+
+    Each entry has a soft TTL (after which get() misses) and is kept for
+    stale_ttl seconds more, during which get_entry() still returns it so
+    callers can serve it while refreshing it.
+    """
+
+    def __init__(self, namespace, max_entries=1024, shared_alias='default', stale_ttl=0):
+        """
+        Args:
+            namespace (str): Prefix for keys stored in the shared tier
+            max_entries (int): Maximum number of entries in the local tier
+            shared_alias (str): Django cache alias for the shared tier, or None
+                to keep the cache process-local
+            stale_ttl (int): How long expired entries stay available to
+                get_entry(), e.g. as a fallback while an upstream is down
+        """
+        self.namespace = namespace
+        self.max_entries = max_entries
+        self.shared_alias = shared_alias
+        self.stale_ttl = stale_ttl
+        self._local = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {
+            'local_hits': 0,
+            'shared_hits': 0,
+            'misses': 0,
+            'stale_hits': 0,
+            'sets': 0,
+            'evictions': 0,
+        }
+
+    def _shared(self):
+        if not self.shared_alias:
+            return None
+        return caches[self.shared_alias]
+
+    def _shared_key(self, key):
+        return f"{self.namespace}:{key}"
+
+    def _count(self, name):
+        with self._lock:
+            self._stats[name] += 1
+        if name in _METRIC_RESULTS:
+            metrics.record_cache(self.namespace, _METRIC_RESULTS[name])
+
+    def _store_local(self, key, entry):
+        with self._lock:
+            self._local[key] = entry
+            self._local.move_to_end(key)
+            while len(self._local) > self.max_entries:
+                self._local.popitem(last=False)
+                self._stats['evictions'] += 1
+
+    def _get_local(self, key, now, stale=False):
+        """
+        Local entry for a key, marked as most recently used (no hit or miss
+        is counted)
+
+        Entries past their hard TTL are dropped. Expired entries within it
+        are only returned with stale=True.
+        """
+        with self._lock:
+            entry = self._local.get(key)
+            if entry is None:
+                return None
+            if entry[0] + self.stale_ttl <= now:
+                del self._local[key]
+                return None
+            if entry[0] <= now and not stale:
+                return None
+            self._local.move_to_end(key)
+        return entry
+
+    def get(self, key):
+        """
+        Look up a key in the local tier, then the shared tier
+
+        Returns:
+            The cached value, or None on a miss or an expired entry
+        """
+        entry, tier = self._lookup(key, time.time())
+        self._count(tier)
+        return copy.deepcopy(entry[1]) if entry is not None else None
+
+    async def aget(self, key):
+        """Async version of get() that doesn't block the event loop on the shared tier"""
+        entry, tier = await self._alookup(key, time.time())
+        self._count(tier)
+        return copy.deepcopy(entry[1]) if entry is not None else None
+
+    def peek(self, key):
+        """
+        get() without counting a hit or miss, e.g. to re-check a key that
+        was just counted as a miss
+        """
+        entry, _ = self._lookup(key, time.time())
+        return copy.deepcopy(entry[1]) if entry is not None else None
+
+    async def apeek(self, key):
+        """Async version of peek()"""
+        entry, _ = await self._alookup(key, time.time())
+        return copy.deepcopy(entry[1]) if entry is not None else None
+
+    def _lookup(self, key, now):
+        """
+        Returns:
+            tuple: (fresh entry or None, name of the counter it belongs to)
+        """
+        entry = self._get_local(key, now)
+        if entry is not None:
+            return entry, 'local_hits'
+
+        shared = self._shared()
+        if shared is not None:
+            entry = shared.get(self._shared_key(key))
+            if entry is not None and entry[0] > now:
+                # Promote into the local tier for the rest of its lifetime
+                self._store_local(key, entry)
+                return entry, 'shared_hits'
+        return None, 'misses'
+
+    async def _alookup(self, key, now):
+        entry = self._get_local(key, now)
+        if entry is not None:
+            return entry, 'local_hits'
+
+        shared = self._shared()
+        if shared is not None:
+            entry = await shared.aget(self._shared_key(key))
+            if entry is not None and entry[0] > now:
+                self._store_local(key, entry)
+                return entry, 'shared_hits'
+        return None, 'misses'
+
+    def get_entry(self, key):
+        """
+        Look up a key, returning stale entries (expired less than stale_ttl
+        ago) as well as fresh ones
+
+        Returns:
+            tuple: (value, age in seconds, whether it is stale), or None if
+                there is nothing usable
+        """
+        now = time.time()
+        entry = self._get_local(key, now, stale=True)
+        tier = 'local_hits'
+        if entry is None:
+            shared = self._shared()
+            if shared is not None:
+                entry = shared.get(self._shared_key(key))
+                tier = 'shared_hits'
+        return self._entry_result(key, entry, tier, now)
+
+    async def aget_entry(self, key):
+        """Async version of get_entry()"""
+        now = time.time()
+        entry = self._get_local(key, now, stale=True)
+        tier = 'local_hits'
+        if entry is None:
+            shared = self._shared()
+            if shared is not None:
+                entry = await shared.aget(self._shared_key(key))
+                tier = 'shared_hits'
+        return self._entry_result(key, entry, tier, now)
+
+    def _entry_result(self, key, entry, tier, now):
+        if entry is None or entry[0] + self.stale_ttl <= now:
+            self._count('misses')
+            return None
+
+        if tier == 'shared_hits':
+            self._store_local(key, entry)
+        stale = entry[0] <= now
+        self._count('stale_hits' if stale else tier)
+        return copy.deepcopy(entry[1]), self._age(entry, now), stale
+
+    @staticmethod
+    def _age(entry, now):
+        # Entries are (expires_at, value, stored_at)
+        return max(0.0, now - entry[2]) if len(entry) > 2 else 0.0
+
+    def expires_in(self, key):
+        """
+        Seconds until a key expires (negative once expired but still kept
+        for get_entry), without counting a hit or miss
+
+        Returns:
+            float: Remaining lifetime, or None if the key isn't cached
+        """
+        with self._lock:
+            entry = self._local.get(key)
+        if entry is None:
+            shared = self._shared()
+            if shared is not None:
+                entry = shared.get(self._shared_key(key))
+        if entry is None:
+            return None
+        return entry[0] - time.time()
+
+    def set(self, key, value, ttl):
+        """
+        Store a value in both tiers
+
+        Args:
+            key (str): Cache key
+            value: Value to store (must be picklable for the shared tier)
+            ttl (int): Time to live in seconds
+        """
+        now = time.time()
+        entry = (now + ttl, copy.deepcopy(value), now)
+        self._store_local(key, entry)
+
+        shared = self._shared()
+        if shared is not None:
+            shared.set(self._shared_key(key), entry, timeout=ttl + self.stale_ttl)
+        self._count('sets')
+
+    async def aset(self, key, value, ttl):
+        """Async version of set()"""
+        now = time.time()
+        entry = (now + ttl, copy.deepcopy(value), now)
+        self._store_local(key, entry)
+
+        shared = self._shared()
+        if shared is not None:
+            await shared.aset(self._shared_key(key), entry, timeout=ttl + self.stale_ttl)
+        self._count('sets')
+
+    def clear(self):
+        """Drop every local entry and reset the counters"""
+        with self._lock:
+            self._local.clear()
+            for name in self._stats:
+                self._stats[name] = 0
+
+    def stats(self):
+        """
+        Returns:
+            dict: Hit/miss counters, current local size and overall hit ratio
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            stats['local_size'] = len(self._local)
+        lookups = stats['local_hits'] + stats['shared_hits'] + stats['misses']
+        hits = stats['local_hits'] + stats['shared_hits']
+        stats['hit_ratio'] = hits / lookups if lookups else 0.0
+        return stats
@@ -0,0 +1,124 @@
+"""
+Declarative clothing recommendation rules.
+
+RULES lists the advice for each traveler type by temperature band (from the
+day's maximum temperature) and precipitation band (from the day's maximum
+precipitation probability). At import the table is compiled into one tuple of
+advice per (traveler type, temperature band, precipitation band), so looking
+up a day is a bisection, a dict lookup and an index, and every day with the
+same weather shares the same immutable tuple.
+
+To add a traveler type or change the advice, edit RULES; band edges are in
+TEMPERATURE_THRESHOLDS and PRECIPITATION_THRESHOLDS.
+"""
+import hashlib
+from bisect import bisect_left
+
+# Upper edges (inclusive) of the cold, cool and mild bands; anything above
+# the last edge is hot
+TEMPERATURE_BANDS = ('cold', 'cool', 'mild', 'hot')
+TEMPERATURE_THRESHOLDS = {
+    False: (5, 15, 25),   # Celsius
+    True: (41, 59, 77),   # Fahrenheit
+}
+
+# Upper edges (inclusive, percent) of the dry and possible bands
+PRECIPITATION_BANDS = ('dry', 'possible', 'likely')
+PRECIPITATION_THRESHOLDS = (30, 60)
+
+DEFAULT_TRAVELER_TYPE = 'casual'
+
+RULES = {
+    'casual': {
+        'temperature': {
+            'hot': ("Light clothing like t-shirts and shorts",
+                    "Breathable fabrics recommended"),
+            'mild': ("Light jacket or sweater with pants",
+                     "Layered clothing recommended"),
+            'cool': ("Medium-weight jacket and layers",
+                     "Long sleeves and pants recommended"),
+            'cold': ("Heavy winter coat with layers",
+                     "Hat, scarf, and gloves recommended"),
+        },
+        'precipitation': {
+            'dry': (),
+            'possible': ("Pack a light rain jacket or umbrella just in case",),
+            'likely': ("Bring a raincoat, umbrella, and waterproof footwear",),
+        },
+    },
+    'business': {
+        'temperature': {
+            'hot': ("Light business suit or dress shirt with light trousers",
+                    "Consider a lightweight blazer for meetings"),
+            'mild': ("Standard business suit or blouse with skirt/trousers",
+                     "Light jacket may be needed for morning/evening"),
+            'cool': ("Wool or heavier business suit",
+                     "Consider a topcoat or trench coat"),
+            'cold': ("Heavier business suit with warm overcoat",
+                     "Scarf and gloves may be necessary"),
+        },
+        'precipitation': {
+            'dry': (),
+            'possible': ("Consider bringing a compact umbrella",),
+            'likely': ("Bring a formal umbrella and waterproof footwear",),
+        },
+    },
+}
+
+
+def _compile(rules):
+    """
+    Build {traveler type: tuple of advice tuples}, indexed by
+    temperature band * len(PRECIPITATION_BANDS) + precipitation band
+    """
+    compiled = {}
+    for traveler_type, rule in rules.items():
+        compiled[traveler_type] = tuple(
+            rule['temperature'][temperature] + rule['precipitation'][precipitation]
+            for temperature in TEMPERATURE_BANDS
+            for precipitation in PRECIPITATION_BANDS
+        )
+    return compiled
+
+
+COMPILED_RULES = _compile(RULES)
+
+# Changes whenever the rules or band edges do, so stored recommendations
+# built from older rules are recomputed
+RULES_VERSION = hashlib.blake2b(
+    repr((COMPILED_RULES, TEMPERATURE_THRESHOLDS, PRECIPITATION_THRESHOLDS)).encode(), digest_size=8
+).hexdigest()
+
+# Precipitation band of every whole percentage, so the common case skips bisect
+_PRECIPITATION_BAND = {percent: bisect_left(PRECIPITATION_THRESHOLDS, percent) for percent in range(101)}
+
+# Days without a maximum temperature get no advice
+NO_DATA = ()
+
+
+def recommend(max_temps, precip_probs, traveler_type=DEFAULT_TRAVELER_TYPE, fahrenheit=False):
+    """
+    Recommendations for a column of days
+
+    Args:
+        max_temps (list): Daily maximum temperatures (None or NaN if missing)
+        precip_probs (list): Daily maximum precipitation probabilities (percent)
+        traveler_type (str): Key of RULES (unknown types get the default advice)
+        fahrenheit (bool): Whether temperatures are in Fahrenheit
+
+    Returns:
+        list: One shared tuple of advice strings per day
+    """
+    table = COMPILED_RULES.get(traveler_type) or COMPILED_RULES[DEFAULT_TRAVELER_TYPE]
+    thresholds = TEMPERATURE_THRESHOLDS[fahrenheit]
+    width = len(PRECIPITATION_BANDS)
+    precipitation_band = _PRECIPITATION_BAND
+    return [
+        NO_DATA if max_temp is None or max_temp != max_temp else table[
+            bisect_left(thresholds, max_temp) * width + (
+                precipitation_band[precip_prob] if precip_prob in precipitation_band
+                else bisect_left(PRECIPITATION_THRESHOLDS, precip_prob or 0)
+            )
+        ]
+        for max_temp, precip_prob in zip(max_temps, precip_probs)
+    ]
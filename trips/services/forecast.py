@@ -0,0 +1,336 @@
+"""
+Immutable, columnar representation of an Open-Meteo daily forecast.
+
+A Forecast keeps the daily variables in one packed array of doubles (a block
+per variable, missing values are NaN) and the dates as day ordinals, so
+nothing is re-parsed per day and a cached forecast takes well under half the
+memory of the decoded JSON. Instances are never modified: copy() and deepcopy() return the same
+object, so the forecast cache and every request can share one instance, and
+the per-request variations (freshness, truncation, extension) are new
+Forecasts sharing whatever data they don't change. to_api() converts to
+the Open-Meteo JSON shape the API returns.
+"""
+import hashlib
+import math
+from bisect import bisect_left, bisect_right
+from array import array
+from datetime import date
+from functools import lru_cache
+from types import MappingProxyType
+
+# Daily variables kept as columns, in Open-Meteo's names
+COLUMNS = (
+    'temperature_2m_max',
+    'temperature_2m_min',
+    'precipitation_sum',
+    'precipitation_probability_max',
+)
+
+# Columns Open-Meteo reports as whole numbers
+INTEGER_COLUMNS = frozenset({'precipitation_probability_max'})
+
+NAN = math.nan
+
+
+def _readonly(typecode, values):
+    return memoryview(array(typecode, values)).toreadonly()
+
+
+def _pack(columns, days):
+    """Concatenate one `days`-long block per name in COLUMNS"""
+    values = []
+    for name in COLUMNS:
+        column = columns.get(name) or [None] * days
+        values.extend(NAN if value is None else value for value in column)
+    return _readonly('d', values)
+
+
+def _freeze(value):
+    if isinstance(value, dict):
+        return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+def _thaw(value):
+    if isinstance(value, MappingProxyType):
+        return {key: _thaw(item) for key, item in value.items()}
+    if isinstance(value, tuple):
+        return [_thaw(item) for item in value]
+    return value
+
+
+@lru_cache(maxsize=4096)
+def iso_date(ordinal):
+    """ISO date string for a day ordinal"""
+    return date.fromordinal(ordinal).isoformat()
+
+
+class Forecast:
+    """
+    One location's forecast: metadata plus day-aligned columns
+
+    Attributes:
+        meta (mapping): Read-only top-level Open-Meteo fields other than
+            `daily` (latitude, longitude, daily_units, current_weather, ...)
+        ordinals (memoryview): Read-only day ordinal of each day
+        packed (memoryview): Read-only values of every column in COLUMNS,
+            one block of len(ordinals) per column (see column())
+        forecast_age (int): Seconds since it was fetched from Open-Meteo
+        is_stale (bool): Whether it was served past its soft TTL
+    """
+
+    __slots__ = ('meta', 'ordinals', 'packed', 'forecast_age', 'is_stale', '_fingerprint')
+
+    def __init__(self, meta, ordinals, packed, forecast_age=0, is_stale=False):
+        set_ = object.__setattr__
+        set_(self, 'meta', meta if isinstance(meta, MappingProxyType) else _freeze(meta))
+        set_(self, 'ordinals', ordinals)
+        set_(self, 'packed', packed)
+        set_(self, 'forecast_age', forecast_age)
+        set_(self, 'is_stale', is_stale)
+        set_(self, '_fingerprint', None)
+
+    @classmethod
+    def from_api(cls, data):
+        """
+        Build a Forecast from a decoded Open-Meteo response
+
+        Args:
+            data (dict): One location's response
+
+        Returns:
+            Forecast: The forecast (data itself is left untouched)
+        """
+        daily = data.get('daily') or {}
+        dates = daily.get('time') or []
+        meta = {key: value for key, value in data.items() if key not in ('daily', 'forecast_age', 'is_stale')}
+        return cls(
+            meta,
+            _readonly('i', [date.fromisoformat(day).toordinal() for day in dates]),
+            _pack(daily, len(dates)),
+        )
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"Forecast is immutable (can't set {name!r})")
+
+    def __delattr__(self, name):
+        raise AttributeError(f"Forecast is immutable (can't delete {name!r})")
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def __reduce__(self):
+        # memoryviews can't be pickled; the shared cache tier stores raw bytes
+        return (_restore, (
+            _thaw(self.meta),
+            self.ordinals.tobytes(),
+            self.packed.tobytes(),
+            self.forecast_age,
+            self.is_stale,
+        ))
+
+    def __eq__(self, other):
+        if not isinstance(other, Forecast):
+            return NotImplemented
+        return (
+            self.meta == other.meta
+            and self.ordinals == other.ordinals
+            and self.forecast_age == other.forecast_age
+            and self.is_stale == other.is_stale
+            # NaN != NaN, so compare the raw bytes
+            and self.packed.tobytes() == other.packed.tobytes()
+        )
+
+    def __hash__(self):
+        return hash((self.fingerprint, self.forecast_age, self.is_stale))
+
+    def __len__(self):
+        return len(self.ordinals)
+
+    def __bool__(self):
+        # A forecast without days is still a forecast (unlike None)
+        return True
+
+    def __repr__(self):
+        return f"<Forecast {self.latitude},{self.longitude} {len(self)} days>"
+
+    @property
+    def latitude(self):
+        return self.meta.get('latitude', 0.0)
+
+    @property
+    def longitude(self):
+        return self.meta.get('longitude', 0.0)
+
+    @property
+    def current_weather(self):
+        return self.meta.get('current_weather')
+
+    @property
+    def is_fahrenheit(self):
+        """Whether temperatures are in Fahrenheit"""
+        units = self.meta.get('daily_units') or {}
+        return (units.get('temperature_2m_max') or '').lower() == '°f'
+
+    @property
+    def start_ordinal(self):
+        """Ordinal of the first day, or None for an empty forecast"""
+        return self.ordinals[0] if self.ordinals else None
+
+    @property
+    def dates(self):
+        """ISO date of each day"""
+        return [iso_date(ordinal) for ordinal in self.ordinals]
+
+    def day_range(self, first, last):
+        """
+        Indices of the days from `first` to `last` (inclusive), computed
+        from the start date alone
+
+        Forecast days are consecutive, so this is O(1) whatever the forecast
+        length. (Should a forecast ever have gaps, the days are searched
+        instead.)
+
+        Args:
+            first (date): First day wanted
+            last (date): Last day wanted
+
+        Returns:
+            range: Index range into the forecast's days (empty if none match)
+        """
+        days = len(self.ordinals)
+        if not days:
+            return range(0)
+        start = self.ordinals[0]
+        if self.ordinals[-1] - start == days - 1:
+            return range(
+                min(days, max(0, first.toordinal() - start)),
+                min(days, max(0, last.toordinal() - start + 1)),
+            )
+        ordinals = self.ordinals.tolist()
+        return range(bisect_left(ordinals, first.toordinal()), bisect_right(ordinals, last.toordinal()))
+
+    def day_mask(self, first, last):
+        """
+        Whether each day falls from `first` to `last` (see day_range)
+
+        Returns:
+            list: One bool per day
+        """
+        days = len(self.ordinals)
+        selected = self.day_range(first, last)
+        if not selected:
+            return [False] * days
+        return [False] * selected.start + [True] * len(selected) + [False] * (days - selected.stop)
+
+    @property
+    def fingerprint(self):
+        """
+        Hex digest of the forecast's values, for keying anything rendered
+        from it (freshness isn't included)
+        """
+        if self._fingerprint is None:
+            digest = hashlib.blake2b(digest_size=16)
+            digest.update(repr((self.meta.get('daily_units'), self.current_weather)).encode())
+            digest.update(self.ordinals)
+            digest.update(self.packed)
+            object.__setattr__(self, '_fingerprint', digest.hexdigest())
+        return self._fingerprint
+
+    def column(self, name):
+        """
+        One daily variable (read-only, NaN for missing values)
+
+        Args:
+            name (str): Name in COLUMNS
+
+        Returns:
+            memoryview: The column's block of the packed values
+        """
+        days = len(self.ordinals)
+        start = COLUMNS.index(name) * days
+        return self.packed[start:start + days]
+
+    @property
+    def columns(self):
+        """Every column by name (see column())"""
+        return {name: self.column(name) for name in COLUMNS}
+
+    def values(self, name):
+        """A column as a list, with None for missing values"""
+        if name in INTEGER_COLUMNS:
+            return [None if value != value else int(value) for value in self.column(name).tolist()]
+        return [None if value != value else value for value in self.column(name).tolist()]
+
+    def _replace(self, **changes):
+        state = {
+            'meta': self.meta,
+            'ordinals': self.ordinals,
+            'packed': self.packed,
+            'forecast_age': self.forecast_age,
+            'is_stale': self.is_stale,
+        }
+        state.update(changes)
+        return Forecast(**state)
+
+    def with_freshness(self, age, stale):
+        """The same forecast, marked with its age in seconds and staleness"""
+        forecast = self._replace(forecast_age=int(age), is_stale=stale)
+        # Freshness isn't part of the fingerprint
+        object.__setattr__(forecast, '_fingerprint', self._fingerprint)
+        return forecast
+
+    def truncated(self, days):
+        """The first `days` days of the forecast"""
+        if len(self) <= days:
+            return self
+        return self._replace(
+            ordinals=self.ordinals[:days],
+            packed=_readonly('d', [value for name in COLUMNS for value in self.column(name)[:days].tolist()]),
+        )
+
+    def with_extra_days(self, ordinals, columns):
+        """
+        The forecast with days appended
+
+        Args:
+            ordinals (list): Day ordinals of the extra days
+            columns (dict): Values of the extra days for each name in COLUMNS
+        """
+        values = []
+        for name in COLUMNS:
+            values.extend(self.column(name).tolist())
+            values.extend(columns[name])
+        return self._replace(
+            ordinals=_readonly('i', [*self.ordinals.tolist(), *ordinals]),
+            packed=_readonly('d', values),
+        )
+
+    def to_api(self):
+        """
+        Returns:
+            dict: The forecast in Open-Meteo's JSON shape, plus forecast_age
+                and is_stale
+        """
+        data = _thaw(self.meta)
+        daily = {'time': self.dates}
+        for name in COLUMNS:
+            daily[name] = self.values(name)
+        data['daily'] = daily
+        data['forecast_age'] = self.forecast_age
+        data['is_stale'] = self.is_stale
+        return data
+
+
+def _restore(meta, ordinals, packed, forecast_age, is_stale):
+    def unpack(typecode, raw):
+        values = array(typecode)
+        values.frombytes(raw)
+        return memoryview(values).toreadonly()
+
+    return Forecast(meta, unpack('i', ordinals), unpack('d', packed), forecast_age, is_stale)
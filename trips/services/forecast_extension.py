@@ -0,0 +1,155 @@
+"""
+Deterministic extension of Open-Meteo forecasts beyond the 16-day API horizon.
+
+Predicted days are drawn around the statistics of the real forecast days and
+drift toward a precomputed climatology (seasonal normals by latitude band) the
+further they are from the last real day. The random noise is seeded from the
+location and the forecast start date, so the same forecast always extends to
+the same values and extended forecasts can be cached and compared.
+"""
+import hashlib
+import math
+import random
+import statistics
+from array import array
+from datetime import date
+
+# Days after the last real forecast day until the climatology weight peaks
+BLEND_DAYS = 30
+
+# Share of the prediction taken from climatology once fully blended
+CLIMATOLOGY_WEIGHT = 0.8
+
+# Day of year of the temperature peak in the northern hemisphere (mid-July)
+_PEAK_DAY = 200
+
+# Seasonal normals by absolute latitude band (degrees Celsius, percent):
+# (band upper bound, max temp mean, max temp amplitude, min temp mean,
+#  min temp amplitude, precipitation probability mean, amplitude)
+_BANDS = (
+    (15, 31.0, 1.5, 22.0, 1.5, 55.0, 10.0),
+    (30, 30.0, 4.0, 19.0, 5.0, 30.0, 10.0),
+    (45, 20.0, 10.0, 10.0, 9.0, 35.0, 5.0),
+    (60, 11.5, 11.5, 2.5, 9.5, 45.0, 5.0),
+    (75, 2.5, 14.5, -6.0, 14.0, 45.0, 10.0),
+    (90, -11.0, 14.0, -17.0, 15.0, 35.0, 10.0),
+)
+
+
+def _build_climatology(fahrenheit):
+    """Daily (max temp, min temp, precipitation probability) normals, indexed
+    by [southern hemisphere][band][day of year - 1]"""
+    to_unit = (lambda c: c * 9 / 5 + 32) if fahrenheit else (lambda c: c)
+    table = []
+    for southern in (False, True):
+        peak = _PEAK_DAY - 182 if southern else _PEAK_DAY
+        season = [math.cos(2 * math.pi * (day + 1 - peak) / 365.25) for day in range(365)]
+        hemisphere = []
+        for _, tmax, tmax_amp, tmin, tmin_amp, prob, prob_amp in _BANDS:
+            hemisphere.append((
+                array('d', (to_unit(tmax + tmax_amp * s) for s in season)),
+                array('d', (to_unit(tmin + tmin_amp * s) for s in season)),
+                array('d', (prob + prob_amp * s for s in season)),
+            ))
+        table.append(hemisphere)
+    return table
+
+
+# Precomputed for both temperature units
+CLIMATOLOGY = {False: _build_climatology(False), True: _build_climatology(True)}
+
+
+def climatology_for(latitude, fahrenheit=False):
+    """Climatology columns for the latitude band containing `latitude`"""
+    hemisphere = CLIMATOLOGY[fahrenheit][latitude < 0]
+    for i, band in enumerate(_BANDS):
+        if abs(latitude) <= band[0]:
+            return hemisphere[i]
+    return hemisphere[-1]
+
+
+def forecast_seed(latitude, longitude, start_date, variable=''):
+    """Stable random seed for a location, forecast start date and variable"""
+    text = f"{latitude:.2f}:{longitude:.2f}:{start_date}:{variable}"
+    return int.from_bytes(hashlib.blake2b(text.encode(), digest_size=8).digest(), 'big')
+
+
+def _stats(values, default_spread=2.0):
+    # Missing values are None or NaN
+    values = [value for value in values if value is not None and value == value]
+    if not values:
+        return 0.0, default_spread
+    spread = statistics.stdev(values) if len(values) > 1 else default_spread
+    return statistics.fmean(values), spread
+
+
+def predict_days(ordinals, columns, total_days, latitude, longitude, fahrenheit=False, climatology=True):
+    """
+    Predict the days that extend a forecast to total_days
+
+    Args:
+        ordinals (sequence): Day ordinals of the real forecast days
+        columns (mapping): Real values of each daily variable
+            (temperature_2m_max, temperature_2m_min, precipitation_sum,
+            precipitation_probability_max)
+        total_days (int): Number of days the forecast should cover
+        latitude (float): Location latitude (for the seed and climatology)
+        longitude (float): Location longitude (for the seed)
+        fahrenheit (bool): Whether temperatures are in Fahrenheit
+        climatology (bool): Whether to blend toward seasonal normals
+
+    Returns:
+        tuple: (day ordinals of the extra days, {variable: extra values});
+            no days when the forecast is empty or already long enough
+    """
+    count = total_days - len(ordinals)
+    if count <= 0 or not ordinals:
+        return [], {name: [] for name in columns}
+
+    avg_max, std_max = _stats(columns['temperature_2m_max'])
+    avg_min, std_min = _stats(columns['temperature_2m_min'])
+    avg_prob, _ = _stats(columns['precipitation_probability_max'])
+    avg_sum, _ = _stats(columns['precipitation_sum'])
+
+    first = date.fromordinal(ordinals[0])
+    last = date.fromordinal(ordinals[-1])
+    extra_ordinals = list(range(last.toordinal() + 1, last.toordinal() + 1 + count))
+
+    if climatology:
+        # Weight of climatology for each extra day, ramping up with distance
+        weights = [min(1.0, (i + 1) / BLEND_DAYS) * CLIMATOLOGY_WEIGHT for i in range(count)]
+        normal_max, normal_min, normal_prob = climatology_for(latitude, fahrenheit)
+        # Day-of-year index of each extra day (leap days fold into the next day)
+        start = last.timetuple().tm_yday
+        days_of_year = [(start + i) % 365 for i in range(count)]
+        center_max = [(1 - w) * avg_max + w * normal_max[d] for w, d in zip(weights, days_of_year)]
+        center_min = [(1 - w) * avg_min + w * normal_min[d] for w, d in zip(weights, days_of_year)]
+        center_prob = [(1 - w) * avg_prob + w * normal_prob[d] for w, d in zip(weights, days_of_year)]
+    else:
+        center_max = [avg_max] * count
+        center_min = [avg_min] * count
+        center_prob = [avg_prob] * count
+
+    # Each column draws from its own seeded generator, so a day's values
+    # don't depend on how many days are predicted
+    def noise(variable):
+        rng = random.Random(forecast_seed(latitude, longitude, first, variable))
+        return array('d', (rng.random() for _ in range(count)))
+
+    predicted_max = [c + (2 * u - 1) * std_max for c, u in zip(center_max, noise('temperature_2m_max'))]
+    predicted_min = [c + (2 * u - 1) * std_min for c, u in zip(center_min, noise('temperature_2m_min'))]
+
+    return extra_ordinals, {
+        # Ensure min temperature is always less than max
+        'temperature_2m_max': [
+            round(hi if hi > lo else lo, 1) for hi, lo in zip(predicted_max, predicted_min)
+        ],
+        'temperature_2m_min': [
+            round(lo if hi > lo else hi, 1) for hi, lo in zip(predicted_max, predicted_min)
+        ],
+        'precipitation_probability_max': [
+            round(min(100.0, max(0.0, c + u * 30 - 15)))
+            for c, u in zip(center_prob, noise('precipitation_probability_max'))
+        ],
+        'precipitation_sum': [round(avg_sum * (0.5 + u), 1) for u in noise('precipitation_sum')],
+    }
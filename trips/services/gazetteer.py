@@ -0,0 +1,236 @@
+"""
+Offline place-name index for city autocomplete.
+
+Places are loaded from a compact gzipped TSV (written by the `load_gazetteer`
+management command from a GeoNames dump) into parallel arrays, with an
+accent-folded, sorted key list searched by bisection. Prefixes that match many
+places have their most populous matches precomputed, so every lookup touches
+at most a few dozen entries no matter how short the query is.
+"""
+import gzip
+import heapq
+import os
+import sys
+import threading
+import unicodedata
+from array import array
+from bisect import bisect_left
+
+from django.conf import settings
+
+# Most results any search may ask for (matches the search_cities view's cap)
+MAX_RESULTS = 50
+
+# Prefixes matching more places than this get their top results precomputed
+PRECOMPUTE_THRESHOLD = 64
+
+# Sorts after every character that can appear in a folded key
+_KEY_END = '\U0010ffff'
+
+
+def fold(text):
+    """
+    Normalize a place name for matching: strip accents, casefold and
+    collapse whitespace ("  São   Paulo" -> "sao paulo")
+    """
+    decomposed = unicodedata.normalize('NFKD', text)
+    stripped = ''.join(char for char in decomposed if not unicodedata.combining(char))
+    return ' '.join(stripped.casefold().split())
+
+
+class Gazetteer:
+    """In-memory prefix index of places ranked by population"""
+
+    def __init__(self, rows):
+        """
+        Args:
+            rows (iterable): (name, ascii_name, admin1, country, latitude,
+                longitude, population) tuples
+        """
+        self.names = []
+        self.admin1 = []
+        self.country = []
+        self.latitude = array('d')
+        self.longitude = array('d')
+        self.population = array('q')
+
+        keyed = []
+        for name, ascii_name, admin1, country, latitude, longitude, population in rows:
+            index = len(self.names)
+            self.names.append(name)
+            self.admin1.append(sys.intern(admin1))
+            self.country.append(sys.intern(country))
+            self.latitude.append(latitude)
+            self.longitude.append(longitude)
+            self.population.append(population)
+
+            key = fold(name)
+            keyed.append((key, index))
+            ascii_key = fold(ascii_name) if ascii_name else key
+            if ascii_key != key:
+                keyed.append((ascii_key, index))
+
+        keyed.sort()
+        self._keys = [key for key, _ in keyed]
+        self._entries = array('i', (index for _, index in keyed))
+        self._top = {}
+        self._precompute_top()
+
+    def __len__(self):
+        return len(self.names)
+
+    @classmethod
+    def load(cls, path):
+        """Load a gazetteer file written by write()"""
+        def rows():
+            with gzip.open(path, 'rt', encoding='utf-8') as f:
+                for line in f:
+                    name, ascii_name, admin1, country, latitude, longitude, population = line.rstrip('\n').split('\t')
+                    yield name, ascii_name, admin1, country, float(latitude), float(longitude), int(population)
+        return cls(rows())
+
+    @staticmethod
+    def write(path, rows):
+        """
+        Write rows to a gazetteer file (gzipped TSV, most populous first)
+
+        Returns:
+            int: Number of places written
+        """
+        rows = sorted(rows, key=lambda row: -row[6])
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with gzip.open(path, 'wt', encoding='utf-8', compresslevel=9) as f:
+            for name, ascii_name, admin1, country, latitude, longitude, population in rows:
+                # The ASCII name is only kept when it folds differently
+                ascii_name = ascii_name if fold(ascii_name) != fold(name) else ''
+                f.write(f"{name}\t{ascii_name}\t{admin1}\t{country}\t{latitude}\t{longitude}\t{population}\n")
+        return len(rows)
+
+    def _top_entries(self, lo, hi):
+        """Distinct entries in key range [lo, hi), most populous first"""
+        population = self.population
+        ranked = heapq.nlargest(
+            MAX_RESULTS * 2, self._entries[lo:hi], key=lambda index: population[index]
+        )
+        # A place can be keyed under both its name and its ASCII name
+        return tuple(dict.fromkeys(ranked))[:MAX_RESULTS]
+
+    def _precompute_top(self):
+        keys = self._keys
+        stack = [('', 0, len(keys))]
+        while stack:
+            prefix, lo, hi = stack.pop()
+            if prefix:
+                self._top[prefix] = self._top_entries(lo, hi)
+
+            # Split the range on the next character
+            depth = len(prefix) + 1
+            i = lo
+            while i < hi:
+                if len(keys[i]) < depth:
+                    i += 1
+                    continue
+                child = keys[i][:depth]
+                j = bisect_left(keys, child + _KEY_END, i, hi)
+                if j - i > PRECOMPUTE_THRESHOLD:
+                    stack.append((child, i, j))
+                i = j
+
+    def search(self, query, limit=10):
+        """
+        Find places whose name starts with the query, most populous first
+
+        Args:
+            query (str): Name prefix (accents and case are ignored)
+            limit (int): Maximum number of results to return
+
+        Returns:
+            list: City dictionaries shaped like GeocodingService.search_cities results
+        """
+        prefix = fold(query)
+        if not prefix:
+            return []
+
+        top = self._top.get(prefix)
+        if top is None:
+            lo = bisect_left(self._keys, prefix)
+            hi = bisect_left(self._keys, prefix + _KEY_END, lo)
+            if lo == hi:
+                return []
+            top = self._top_entries(lo, hi)
+
+        return [self.city(index) for index in top[:limit]]
+
+    def city(self, index):
+        """Build the result dictionary for one place"""
+        name = self.names[index]
+        admin1 = self.admin1[index]
+        country = self.country[index]
+        display_parts = [name]
+        if admin1:
+            display_parts.append(admin1)
+        if country:
+            display_parts.append(country)
+        return {
+            'name': name,
+            'country': country,
+            'admin1': admin1,
+            'latitude': self.latitude[index],
+            'longitude': self.longitude[index],
+            'display_name': ', '.join(display_parts),
+        }
+
+
+_gazetteer = None
+_loaded = False
+_lock = threading.Lock()
+
+
+def get_gazetteer():
+    """
+    Get the process-wide gazetteer, loading it from settings.GAZETTEER_PATH
+    on first use
+
+    Returns:
+        Gazetteer: The loaded index, or None if no gazetteer file exists
+    """
+    global _gazetteer, _loaded
+    if not _loaded:
+        with _lock:
+            if not _loaded:
+                path = getattr(settings, 'GAZETTEER_PATH', None)
+                if path and os.path.exists(path):
+                    _gazetteer = Gazetteer.load(path)
+                _loaded = True
+    return _gazetteer
+
+
+def file_version():
+    """
+    Identifies the gazetteer file at settings.GAZETTEER_PATH without loading
+    it (changes whenever the file is replaced)
+
+    Returns:
+        str: Modification time and size, or None if no gazetteer file exists
+    """
+    path = getattr(settings, 'GAZETTEER_PATH', None)
+    if not path:
+        return None
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return f"{stat.st_mtime_ns}:{stat.st_size}"
+
+
+def is_loaded():
+    """Whether get_gazetteer() has already loaded (or looked for) the index"""
+    return _loaded
+
+
+def reset_gazetteer():
+    """Forget the loaded gazetteer so the next lookup reloads it from disk"""
+    global _gazetteer, _loaded
+    with _lock:
+        _gazetteer = None
+        _loaded = False
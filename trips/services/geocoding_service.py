@@ -1,48 +1,192 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+import httpx
 import requests
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db.models import F
+from django.utils import timezone
+
+from ..models import GeocodeCacheEntry
+from . import http_client
+from .http_client import CircuitOpenError
+from .gazetteer import fold, get_gazetteer, is_loaded as gazetteer_loaded
+from .singleflight import UPSTREAM_CALLS
 
 class GeocodingService:
     """Service to handle geocoding (converting place names to coordinates)"""
     
     BASE_URL = "https://geocoding-api.open-meteo.com/v1/search"
     
+    # How long a "not found" result is trusted before the name is retried
+    NEGATIVE_CACHE_TTL = timedelta(seconds=getattr(settings, 'GEOCODE_NEGATIVE_TTL', 7 * 24 * 3600))
+    
+    # Concurrent API lookups when geocoding many names at once
+    BATCH_WORKERS = getattr(settings, 'GEOCODE_BATCH_WORKERS', 4)
+    
+    # Names per cache query when geocoding many names at once
+    CACHE_QUERY_CHUNK = 500
+    
     @staticmethod
     def get_coordinates(location_name):
         """
         Get latitude and longitude for a location name
         
+        Names geocoded before are answered from the GeocodeCacheEntry table;
+        only new names (or stale "not found" entries) reach the API.
+        
         Args:
             location_name (str): Name of the location to geocode
             
         Returns:
             tuple: (latitude, longitude) or (None, None) if not found
         """
-        try:
-            params = {
-                'name': location_name,
-                'count': 1,
-                'language': 'en',
-                'format': 'json'
-            }
-            
-            response = requests.get(GeocodingService.BASE_URL, params=params)
-            response.raise_for_status()
-            data = response.json()
-            
-            if data and 'results' in data and len(data['results']) > 0:
-                result = data['results'][0]
-                return result['latitude'], result['longitude']
-            
+        name = GeocodingService.cache_name(location_name)
+        if not name:
             return None, None
+        
+        entry = GeocodeCacheEntry.objects.filter(name=name).first()
+        if GeocodingService.is_usable(entry):
+            GeocodeCacheEntry.objects.filter(pk=entry.pk).update(hit_count=F('hit_count') + 1)
+            return entry.latitude, entry.longitude
+        
+        try:
+            # Concurrent lookups of the same destination share one upstream call
+            key = GeocodingService.flight_key(location_name)
+            latitude, longitude = UPSTREAM_CALLS.do(key, GeocodingService._fetch_coordinates, location_name)
             
         except requests.exceptions.RequestException as e:
+            # Not cached: a failed lookup says nothing about the name itself
             print(f"Error during geocoding: {e}")
             return None, None
+        
+        GeocodeCacheEntry.objects.update_or_create(
+            name=name, defaults={'latitude': latitude, 'longitude': longitude}
+        )
+        return latitude, longitude
+    
+    @staticmethod
+    def get_coordinates_many(location_names):
+        """
+        Get coordinates for many location names, each distinct name looked
+        up once
+        
+        Cached names are read in one query (per CACHE_QUERY_CHUNK names); the
+        rest are fetched from the API concurrently (GEOCODE_BATCH_WORKERS at a
+        time) and cached in one bulk write.
+        
+        Args:
+            location_names (iterable): Location names (duplicates and
+                spellings that normalize to the same name are fine)
+            
+        Returns:
+            dict: Normalized name (see cache_name) -> (latitude, longitude),
+                (None, None) where not found
+        """
+        names = {}
+        for location_name in location_names:
+            name = GeocodingService.cache_name(location_name)
+            if name:
+                names.setdefault(name, location_name)
+        
+        coordinates = {}
+        wanted = list(names)
+        for start in range(0, len(wanted), GeocodingService.CACHE_QUERY_CHUNK):
+            chunk = wanted[start:start + GeocodingService.CACHE_QUERY_CHUNK]
+            hits = []
+            for entry in GeocodeCacheEntry.objects.filter(name__in=chunk):
+                if GeocodingService.is_usable(entry):
+                    coordinates[entry.name] = (entry.latitude, entry.longitude)
+                    hits.append(entry.pk)
+            GeocodeCacheEntry.objects.filter(pk__in=hits).update(hit_count=F('hit_count') + 1)
+        
+        missing = [name for name in names if name not in coordinates]
+        if not missing:
+            return coordinates
+        
+        def lookup(name):
+            try:
+                key = GeocodingService.flight_key(names[name])
+                return UPSTREAM_CALLS.do(key, GeocodingService._fetch_coordinates, names[name])
+            except requests.exceptions.RequestException as e:
+                print(f"Error during geocoding: {e}")
+                return None
+        
+        with ThreadPoolExecutor(max_workers=GeocodingService.BATCH_WORKERS) as pool:
+            results = dict(zip(missing, pool.map(lookup, missing)))
+        
+        # Failed lookups are left uncached, as in get_coordinates
+        found = {name: result for name, result in results.items() if result is not None}
+        GeocodeCacheEntry.objects.bulk_create(
+            [GeocodeCacheEntry(name=name, latitude=latitude, longitude=longitude)
+             for name, (latitude, longitude) in found.items()],
+            batch_size=GeocodingService.CACHE_QUERY_CHUNK,
+            update_conflicts=True,
+            unique_fields=['name'],
+            update_fields=['latitude', 'longitude', 'updated_at'],
+        )
+        coordinates.update(found)
+        for name in missing:
+            coordinates.setdefault(name, (None, None))
+        return coordinates
+    
+    @staticmethod
+    def cache_name(location_name):
+        """Normalized form of a location name used as the geocode cache key"""
+        if not location_name:
+            return ''
+        return fold(location_name)[:255]
+    
+    @staticmethod
+    def is_usable(entry):
+        """Whether a cache entry can answer a lookup without asking the API"""
+        if entry is None:
+            return False
+        if entry.latitude is not None:
+            return True
+        return timezone.now() - entry.updated_at < GeocodingService.NEGATIVE_CACHE_TTL
+    
+    @staticmethod
+    def flight_key(location_name):
+        """Key identifying interchangeable lookups of the same location"""
+        return f"geocode:{GeocodingService.cache_name(location_name)}"
+    
+    @staticmethod
+    def search_params(name, count):
+        """Query parameters for an Open-Meteo geocoding request"""
+        return {
+            'name': name,
+            'count': count,
+            'language': 'en',
+            'format': 'json'
+        }
+    
+    @staticmethod
+    def _fetch_coordinates(location_name):
+        """Look up a location name on the Open-Meteo geocoding API"""
+        params = GeocodingService.search_params(location_name, 1)
+        
+        response = http_client.get(GeocodingService.BASE_URL, params=params)
+        return GeocodingService.parse_coordinates(http_client.read_json(response))
+    
+    @staticmethod
+    def parse_coordinates(data):
+        """Extract (latitude, longitude) of the best match from a geocoding response"""
+        if data and 'results' in data and len(data['results']) > 0:
+            result = data['results'][0]
+            return result['latitude'], result['longitude']
+        
+        return None, None
     
     @staticmethod
     def search_cities(query, limit=10):
         """
         Search for cities matching the query
         
+        Answered from the offline gazetteer when one is loaded; the Open-Meteo
+        geocoding API is only called when the gazetteer has no match.
+        
         Args:
             query (str): Search term for city name
             limit (int): Maximum number of results to return
@@ -50,41 +194,120 @@ class GeocodingService:
         Returns:
             list: List of city dictionaries with name, country, latitude, longitude
         """
+        cities = GeocodingService.search_offline(query, limit)
+        if cities:
+            return cities
+        
         try:
-            params = {
-                'name': query,
-                'count': limit,
-                'language': 'en',
-                'format': 'json'
-            }
+            params = GeocodingService.search_params(query, limit)
             
-            response = requests.get(GeocodingService.BASE_URL, params=params)
-            response.raise_for_status()
-            data = response.json()
-            
-            cities = []
-            if data and 'results' in data:
-                for result in data['results']:
-                    city = {
-                        'name': result.get('name', ''),
-                        'country': result.get('country', ''),
-                        'admin1': result.get('admin1', ''),  # State/province
-                        'latitude': result.get('latitude'),
-                        'longitude': result.get('longitude')
-                    }
-                    
-                    # Create a formatted display name with country and admin1 if available
-                    display_parts = [city['name']]
-                    if city['admin1']:
-                        display_parts.append(city['admin1'])
-                    if city['country']:
-                        display_parts.append(city['country'])
-                    
-                    city['display_name'] = ', '.join(display_parts)
-                    cities.append(city)
+            response = http_client.get(GeocodingService.BASE_URL, params=params)
+            return GeocodingService.parse_cities(http_client.read_json(response))
             
+        except requests.exceptions.RequestException as e:
+            print(f"Error searching cities: {e}")
+            return []
+    
+    @staticmethod
+    def search_offline(query, limit=10):
+        """Search the offline gazetteer (returns [] if none is installed)"""
+        gazetteer = get_gazetteer()
+        if gazetteer is None:
+            return []
+        return gazetteer.search(query, limit)
+    
+    @staticmethod
+    def parse_cities(data):
+        """Convert a geocoding response into a list of city dictionaries"""
+        cities = []
+        if data and 'results' in data:
+            for result in data['results']:
+                city = {
+                    'name': result.get('name', ''),
+                    'country': result.get('country', ''),
+                    'admin1': result.get('admin1', ''),  # State/province
+                    'latitude': result.get('latitude'),
+                    'longitude': result.get('longitude')
+                }
+                
+                # Create a formatted display name with country and admin1 if available
+                display_parts = [city['name']]
+                if city['admin1']:
+                    display_parts.append(city['admin1'])
+                if city['country']:
+                    display_parts.append(city['country'])
+                
+                city['display_name'] = ', '.join(display_parts)
+                cities.append(city)
+        
+        return cities
+
+
+class AsyncGeocodingService:
+    """Non-blocking version of GeocodingService for async views"""
+    
+    @staticmethod
+    async def get_coordinates(location_name):
+        """
+        Get latitude and longitude for a location name without blocking the event loop
+        
+        Returns:
+            tuple: (latitude, longitude) or (None, None) if not found
+        """
+        name = GeocodingService.cache_name(location_name)
+        if not name:
+            return None, None
+        
+        entry = await GeocodeCacheEntry.objects.filter(name=name).afirst()
+        if GeocodingService.is_usable(entry):
+            await GeocodeCacheEntry.objects.filter(pk=entry.pk).aupdate(hit_count=F('hit_count') + 1)
+            return entry.latitude, entry.longitude
+        
+        try:
+            latitude, longitude = await UPSTREAM_CALLS.do_async(
+                GeocodingService.flight_key(location_name),
+                AsyncGeocodingService._fetch_coordinates,
+                location_name
+            )
+        except (httpx.HTTPError, CircuitOpenError, ValueError) as e:
+            print(f"Error during geocoding: {e}")
+            return None, None
+        
+        await GeocodeCacheEntry.objects.aupdate_or_create(
+            name=name, defaults={'latitude': latitude, 'longitude': longitude}
+        )
+        return latitude, longitude
+    
+    @staticmethod
+    async def _fetch_coordinates(location_name):
+        params = GeocodingService.search_params(location_name, 1)
+        
+        response = await http_client.aget(GeocodingService.BASE_URL, params=params)
+        return GeocodingService.parse_coordinates(http_client.read_json(response))
+    
+    @staticmethod
+    async def search_cities(query, limit=10):
+        """
+        Search for cities matching the query without blocking the event loop
+        
+        Returns:
+            list: List of city dictionaries with name, country, latitude, longitude
+        """
+        if gazetteer_loaded():
+            cities = GeocodingService.search_offline(query, limit)
+        else:
+            # The first lookup loads the index from disk, which takes seconds
+            # for a full gazetteer; keep that off the event loop
+            cities = await sync_to_async(GeocodingService.search_offline, thread_sensitive=False)(query, limit)
+        if cities:
             return cities
+        
+        try:
+            params = GeocodingService.search_params(query, limit)
             
-        except requests.exceptions.RequestException as e:
+            response = await http_client.aget(GeocodingService.BASE_URL, params=params)
+            return GeocodingService.parse_cities(http_client.read_json(response))
+            
+        except (httpx.HTTPError, CircuitOpenError, ValueError) as e:
             print(f"Error searching cities: {e}")
-            return [] 
\ No newline at end of file
+            return []
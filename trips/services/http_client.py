@@ -0,0 +1,363 @@
+"""
+Shared outbound HTTP client for the services that call external APIs.
+
+Every upstream host gets its own keep-alive connection pool, connect/read
+timeouts, a bounded number of retries with jittered exponential backoff and a
+circuit breaker. While a host's breaker is open, calls fail immediately with
+CircuitOpenError instead of tying up a worker waiting on a degraded upstream.
+"""
+import asyncio
+import random
+import threading
+import time
+import weakref
+from urllib.parse import urlsplit
+
+import httpx
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+
+from .. import jsonlib
+from ..metrics import record_upstream
+
+POOL_SIZE = getattr(settings, 'OUTBOUND_HTTP_POOL_SIZE', 20)
+CONNECT_TIMEOUT = getattr(settings, 'OUTBOUND_HTTP_CONNECT_TIMEOUT', 3.05)
+READ_TIMEOUT = getattr(settings, 'OUTBOUND_HTTP_READ_TIMEOUT', 10.0)
+RETRIES = getattr(settings, 'OUTBOUND_HTTP_RETRIES', 2)
+BACKOFF = getattr(settings, 'OUTBOUND_HTTP_BACKOFF', 0.2)
+BREAKER_FAILURE_THRESHOLD = getattr(settings, 'OUTBOUND_BREAKER_FAILURE_THRESHOLD', 5)
+BREAKER_RESET_TIMEOUT = getattr(settings, 'OUTBOUND_BREAKER_RESET_TIMEOUT', 30.0)
+
+# Connection pool sizes for the async client. One client serves every
+# concurrent request on an event loop, so these bound the number of open
+# sockets to each upstream host.
+ASYNC_MAX_CONNECTIONS = getattr(settings, 'OUTBOUND_ASYNC_MAX_CONNECTIONS', 200)
+ASYNC_MAX_KEEPALIVE = getattr(settings, 'OUTBOUND_ASYNC_MAX_KEEPALIVE', 50)
+
+# Responses worth retrying: rate limiting and server-side failures
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+
+class CircuitOpenError(requests.exceptions.ConnectionError):
+    """Raised instead of calling an upstream host whose circuit breaker is open"""
+
+
+class CircuitBreaker:
+    """
+    Tracks consecutive failures for one upstream host.
+
+    After `failure_threshold` failures in a row the breaker opens and rejects
+    calls for `reset_timeout` seconds. It then lets a single trial call through
+    (half-open); success closes it again, failure re-opens it.
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, failure_threshold=BREAKER_FAILURE_THRESHOLD, reset_timeout=BREAKER_RESET_TIMEOUT):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = None
+        self.times_opened = 0
+        self.rejected = 0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow(self):
+        """Whether a call may go through right now"""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = self.HALF_OPEN
+                self._trial_in_flight = False
+            if self.state == self.HALF_OPEN and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            self.rejected += 1
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.state = self.CLOSED
+            self.consecutive_failures = 0
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.consecutive_failures += 1
+            self._trial_in_flight = False
+            if self.state == self.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    self.times_opened += 1
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+
+    def release_trial(self):
+        """Give up a half-open trial call without an outcome (e.g. it was cancelled)"""
+        with self._lock:
+            self._trial_in_flight = False
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                'state': self.state,
+                'consecutive_failures': self.consecutive_failures,
+                'times_opened': self.times_opened,
+                'rejected': self.rejected,
+            }
+
+
+class _RetryableStatus(Exception):
+    def __init__(self, response):
+        self.response = response
+
+
+class OutboundClient:
+    """Pooled, retrying, circuit-broken HTTP client for a single upstream host"""
+
+    def __init__(self, host, pool_size=POOL_SIZE, connect_timeout=CONNECT_TIMEOUT,
+                 read_timeout=READ_TIMEOUT, retries=RETRIES, backoff=BACKOFF, breaker=None):
+        self.host = host
+        self.pool_size = pool_size
+        self.timeout = (connect_timeout, read_timeout)
+        self.retries = retries
+        self.backoff = backoff
+        self.breaker = breaker or CircuitBreaker()
+
+        # Retries are handled here (not by urllib3) so the breaker sees them
+        self.adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=0)
+        self.session = requests.Session()
+        self.session.mount('http://', self.adapter)
+        self.session.mount('https://', self.adapter)
+
+        self._lock = threading.Lock()
+        self._stats = {'requests': 0, 'retries': 0, 'failures': 0}
+
+    def _count(self, name):
+        with self._lock:
+            self._stats[name] += 1
+
+    def _backoff_delay(self, attempt):
+        # Exponential backoff with full jitter, so retries from many workers
+        # don't arrive at the upstream in lockstep
+        return random.uniform(0, self.backoff * (2 ** attempt))
+
+    def get(self, url, params=None):
+        """
+        Send a GET request through the pool
+
+        Returns:
+            requests.Response: A successful (2xx/3xx) response
+
+        Raises:
+            CircuitOpenError: If the host's breaker is open
+            requests.exceptions.RequestException: If every attempt failed
+        """
+        started = time.perf_counter()
+        failed = True
+        try:
+            response = self._get(url, params)
+            failed = False
+            return response
+        finally:
+            record_upstream(self.host, time.perf_counter() - started, failed)
+
+    def _get(self, url, params):
+        if not self.breaker.allow():
+            raise CircuitOpenError(f"Circuit open for {self.host}")
+
+        for attempt in range(self.retries + 1):
+            self._count('requests')
+            try:
+                response = self.session.get(url, params=params, timeout=self.timeout)
+                if response.status_code in RETRY_STATUSES:
+                    raise _RetryableStatus(response)
+                response.raise_for_status()
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout, _RetryableStatus) as e:
+                if attempt < self.retries:
+                    self._count('retries')
+                    time.sleep(self._backoff_delay(attempt))
+                    continue
+                self._count('failures')
+                self.breaker.record_failure()
+                if isinstance(e, _RetryableStatus):
+                    e.response.raise_for_status()
+                raise
+            except requests.exceptions.HTTPError:
+                # Client errors say nothing about the upstream's health
+                self.breaker.record_success()
+                raise
+            except requests.exceptions.RequestException:
+                # Truncated or undecodable bodies, redirect loops, ...
+                self._count('failures')
+                self.breaker.record_failure()
+                raise
+            except BaseException:
+                # Not the upstream's doing, but a half-open trial must not stay claimed
+                self.breaker.release_trial()
+                raise
+            self.breaker.record_success()
+            return response
+
+    async def aget(self, url, params=None):
+        """
+        Async version of get(), sent through the event loop's pooled httpx client
+
+        Returns:
+            httpx.Response: A successful (2xx/3xx) response
+
+        Raises:
+            CircuitOpenError: If the host's breaker is open
+            httpx.HTTPError: If every attempt failed
+        """
+        started = time.perf_counter()
+        failed = True
+        try:
+            response = await self._aget(url, params)
+            failed = False
+            return response
+        finally:
+            record_upstream(self.host, time.perf_counter() - started, failed)
+
+    async def _aget(self, url, params):
+        if not self.breaker.allow():
+            raise CircuitOpenError(f"Circuit open for {self.host}")
+
+        client = get_async_client()
+        for attempt in range(self.retries + 1):
+            self._count('requests')
+            try:
+                response = await client.get(url, params=params, timeout=httpx.Timeout(
+                    self.timeout[1], connect=self.timeout[0]
+                ))
+                if response.status_code in RETRY_STATUSES:
+                    raise _RetryableStatus(response)
+                response.raise_for_status()
+            except (httpx.TransportError, _RetryableStatus) as e:
+                if attempt < self.retries:
+                    self._count('retries')
+                    await asyncio.sleep(self._backoff_delay(attempt))
+                    continue
+                self._count('failures')
+                self.breaker.record_failure()
+                if isinstance(e, _RetryableStatus):
+                    e.response.raise_for_status()
+                raise
+            except httpx.HTTPStatusError:
+                self.breaker.record_success()
+                raise
+            except httpx.HTTPError:
+                self._count('failures')
+                self.breaker.record_failure()
+                raise
+            except BaseException:
+                # E.g. the calling task was cancelled
+                self.breaker.release_trial()
+                raise
+            self.breaker.record_success()
+            return response
+
+    def metrics(self):
+        """Request counters, breaker state and connection pool usage for this host"""
+        with self._lock:
+            stats = dict(self._stats)
+        container = self.adapter.poolmanager.pools
+        pools = [pool for pool in map(container.get, container.keys()) if pool is not None]
+        stats['pool'] = {
+            'maxsize': self.pool_size,
+            'connections_opened': sum(pool.num_connections for pool in pools),
+            'idle_connections': sum(
+                sum(1 for conn in pool.pool.queue if conn is not None) for pool in pools if pool.pool is not None
+            ),
+            'requests_sent': sum(pool.num_requests for pool in pools),
+        }
+        stats['breaker'] = self.breaker.snapshot()
+        return stats
+
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def get_client(url):
+    """Get the OutboundClient for the host of a URL, creating it on first use"""
+    host = urlsplit(url).netloc
+    client = _clients.get(host)
+    if client is None:
+        with _clients_lock:
+            client = _clients.get(host)
+            if client is None:
+                client = _clients[host] = OutboundClient(host)
+    return client
+
+
+def get(url, params=None):
+    """Send a GET request through the host's pooled client (see OutboundClient.get)"""
+    return get_client(url).get(url, params=params)
+
+
+async def aget(url, params=None):
+    """Async GET through the host's client (see OutboundClient.aget)"""
+    return await get_client(url).aget(url, params=params)
+
+
+def read_json(response):
+    """
+    Decode a response body with trips.jsonlib (faster than response.json())
+
+    Raises:
+        requests.exceptions.JSONDecodeError: For an invalid requests body, so
+            callers handling RequestException keep handling it
+        ValueError: For an invalid httpx body, as httpx's own json() would
+    """
+    try:
+        return jsonlib.loads(response.content)
+    except jsonlib.JSONDecodeError as e:
+        if isinstance(response, requests.Response):
+            raise requests.exceptions.JSONDecodeError(e.msg, e.doc, e.pos)
+        raise
+
+
+def metrics():
+    """
+    Returns:
+        dict: Metrics for every upstream host contacted so far
+    """
+    return {host: client.metrics() for host, client in list(_clients.items())}
+
+
+# httpx clients are bound to the event loop they were first used on
+_async_clients = weakref.WeakKeyDictionary()
+
+
+def get_async_client():
+    """
+    Get the pooled async HTTP client for the running event loop
+
+    Returns:
+        httpx.AsyncClient: Client reusing keep-alive connections across requests
+    """
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None or client.is_closed:
+        client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=ASYNC_MAX_CONNECTIONS,
+                max_keepalive_connections=ASYNC_MAX_KEEPALIVE,
+            ),
+            timeout=httpx.Timeout(READ_TIMEOUT, connect=CONNECT_TIMEOUT),
+        )
+        _async_clients[loop] = client
+    return client
+
+
+async def close_async_client():
+    """Close the client for the running event loop (called on ASGI lifespan shutdown, see travelmate/asgi.py)"""
+    client = _async_clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
@@ -0,0 +1,174 @@
+"""
+Background refresh of the forecast cache for upcoming trips.
+
+Scans trips that are under way or start within the forecast horizon, dedupes
+them by rounded coordinate and day count (the forecast cache key), and
+re-fetches the forecasts that are missing or expired in rate-limited batches,
+soonest trips first. Run it with `python manage.py prefetch_forecasts --loop`,
+or in a daemon thread of the web process (settings.WEATHER_PREFETCH_IN_PROCESS)
+when the cache isn't shared between processes.
+"""
+import threading
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.utils import timezone
+
+from ..models import Trip
+from .weather_service import FORECAST_CACHE, WeatherService
+
+# Open-Meteo forecasts cover at most this many days
+HORIZON_DAYS = 16
+
+# Day count requested by the endpoints that don't depend on trip length
+# (clothing recommendations)
+DEFAULT_DAYS = 7
+
+PREFETCH_RATE = getattr(settings, 'WEATHER_PREFETCH_RATE', 1.0)
+PREFETCH_INTERVAL = getattr(settings, 'WEATHER_PREFETCH_INTERVAL', 60)
+PREFETCH_UNIT = getattr(settings, 'WEATHER_PREFETCH_UNIT', 'fahrenheit')
+
+
+class RateLimiter:
+    """Spaces calls out to at most `rate` per second"""
+
+    def __init__(self, rate):
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self._next = 0.0
+
+    def wait(self):
+        now = time.monotonic()
+        if now < self._next:
+            time.sleep(self._next - now)
+            now = self._next
+        self._next = now + self.interval
+
+
+def upcoming_points(today=None, horizon_days=HORIZON_DAYS):
+    """
+    Forecast requests the views will make for trips in the forecast horizon
+
+    Returns:
+        list: Distinct (latitude, longitude, api_days) tuples, for the
+            soonest trips first
+    """
+    today = today or timezone.localdate()
+    trips = (
+        Trip.objects.filter(
+            travel_end__gte=today,
+            travel_start__lte=today + timedelta(days=horizon_days),
+            latitude__isnull=False,
+            longitude__isnull=False,
+        )
+        .order_by('travel_start')
+        .values_list('latitude', 'longitude', 'travel_start', 'travel_end')
+    )
+
+    points = {}
+    for latitude, longitude, travel_start, travel_end in trips.iterator(chunk_size=2000):
+        latitude, longitude = WeatherService.quantize(latitude, longitude)
+        trip_days = min(HORIZON_DAYS, WeatherService.forecast_days(travel_start, travel_end))
+        for api_days in (trip_days, DEFAULT_DAYS):
+            points.setdefault((latitude, longitude, api_days), None)
+    return list(points)
+
+
+def due_points(points, temperature_unit=PREFETCH_UNIT, lead=0):
+    """Points whose cached forecast is missing or expires within `lead` seconds"""
+    due = []
+    for latitude, longitude, api_days in points:
+        cache_key = WeatherService.forecast_cache_key(latitude, longitude, api_days, temperature_unit)
+        remaining = FORECAST_CACHE.expires_in(cache_key)
+        if remaining is None or remaining <= lead:
+            due.append((latitude, longitude, api_days))
+    return due
+
+
+def batches(points, size=None):
+    """
+    Split points into groups covering at most `size` distinct coordinates
+    each, keeping every day count for a coordinate in the same group (so
+    each coordinate is fetched once)
+    """
+    size = size or WeatherService.BATCH_SIZE
+    by_coordinate = {}
+    for point in points:
+        by_coordinate.setdefault(point[:2], []).append(point)
+
+    coordinates = list(by_coordinate)
+    for start in range(0, len(coordinates), size):
+        yield [point for coordinate in coordinates[start:start + size] for point in by_coordinate[coordinate]]
+
+
+def prefetch_once(rate=PREFETCH_RATE, temperature_unit=PREFETCH_UNIT, lead=0, limiter=None):
+    """
+    Refresh every due forecast for upcoming trips once
+
+    Args:
+        rate (float): Maximum upstream requests per second
+        temperature_unit (str): Unit the views request
+        lead (int): Also refresh forecasts expiring within this many seconds
+        limiter (RateLimiter): Limiter to share across runs (optional)
+
+    Returns:
+        dict: Counts of points scanned and due, locations refreshed and
+            failed, and upstream requests made
+    """
+    limiter = limiter or RateLimiter(rate)
+    points = upcoming_points()
+    due = due_points(points, temperature_unit, lead)
+
+    stats = {'points': len(points), 'due': len(due), 'refreshed': 0, 'failed': 0, 'requests': 0}
+    for batch in batches(due):
+        limiter.wait()
+        refreshed, failed = WeatherService.refresh_forecasts(batch, temperature_unit)
+        stats['refreshed'] += refreshed
+        stats['failed'] += failed
+        stats['requests'] += 1
+    return stats
+
+
+def run_forever(interval=PREFETCH_INTERVAL, rate=PREFETCH_RATE, temperature_unit=PREFETCH_UNIT,
+                lead=0, stop=None, report=None):
+    """
+    Call prefetch_once every `interval` seconds until `stop` is set
+
+    Args:
+        stop (threading.Event): Set to end the loop (optional)
+        report (callable): Called with each run's stats (optional)
+    """
+    stop = stop or threading.Event()
+    limiter = RateLimiter(rate)
+    while not stop.is_set():
+        started = time.monotonic()
+        try:
+            stats = prefetch_once(rate, temperature_unit, lead, limiter)
+            if report is not None:
+                report(stats)
+        except Exception as e:
+            # Keep the worker alive through database or network hiccups
+            print(f"Error prefetching forecasts: {e}")
+        finally:
+            close_old_connections()
+        stop.wait(max(0.0, interval - (time.monotonic() - started)))
+
+
+_thread = None
+_thread_lock = threading.Lock()
+
+
+def start_background_prefetcher():
+    """
+    Start run_forever() in a daemon thread of this process (once)
+
+    Returns:
+        threading.Thread: The prefetcher thread
+    """
+    global _thread
+    with _thread_lock:
+        if _thread is None or not _thread.is_alive():
+            _thread = threading.Thread(target=run_forever, name='forecast-prefetcher', daemon=True)
+            _thread.start()
+    return _thread
@@ -0,0 +1,102 @@
+import asyncio
+import threading
+
+
+class _Call:
+    """An in-progress call that other threads can wait on"""
+
+    __slots__ = ('event', 'result', 'error')
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Collapse concurrent identical calls into a single execution.
+
+    While a call for a key is in flight, any other caller asking for the same
+    key waits for it and receives its result (or its exception) instead of
+    starting a second one. Works for threads (WSGI, sync views) through `do`
+    and for asyncio tasks (ASGI, async views) through `do_async`.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self._tasks = {}
+
+    def do(self, key, fn, *args, **kwargs):
+        """
+        Run fn(*args, **kwargs) unless a call for key is already running
+
+        Args:
+            key (str): Identifies calls that are interchangeable
+            fn (callable): Function doing the actual work
+
+        Returns:
+            The result of the single shared call
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            is_leader = call is None
+            if is_leader:
+                call = _Call()
+                self._calls[key] = call
+
+        if not is_leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn(*args, **kwargs)
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.event.set()
+        return call.result
+
+    async def do_async(self, key, coro_fn, *args, **kwargs):
+        """
+        Await coro_fn(*args, **kwargs) unless a call for key is already running
+
+        The work runs in its own task, so a caller being cancelled does not
+        cancel the call for everybody else waiting on it.
+
+        Args:
+            key (str): Identifies calls that are interchangeable
+            coro_fn (callable): Coroutine function doing the actual work
+
+        Returns:
+            The result of the single shared call
+        """
+        loop = asyncio.get_running_loop()
+        task_key = (loop, key)
+        with self._lock:
+            task = self._tasks.get(task_key)
+            if task is None:
+                task = loop.create_task(coro_fn(*args, **kwargs))
+                self._tasks[task_key] = task
+                task.add_done_callback(lambda _: self._forget(task_key))
+        return await asyncio.shield(task)
+
+    def _forget(self, task_key):
+        with self._lock:
+            self._tasks.pop(task_key, None)
+
+    def in_flight(self):
+        """Number of calls currently running"""
+        with self._lock:
+            return len(self._calls) + len(self._tasks)
+
+
+# Shared by every outbound service so identical upstream requests made at the
+# same moment by different users are only sent once
+UPSTREAM_CALLS = SingleFlight()
@@ -1,18 +1,111 @@
+import hashlib
+import httpx
 import requests
-from datetime import datetime, timedelta
-import random
-import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+
+from .cache import TieredCache
+from .forecast import Forecast
+from .forecast_extension import predict_days
+from .. import metrics
+from . import clothing_rules, http_client
+from .http_client import CircuitOpenError
+from .singleflight import UPSTREAM_CALLS
+
+# Forecasts are shared between everyone travelling to the same place, so they
+# are cached per rounded coordinate rather than per trip. Entries are immutable
+# Forecasts, which the cache hands out without copying.
+FORECAST_CACHE = TieredCache(
+    'forecast:columnar',
+    max_entries=getattr(settings, 'WEATHER_CACHE_MAX_ENTRIES', 1024),
+    shared_alias=getattr(settings, 'WEATHER_CACHE_ALIAS', 'default'),
+    stale_ttl=getattr(settings, 'WEATHER_CACHE_STALE_TTL', 6 * 3600),
+)
+
+# Stale forecasts are served immediately and refreshed on these threads
+# (stale-while-revalidate); each cache key is refreshed at most once at a time
+_revalidate_pool = ThreadPoolExecutor(
+    max_workers=getattr(settings, 'WEATHER_REVALIDATE_WORKERS', 2),
+    thread_name_prefix='forecast-revalidate'
+)
+_revalidating = set()
+_revalidating_lock = threading.Lock()
 
 class WeatherService:
     """Service to interact with Open-Meteo API for weather forecasts"""
     
     BASE_URL = "https://api.open-meteo.com/v1/forecast"
     
+    # Decimal places kept when rounding coordinates (2 places is roughly 1 km,
+    # finer than the resolution of the forecast models themselves)
+    COORDINATE_PRECISION = getattr(settings, 'WEATHER_CACHE_PRECISION', 2)
+    
+    # Open-Meteo refreshes its forecasts once per model run; cached entries
+    # expire at the next run boundary instead of after a fixed delay
+    MODEL_RUN_INTERVAL = getattr(settings, 'WEATHER_MODEL_RUN_INTERVAL', 3600)
+    MIN_CACHE_TTL = 60
+    
+    # Maximum number of locations sent to Open-Meteo in one request
+    BATCH_SIZE = 100
+    
+    # Blend extended forecast days toward seasonal normals
+    EXTENSION_CLIMATOLOGY = getattr(settings, 'WEATHER_EXTENSION_CLIMATOLOGY', True)
+    
+    DAILY_VARIABLES = 'temperature_2m_max,temperature_2m_min,precipitation_sum,precipitation_probability_max'
+    
+    @staticmethod
+    def quantize(latitude, longitude):
+        """Round coordinates so nearby destinations share one forecast"""
+        precision = WeatherService.COORDINATE_PRECISION
+        return round(float(latitude), precision), round(float(longitude), precision)
+    
+    @staticmethod
+    def forecast_cache_key(latitude, longitude, days, temperature_unit):
+        """Build the cache key for an upstream forecast request"""
+        latitude, longitude = WeatherService.quantize(latitude, longitude)
+        return f"{latitude}:{longitude}:{temperature_unit}:{days}"
+    
+    @staticmethod
+    def forecast_ttl(now=None):
+        """Seconds until the next model run makes a cached forecast outdated"""
+        now = time.time() if now is None else now
+        interval = WeatherService.MODEL_RUN_INTERVAL
+        return max(WeatherService.MIN_CACHE_TTL, int(interval - now % interval))
+    
+    @staticmethod
+    def forecast_days(travel_start, travel_end):
+        """Number of forecast days to request for a trip"""
+        # Ensure we get at least 7 days, but cover the entire trip if longer
+        return max(7, (travel_end - travel_start).days + 1)
+    
+    @staticmethod
+    def forecast_params(latitude, longitude, api_days, temperature_unit):
+        """Query parameters for an Open-Meteo forecast request"""
+        return {
+            'latitude': latitude,
+            'longitude': longitude,
+            'daily': WeatherService.DAILY_VARIABLES,
+            'current_weather': 'true',
+            'timezone': 'auto',
+            'forecast_days': api_days,
+            'temperature_unit': temperature_unit  # Request Fahrenheit directly from API
+        }
+    
     @staticmethod
     def get_weather_forecast(latitude, longitude, days=7, temperature_unit="fahrenheit"):
         """
         Get weather forecast for a specific location
         
+        Upstream responses are cached per rounded coordinate, unit and day
+        count, so repeat requests for the same destination are served from
+        memory until the next model run (the soft TTL). For WEATHER_CACHE_STALE_TTL
+        seconds after that (the hard TTL), the expired forecast is still
+        returned straight away while a background refresh fetches a new one.
+        The result's `forecast_age` and `is_stale` fields say which happened.
+        
         Args:
             latitude (float): Location latitude
             longitude (float): Location longitude
@@ -20,102 +113,275 @@ class WeatherService:
             temperature_unit (str): Unit for temperature ('celsius' or 'fahrenheit')
             
         Returns:
-            dict: Weather forecast data
+            Forecast: Weather forecast (to_api() gives the JSON shape), or None
         """
         # Calculate how many days we need from the API (max 16 days)
         api_days = min(16, days)
         
-        params = {
-            'latitude': latitude,
-            'longitude': longitude,
-            'daily': 'temperature_2m_max,temperature_2m_min,precipitation_sum,precipitation_probability_max',
-            'current_weather': 'true',
-            'timezone': 'auto',
-            'forecast_days': api_days,
-            'temperature_unit': temperature_unit  # Request Fahrenheit directly from API
-        }
+        cache_key = WeatherService.forecast_cache_key(latitude, longitude, api_days, temperature_unit)
+        entry = FORECAST_CACHE.get_entry(cache_key)
+        if entry is not None:
+            forecast, age, stale = entry
+            if stale:
+                # Serve the expired forecast now and refresh it in the background
+                WeatherService.revalidate([(latitude, longitude, api_days)], temperature_unit)
+        else:
+            try:
+                # Concurrent misses for the same destination share one upstream
+                # call (and, as forecasts are immutable, its result)
+                forecast = UPSTREAM_CALLS.do(
+                    f"forecast:{cache_key}",
+                    WeatherService._fetch_forecast,
+                    cache_key, latitude, longitude, api_days, temperature_unit
+                )
+                age, stale = 0, False
+            except requests.exceptions.RequestException as e:
+                print(f"Error fetching weather data: {e}")
+                return None
+        
+        # Record how old it is (seconds since it was fetched from Open-Meteo)
+        # and whether it is past its soft TTL and being refreshed
+        forecast = forecast.with_freshness(age, stale)
         
-        try:
-            response = requests.get(WeatherService.BASE_URL, params=params)
-            response.raise_for_status()
-            api_data = response.json()
+        # If requested days exceed API limits, extend the forecast
+        if days > api_days:
+            forecast = WeatherService.extend_forecast(forecast, days)
             
-            # If requested days exceed API limits, extend the forecast
-            if days > api_days:
-                api_data = WeatherService.extend_forecast(api_data, days)
-                
-            return api_data
-        except requests.exceptions.RequestException as e:
-            print(f"Error fetching weather data: {e}")
-            return None
+        return forecast
     
     @staticmethod
-    def extend_forecast(api_data, total_days):
+    def revalidate(points, temperature_unit="fahrenheit"):
         """
-        Extend weather forecast beyond API limit using pattern-based prediction
+        Refresh forecasts in the background, skipping any already being refreshed
         
         Args:
-            api_data (dict): Original weather data from API
-            total_days (int): Total number of days to extend forecast to
+            points (list): (latitude, longitude, api_days) tuples
+            temperature_unit (str): Unit for temperature ('celsius' or 'fahrenheit')
             
         Returns:
-            dict: Extended weather forecast data
+            int: Number of points scheduled for refreshing
         """
-        if not api_data or 'daily' not in api_data:
-            return api_data
-            
-        daily = api_data['daily']
-        available_days = len(daily['time'])
+        with _revalidating_lock:
+            scheduled = {}
+            for latitude, longitude, api_days in points:
+                cache_key = WeatherService.forecast_cache_key(latitude, longitude, api_days, temperature_unit)
+                if cache_key not in _revalidating:
+                    scheduled[cache_key] = (latitude, longitude, api_days)
+            _revalidating.update(scheduled)
+        
+        if not scheduled:
+            return 0
+        
+        def refresh():
+            try:
+                WeatherService.refresh_forecasts(list(scheduled.values()), temperature_unit)
+            except Exception as e:
+                print(f"Error refreshing weather data: {e}")
+            finally:
+                with _revalidating_lock:
+                    _revalidating.difference_update(scheduled)
+        
+        _revalidate_pool.submit(refresh)
+        return len(scheduled)
+    
+    @staticmethod
+    def _fetch_forecast(cache_key, latitude, longitude, api_days, temperature_unit):
+        """Fetch a forecast from Open-Meteo and store it in the cache"""
+        # Another caller may have filled the cache while we were queued (the
+        # caller already counted this lookup's miss)
+        forecast = FORECAST_CACHE.peek(cache_key)
+        if forecast is not None:
+            return forecast
         
-        # Calculate how many additional days we need
-        days_to_add = total_days - available_days
+        latitude, longitude = WeatherService.quantize(latitude, longitude)
+        params = WeatherService.forecast_params(latitude, longitude, api_days, temperature_unit)
         
-        if days_to_add <= 0:
-            return api_data
+        response = http_client.get(WeatherService.BASE_URL, params=params)
+        forecast = Forecast.from_api(http_client.read_json(response))
+        FORECAST_CACHE.set(cache_key, forecast, WeatherService.forecast_ttl())
+        return forecast
+    
+    @staticmethod
+    def get_weather_forecasts(points, days=7, temperature_unit="fahrenheit"):
+        """
+        Get weather forecasts for many locations with as few upstream calls as possible
+        
+        Cached locations are answered from the cache (expired ones within the
+        hard TTL are served as they are and refreshed in the background). The
+        remaining distinct locations are sent to Open-Meteo as comma-separated
+        coordinate lists, BATCH_SIZE locations per request, and the response
+        is split back per location (and cached) before extending each
+        forecast as needed.
+        
+        Args:
+            points (list): (latitude, longitude) or (latitude, longitude, days) tuples
+            days (int): Number of forecast days for points without their own (default: 7)
+            temperature_unit (str): Unit for temperature ('celsius' or 'fahrenheit')
             
-        # Get the last date from the available forecast
-        last_date = datetime.strptime(daily['time'][-1], "%Y-%m-%d")
-        
-        # Analyze patterns from available data to make predictions
-        temp_max_values = daily['temperature_2m_max']
-        temp_min_values = daily['temperature_2m_min']
-        precip_prob_values = daily['precipitation_probability_max']
-        precip_sum_values = daily['precipitation_sum']
-        
-        # Calculate statistics for making predictions
-        avg_temp_max = statistics.mean(temp_max_values)
-        avg_temp_min = statistics.mean(temp_min_values)
-        std_temp_max = statistics.stdev(temp_max_values) if len(temp_max_values) > 1 else 2.0
-        std_temp_min = statistics.stdev(temp_min_values) if len(temp_min_values) > 1 else 2.0
-        avg_precip_prob = statistics.mean(precip_prob_values)
-        avg_precip_sum = statistics.mean(precip_sum_values)
-        
-        # Extend the data arrays
-        for i in range(days_to_add):
-            # Calculate the next date
-            next_date = (last_date + timedelta(days=i+1)).strftime("%Y-%m-%d")
-            daily['time'].append(next_date)
+        Returns:
+            list: Forecast for each point in order, None where unavailable
+        """
+        wanted = []
+        # Cache key -> (forecast, age, stale)
+        found = {}
+        # Rounded coordinate -> cache keys (and their day counts) still missing
+        missing = {}
+        stale = []
+        
+        for point in points:
+            point_days = point[2] if len(point) > 2 else days
+            api_days = min(16, point_days)
+            cache_key = WeatherService.forecast_cache_key(point[0], point[1], api_days, temperature_unit)
+            wanted.append((cache_key, point_days, api_days))
+            if cache_key in found:
+                continue
             
-            # Generate predicted values with some randomness based on history
-            # For temperatures, use the moving average with some variance
-            predicted_max = avg_temp_max + random.uniform(-1, 1) * std_temp_max
-            predicted_min = avg_temp_min + random.uniform(-1, 1) * std_temp_min
+            entry = FORECAST_CACHE.get_entry(cache_key)
+            if entry is not None:
+                found[cache_key] = entry
+                if entry[2]:
+                    stale.append((point[0], point[1], api_days))
+            else:
+                coordinate = WeatherService.quantize(point[0], point[1])
+                missing.setdefault(coordinate, {})[cache_key] = api_days
+        
+        # Expired forecasts are served as they are and refreshed in the background
+        if stale:
+            WeatherService.revalidate(stale, temperature_unit)
+        
+        fetched, _ = WeatherService._fetch_into_cache(missing, temperature_unit)
+        for cache_key, forecast in fetched.items():
+            found[cache_key] = (forecast, 0, False)
+        
+        forecasts = []
+        for cache_key, point_days, api_days in wanted:
+            forecast = None
+            if cache_key in found:
+                forecast, age, is_stale = found[cache_key]
+                forecast = forecast.with_freshness(age, is_stale)
+                if point_days > api_days:
+                    forecast = WeatherService.extend_forecast(forecast, point_days)
+            forecasts.append(forecast)
+        return forecasts
+    
+    @staticmethod
+    def refresh_forecasts(points, temperature_unit="fahrenheit"):
+        """
+        Fetch forecasts and store them in the cache, whether or not they are
+        already cached (used to refresh the cache ahead of user requests)
+        
+        Args:
+            points (list): (latitude, longitude, api_days) tuples, at most
+                16 days each
+            temperature_unit (str): Unit for temperature ('celsius' or 'fahrenheit')
             
-            # Ensure min temperature is always less than max
-            if predicted_min > predicted_max:
-                predicted_min, predicted_max = predicted_max, predicted_min
-                
-            # For precipitation, use average with randomness
-            predicted_precip_prob = min(100, max(0, avg_precip_prob + random.uniform(-15, 15)))
-            predicted_precip_sum = max(0, avg_precip_sum * random.uniform(0.5, 1.5))
+        Returns:
+            tuple: (number of locations refreshed, number that failed)
+        """
+        missing = {}
+        for latitude, longitude, api_days in points:
+            cache_key = WeatherService.forecast_cache_key(latitude, longitude, api_days, temperature_unit)
+            coordinate = WeatherService.quantize(latitude, longitude)
+            missing.setdefault(coordinate, {})[cache_key] = api_days
+        
+        _, failed = WeatherService._fetch_into_cache(missing, temperature_unit)
+        return len(missing) - len(failed), len(failed)
+    
+    @staticmethod
+    def _fetch_into_cache(missing, temperature_unit):
+        """
+        Fetch forecasts for rounded coordinates, BATCH_SIZE per request, and
+        cache each requested day count
+        
+        Args:
+            missing (dict): Rounded coordinate -> {cache key: api days}
+            temperature_unit (str): Unit for temperature ('celsius' or 'fahrenheit')
             
-            # Add predicted values to the arrays
-            daily['temperature_2m_max'].append(round(predicted_max, 1))
-            daily['temperature_2m_min'].append(round(predicted_min, 1))
-            daily['precipitation_probability_max'].append(round(predicted_precip_prob))
-            daily['precipitation_sum'].append(round(predicted_precip_sum, 1))
+        Returns:
+            tuple: ({cache key: forecast} for everything fetched,
+                list of coordinates whose request failed)
+        """
+        found = {}
+        failed = []
+        coordinates = list(missing)
+        for start in range(0, len(coordinates), WeatherService.BATCH_SIZE):
+            batch = coordinates[start:start + WeatherService.BATCH_SIZE]
+            # One request covers every day count asked for in the batch; shorter
+            # forecasts are the leading days of the longest one
+            batch_days = max(max(missing[coordinate].values()) for coordinate in batch)
+            try:
+                payloads = WeatherService._fetch_forecast_batch(batch, batch_days, temperature_unit)
+            except requests.exceptions.RequestException as e:
+                print(f"Error fetching weather data: {e}")
+                failed.extend(batch)
+                continue
+            
+            ttl = WeatherService.forecast_ttl()
+            for coordinate, api_data in zip(batch, payloads):
+                forecast = Forecast.from_api(api_data)
+                for cache_key, api_days in missing[coordinate].items():
+                    truncated = forecast.truncated(api_days)
+                    FORECAST_CACHE.set(cache_key, truncated, ttl)
+                    found[cache_key] = truncated
+        return found, failed
+    
+    @staticmethod
+    def _fetch_forecast_batch(coordinates, api_days, temperature_unit):
+        """
+        Fetch forecasts for several rounded coordinates in a single request
+        
+        Returns:
+            list: One forecast dict per coordinate, in the same order
+        """
+        params = WeatherService.forecast_params(
+            ','.join(str(latitude) for latitude, _ in coordinates),
+            ','.join(str(longitude) for _, longitude in coordinates),
+            api_days,
+            temperature_unit
+        )
+        
+        response = http_client.get(WeatherService.BASE_URL, params=params)
+        payload = http_client.read_json(response)
+        
+        # Open-Meteo answers a single location with an object and several with a list
+        if isinstance(payload, dict):
+            payload = [payload]
+        if len(payload) != len(coordinates):
+            raise requests.exceptions.RequestException(
+                f"Expected {len(coordinates)} forecasts, got {len(payload)}"
+            )
+        return payload
+    
+    @staticmethod
+    def extend_forecast(forecast, total_days):
+        """
+        Extend weather forecast beyond API limit using pattern-based prediction
+        
+        Predictions are seeded from the location and forecast start date, so
+        the same forecast always extends the same way (see forecast_extension).
+        
+        Args:
+            forecast (Forecast): Original forecast from the API
+            total_days (int): Total number of days to extend forecast to
             
-        return api_data
+        Returns:
+            Forecast: Extended forecast (the original is unchanged)
+        """
+        if not forecast:
+            return forecast
+        
+        ordinals, columns = predict_days(
+            forecast.ordinals,
+            forecast.columns,
+            total_days,
+            forecast.latitude,
+            forecast.longitude,
+            fahrenheit=forecast.is_fahrenheit,
+            climatology=WeatherService.EXTENSION_CLIMATOLOGY
+        )
+        if not ordinals:
+            return forecast
+        return forecast.with_extra_days(ordinals, columns)
     
     @staticmethod
     def celsius_to_fahrenheit(celsius):
@@ -123,90 +389,126 @@ class WeatherService:
         return (celsius * 9/5) + 32
     
     @staticmethod
-    def get_clothing_recommendations(weather_data, is_business=False):
+    def clothing_advice(forecast, is_business=False):
+        """
+        Clothing recommendations for each day of a forecast
+        
+        Returns:
+            list: One tuple of advice strings per day, in forecast order
+        """
+        if not forecast:
+            return []
+        with metrics.span('recommendations'):
+            return clothing_rules.recommend(
+                forecast.column('temperature_2m_max').tolist(),
+                forecast.column('precipitation_probability_max').tolist(),
+                'business' if is_business else 'casual',
+                forecast.is_fahrenheit
+            )
+    
+    @staticmethod
+    def get_clothing_recommendations(forecast, is_business=False):
         """
         Generate clothing recommendations based on weather data
         
         Args:
-            weather_data (dict): Weather forecast data
+            forecast (Forecast): Weather forecast
             is_business (bool): Whether recommendations are for business travelers
             
         Returns:
             dict: Clothing recommendations for each day
         """
-        if not weather_data or 'daily' not in weather_data:
+        if not forecast:
             return {}
+        return dict(zip(forecast.dates, WeatherService.clothing_advice(forecast, is_business)))
+    
+    @staticmethod
+    def recommendations_fingerprint(forecast, is_business=False):
+        """
+        Fingerprint of everything get_clothing_recommendations depends on
         
-        recommendations = {}
-        daily = weather_data['daily']
-        dates = daily['time']
-        max_temps = daily['temperature_2m_max']
-        min_temps = daily['temperature_2m_min']
-        precip_probs = daily['precipitation_probability_max']
-        
-        # Check if temperatures are already in Fahrenheit
-        is_fahrenheit = weather_data.get('daily_units', {}).get('temperature_2m_max', '').lower() == '°f'
-        
-        for i, date in enumerate(dates):
-            day_recommendations = []
-            max_temp = max_temps[i]
-            min_temp = min_temps[i]
-            rain_probability = precip_probs[i]
-            
-            # Temperature thresholds adjusted for Fahrenheit
-            if is_fahrenheit:
-                # Fahrenheit thresholds
-                hot_threshold = 77  # 25°C in °F
-                mild_threshold = 59  # 15°C in °F
-                cool_threshold = 41  # 5°C in °F
-            else:
-                # Celsius thresholds
-                hot_threshold = 25
-                mild_threshold = 15
-                cool_threshold = 5
-            
-            # Temperature-based recommendations
-            if max_temp > hot_threshold:
-                if is_business:
-                    day_recommendations.append("Light business suit or dress shirt with light trousers")
-                    day_recommendations.append("Consider a lightweight blazer for meetings")
-                else:
-                    day_recommendations.append("Light clothing like t-shirts and shorts")
-                    day_recommendations.append("Breathable fabrics recommended")
-            elif max_temp > mild_threshold:
-                if is_business:
-                    day_recommendations.append("Standard business suit or blouse with skirt/trousers")
-                    day_recommendations.append("Light jacket may be needed for morning/evening")
-                else:
-                    day_recommendations.append("Light jacket or sweater with pants")
-                    day_recommendations.append("Layered clothing recommended")
-            elif max_temp > cool_threshold:
-                if is_business:
-                    day_recommendations.append("Wool or heavier business suit")
-                    day_recommendations.append("Consider a topcoat or trench coat")
-                else:
-                    day_recommendations.append("Medium-weight jacket and layers")
-                    day_recommendations.append("Long sleeves and pants recommended")
-            else:
-                if is_business:
-                    day_recommendations.append("Heavier business suit with warm overcoat")
-                    day_recommendations.append("Scarf and gloves may be necessary")
-                else:
-                    day_recommendations.append("Heavy winter coat with layers")
-                    day_recommendations.append("Hat, scarf, and gloves recommended")
-            
-            # Rain recommendations
-            if rain_probability > 60:
-                if is_business:
-                    day_recommendations.append("Bring a formal umbrella and waterproof footwear")
-                else:
-                    day_recommendations.append("Bring a raincoat, umbrella, and waterproof footwear")
-            elif rain_probability > 30:
-                if is_business:
-                    day_recommendations.append("Consider bringing a compact umbrella")
-                else:
-                    day_recommendations.append("Pack a light rain jacket or umbrella just in case")
-            
-            recommendations[date] = day_recommendations
-            
-        return recommendations 
\ No newline at end of file
+        Two forecasts with the same fingerprint produce the same
+        recommendations, so stored recommendations only need rebuilding when
+        it changes.
+        
+        Returns:
+            str: Hex digest, or '' if there is no forecast
+        """
+        if not forecast:
+            return ''
+        
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(repr((
+            clothing_rules.RULES_VERSION,
+            'business' if is_business else 'casual',
+            forecast.is_fahrenheit,
+        )).encode())
+        digest.update(forecast.ordinals)
+        digest.update(forecast.column('temperature_2m_max'))
+        digest.update(forecast.column('precipitation_probability_max'))
+        return digest.hexdigest()
+    
+    @staticmethod
+    def forecast_fingerprint(forecast):
+        """
+        Fingerprint of a forecast's values, for keying anything rendered from it
+        
+        Returns:
+            str: Hex digest, or '' if there is no forecast
+        """
+        return forecast.fingerprint if forecast else ''
+
+class AsyncWeatherService:
+    """Non-blocking version of WeatherService for async views"""
+    
+    @staticmethod
+    async def get_weather_forecast(latitude, longitude, days=7, temperature_unit="fahrenheit"):
+        """
+        Get weather forecast for a specific location without blocking the event loop
+        
+        Shares its cache with WeatherService.get_weather_forecast and takes the
+        same arguments.
+        
+        Returns:
+            Forecast: Weather forecast, or None
+        """
+        api_days = min(16, days)
+        
+        cache_key = WeatherService.forecast_cache_key(latitude, longitude, api_days, temperature_unit)
+        entry = await FORECAST_CACHE.aget_entry(cache_key)
+        if entry is not None:
+            forecast, age, stale = entry
+            if stale:
+                WeatherService.revalidate([(latitude, longitude, api_days)], temperature_unit)
+        else:
+            try:
+                forecast = await UPSTREAM_CALLS.do_async(
+                    f"forecast:{cache_key}",
+                    AsyncWeatherService._fetch_forecast,
+                    cache_key, latitude, longitude, api_days, temperature_unit
+                )
+                age, stale = 0, False
+            except (httpx.HTTPError, CircuitOpenError, ValueError) as e:
+                print(f"Error fetching weather data: {e}")
+                return None
+        
+        forecast = forecast.with_freshness(age, stale)
+        
+        if days > api_days:
+            forecast = WeatherService.extend_forecast(forecast, days)
+        return forecast
+    
+    @staticmethod
+    async def _fetch_forecast(cache_key, latitude, longitude, api_days, temperature_unit):
+        """Fetch a forecast from Open-Meteo and store it in the cache"""
+        forecast = await FORECAST_CACHE.apeek(cache_key)
+        if forecast is not None:
+            return forecast
+        
+        latitude, longitude = WeatherService.quantize(latitude, longitude)
+        params = WeatherService.forecast_params(latitude, longitude, api_days, temperature_unit)
+        
+        response = await http_client.aget(WeatherService.BASE_URL, params=params)
+        forecast = Forecast.from_api(http_client.read_json(response))
+        await FORECAST_CACHE.aset(cache_key, forecast, WeatherService.forecast_ttl())
+        return forecast
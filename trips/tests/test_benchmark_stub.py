@@ -0,0 +1,52 @@
+import json
+import os
+import tempfile
+from datetime import date
+from unittest import mock
+
+import requests
+from django.test import SimpleTestCase
+
+from trips.benchmarks import suite
+from trips.benchmarks.stub import OpenMeteoStub, Recordings, forecast_payload
+
+
+class RecordedStubTests(SimpleTestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, 'open_meteo.json')
+
+    def _write(self, responses):
+        with open(self.path, 'w', encoding='utf-8') as f:
+            json.dump({'recorded_on': '2020-01-01', 'responses': responses}, f)
+
+    def test_replays_recordings_and_falls_back_to_synthetic(self):
+        params = {'latitude': '48.85', 'longitude': '2.35', 'forecast_days': '3'}
+        recorded = forecast_payload(48.85, 2.35, 3)
+        recorded['daily']['time'] = ['2020-01-01', '2020-01-02', '2020-01-03']
+        recorded['current_weather']['temperature'] = -40.0
+        self._write({Recordings.key('/v1/forecast', params): recorded})
+        replay = Recordings(self.path)
+
+        with OpenMeteoStub(recordings=replay) as stub:
+            body = requests.get(stub.forecast_url, params=params, timeout=5).json()
+            self.assertEqual(body['current_weather']['temperature'], -40.0)
+            self.assertEqual(body['daily']['time'][0], date.today().isoformat())
+            self.assertEqual((replay.misses, suite.upstream_source(replay)), (0, 'recorded'))
+
+            other = requests.get(stub.forecast_url, params={**params, 'latitude': '1.0'}, timeout=5).json()
+            self.assertNotEqual(other['current_weather']['temperature'], -40.0)
+            self.assertEqual((replay.misses, suite.upstream_source(replay)), (1, 'mixed'))
+
+    def test_without_recordings_everything_is_synthetic(self):
+        replay = Recordings(self.path)
+        with OpenMeteoStub(recordings=replay) as stub:
+            requests.get(stub.geocoding_url, params={'name': 'Paris', 'count': 1}, timeout=5).raise_for_status()
+        self.assertEqual((replay.misses, suite.upstream_source(replay)), (1, 'synthetic'))
+
+    def test_recordings_can_be_required(self):
+        with mock.patch.object(suite, 'benchmark_database') as database:
+            with self.assertRaisesMessage(ValueError, '--record'):
+                suite.run(recordings=self.path, require_recordings=True)
+        database.assert_not_called()
@@ -0,0 +1,153 @@
+from datetime import date
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from trips import jsonlib
+from trips.models import Trip
+from trips.services import bulk_trips
+from trips.services.geocoding_service import GeocodingService
+
+COMPARED = ('destination', 'latitude', 'longitude', 'travel_start', 'travel_end',
+            'activities', 'packing_list', 'meeting_schedule')
+
+
+def _lines(text):
+    return text.encode().splitlines(keepends=True)
+
+
+def _ndjson(*rows):
+    return b''.join(jsonlib.dumps(row) + b'\n' for row in rows)
+
+
+def _row(destination='Paris', latitude=48.85, longitude=2.35, **fields):
+    row = {'destination': destination, 'travel_start': '2026-06-01', 'travel_end': '2026-06-04', **fields}
+    if latitude is not None:
+        row.update(latitude=latitude, longitude=longitude)
+    return row
+
+
+class BulkTripsApiTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('traveler', password='secret')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def _import(self, body, content_type):
+        return self.client.post('/api/trips/import/', body, content_type=content_type)
+
+    def test_export_then_import_round_trips(self):
+        Trip.objects.create(
+            user=self.user, destination='Paris', latitude=48.85, longitude=2.35,
+            travel_start=date(2026, 6, 1), travel_end=date(2026, 6, 4),
+            activities='Museums, "cafés"', packing_list=['coat', 'umbrella; small'], meeting_schedule='9:00 kickoff'
+        )
+        Trip.objects.create(
+            user=self.user, destination='Zürich', latitude=47.37, longitude=8.54,
+            travel_start=date(2026, 7, 1), travel_end=date(2026, 7, 2)
+        )
+        original = list(Trip.objects.filter(user=self.user).order_by('travel_start').values(*COMPARED))
+
+        for file_format, content_type in (('ndjson', 'application/x-ndjson'), ('csv', 'text/csv')):
+            with self.subTest(file_format=file_format):
+                self.client.force_authenticate(self.user)
+                response = self.client.get(f'/api/trips/export.{file_format}')
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(response['Content-Type'], content_type)
+                body = b''.join(response.streaming_content)
+
+                other = User.objects.create_user(f'copy-{file_format}', password='secret')
+                self.client.force_authenticate(other)
+                response = self._import(body, content_type)
+                self.assertEqual(response.status_code, 201, response.data)
+                self.assertEqual((response.data['created'], response.data['failed']), (2, 0))
+                copied = list(Trip.objects.filter(user=other).order_by('travel_start').values(*COMPARED))
+                self.assertEqual(copied, original)
+
+    def test_errors_are_reported_by_line(self):
+        body = b'\n'.join([
+            jsonlib.dumps(_row()),
+            b'not json',
+            b'',
+            jsonlib.dumps(['a', 'list']),
+            jsonlib.dumps(_row(travel_start='someday')),
+        ]) + b'\n'
+        response = self._import(body, 'application/x-ndjson')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual((response.data['rows'], response.data['created'], response.data['failed']), (4, 1, 3))
+        self.assertEqual([error['line'] for error in response.data['errors']], [2, 4, 5])
+        self.assertIn('travel_start', response.data['errors'][2]['errors'])
+
+    def test_only_failed_rows_means_bad_request(self):
+        response = self._import(b'{}\n', 'application/x-ndjson')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(Trip.objects.count(), 0)
+
+    def test_reported_errors_are_capped(self):
+        with mock.patch.object(bulk_trips, 'MAX_REPORTED_ERRORS', 3):
+            response = self._import(b'x\n' * 5, 'application/x-ndjson')
+        self.assertEqual(response.data['failed'], 5)
+        self.assertEqual([error['line'] for error in response.data['errors']], [1, 2, 3])
+
+    def test_csv_without_required_columns(self):
+        response = self._import(b'destination,travel_start\nParis,2026-06-01\n', 'text/csv')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('travel_end', response.data['error'])
+
+    def test_csv_packing_list_forms(self):
+        body = (
+            'destination,latitude,longitude,travel_start,travel_end,packing_list\n'
+            'Paris,48.85,2.35,2026-06-01,2026-06-04,coat; umbrella\n'
+            'Rome,41.9,12.5,2026-06-01,2026-06-04,"[""hat""]"\n'
+        ).encode()
+        self.assertEqual(self._import(body, 'text/csv').status_code, 201)
+        self.assertEqual(
+            list(Trip.objects.order_by('destination').values_list('packing_list', flat=True)),
+            [['coat', 'umbrella'], ['hat']]
+        )
+
+    def test_unknown_export_format(self):
+        self.assertEqual(self.client.get('/api/trips/export.xml').status_code, 404)
+
+    def test_unknown_import_format(self):
+        response = self.client.post('/api/trips/import/?file_format=xml', b'x', content_type='application/xml')
+        self.assertEqual(response.status_code, 400)
+
+
+class ImportGeocodingTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('traveler', password='secret')
+
+    def test_each_destination_is_geocoded_once_per_chunk(self):
+        rows = [
+            _row('Paris', None), _row('PARIS', None), _row('Lyon', None),  # Chunk 1
+            _row('Paris', None), _row('Rome'), _row('Lyon', None),  # Chunk 2 (Rome has coordinates)
+        ]
+        many = mock.Mock(side_effect=GeocodingService.get_coordinates_many)
+
+        with mock.patch.object(GeocodingService, 'get_coordinates_many', many), \
+                mock.patch.object(GeocodingService, '_fetch_coordinates', return_value=(1.0, 2.0)) as fetched:
+            result = bulk_trips.import_trips(self.user, _ndjson(*rows).splitlines(keepends=True), chunk_size=3)
+
+        self.assertEqual([set(call.args[0]) for call in many.call_args_list],
+                         [{'Paris', 'PARIS', 'Lyon'}, {'Paris', 'Lyon'}])
+        # One lookup per normalized name; the second chunk is answered from the cache
+        self.assertEqual(sorted(call.args[0].lower() for call in fetched.call_args_list), ['lyon', 'paris'])
+        self.assertEqual(result['created'], 6)
+        self.assertEqual((result['geocoded'], result['not_geocoded']), (4, 0))
+        self.assertFalse(Trip.objects.filter(latitude__isnull=True).exists())
+
+    def test_names_not_found_are_not_counted_as_geocoded(self):
+        rows = [_row('Paris', None), _row('Atlantis', None)]
+
+        def fetch(name):
+            return (48.85, 2.35) if name == 'Paris' else (None, None)
+
+        with mock.patch.object(GeocodingService, '_fetch_coordinates', side_effect=fetch) as fetched:
+            result = bulk_trips.import_trips(self.user, _ndjson(*rows).splitlines(keepends=True))
+
+        self.assertEqual(fetched.call_count, 2)
+        self.assertEqual((result['created'], result['geocoded'], result['not_geocoded']), (2, 1, 1))
+        self.assertIsNone(Trip.objects.get(destination='Atlantis').latitude)
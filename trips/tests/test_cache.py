@@ -0,0 +1,182 @@
+import asyncio
+import threading
+import time
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import SimpleTestCase
+
+from trips import jsonlib
+from trips.benchmarks.stub import OpenMeteoStub, forecast_payload
+from trips.benchmarks.utils import use_stub
+from trips.services import weather_service
+from trips.services.cache import TieredCache
+from trips.services.forecast import Forecast
+from trips.services.weather_service import FORECAST_CACHE, AsyncWeatherService, WeatherService
+
+
+class TieredCacheLocalTierTests(SimpleTestCase):
+    def setUp(self):
+        self.cache = TieredCache('test', max_entries=2, shared_alias=None, stale_ttl=100)
+        self.now = 1000.0
+        patcher = mock.patch('trips.services.cache.time.time', side_effect=lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_get_entry_keeps_recently_used_entries(self):
+        self.cache.set('a', 1, 60)
+        self.cache.set('b', 2, 60)
+        self.assertEqual(self.cache.get_entry('a')[0], 1)
+        self.cache.set('c', 3, 60)
+
+        self.assertIsNotNone(self.cache.get_entry('a'))
+        self.assertIsNone(self.cache.get_entry('b'))
+        self.assertEqual(self.cache.stats()['evictions'], 1)
+
+    def test_get_keeps_recently_used_entries(self):
+        self.cache.set('a', 1, 60)
+        self.cache.set('b', 2, 60)
+        self.assertEqual(self.cache.get('a'), 1)
+        self.cache.set('c', 3, 60)
+        self.assertEqual(self.cache.get('a'), 1)
+        self.assertIsNone(self.cache.get('b'))
+
+    def test_stale_entries(self):
+        self.cache.set('a', 1, 60)
+        self.now += 90
+        self.assertIsNone(self.cache.get('a'))
+        self.assertEqual(self.cache.get_entry('a'), (1, 90.0, True))
+
+        self.now += 100
+        self.assertIsNone(self.cache.get_entry('a'))
+        self.assertEqual(self.cache.stats()['local_size'], 0)
+
+    def test_peek_counts_nothing(self):
+        self.assertIsNone(self.cache.peek('a'))
+        self.cache.set('a', 1, 60)
+        self.assertEqual(self.cache.peek('a'), 1)
+        self.now += 90
+        self.assertIsNone(self.cache.peek('a'))
+        stats = self.cache.stats()
+        self.assertEqual((stats['local_hits'], stats['misses'], stats['stale_hits']), (0, 0, 0))
+
+    def test_counters(self):
+        self.cache.set('a', 1, 60)
+        self.cache.get_entry('a')
+        self.cache.get('a')
+        self.cache.get_entry('missing')
+        self.now += 90
+        self.cache.get_entry('a')
+        stats = self.cache.stats()
+        self.assertEqual((stats['local_hits'], stats['misses'], stats['stale_hits']), (2, 1, 1))
+
+
+class ForecastCacheCountingTests(SimpleTestCase):
+    """A cold forecast lookup counts one miss, a warm one one hit"""
+
+    def setUp(self):
+        self._clear()
+        self.addCleanup(self._clear)
+        payload = forecast_payload(48.85, 2.35, 7)
+        self.response = mock.Mock(content=jsonlib.dumps(payload))
+
+    @staticmethod
+    def _clear():
+        FORECAST_CACHE.clear()
+        cache.clear()
+
+    def _assert_counts(self, hits, misses):
+        stats = FORECAST_CACHE.stats()
+        self.assertEqual((stats['local_hits'] + stats['shared_hits'], stats['misses']), (hits, misses))
+
+    def test_sync(self):
+        with mock.patch('trips.services.http_client.get', return_value=self.response):
+            WeatherService.get_weather_forecast(48.85, 2.35, 7)
+            self._assert_counts(0, 1)
+            WeatherService.get_weather_forecast(48.85, 2.35, 7)
+            self._assert_counts(1, 1)
+
+    def test_async(self):
+        async def aget(url, params=None):
+            return self.response
+
+        with mock.patch('trips.services.http_client.aget', side_effect=aget):
+            asyncio.run(AsyncWeatherService.get_weather_forecast(48.85, 2.35, 7))
+            self._assert_counts(0, 1)
+            asyncio.run(AsyncWeatherService.get_weather_forecast(48.85, 2.35, 7))
+            self._assert_counts(1, 1)
+
+
+class StaleWhileRevalidateTests(SimpleTestCase):
+    """Expired forecasts within the hard TTL are served at once and refreshed in the background"""
+
+    POINT = (48.85, 2.35, 7)
+
+    def setUp(self):
+        self.stub = OpenMeteoStub().start()
+        self.addCleanup(self.stub.stop)
+        context = use_stub(self.stub)
+        context.__enter__()
+        self.addCleanup(context.__exit__, None, None, None)
+        self.key = WeatherService.forecast_cache_key(*self.POINT, 'fahrenheit')
+        payload = forecast_payload(*self.POINT)
+        payload['current_weather']['temperature'] = -40.0  # Marks the cached copy
+        self.cached = Forecast.from_api(payload)
+
+    def _store(self, expired_for):
+        FORECAST_CACHE.set(self.key, self.cached, -expired_for)
+
+    def _get(self):
+        return WeatherService.get_weather_forecast(*self.POINT)
+
+    def _wait_for_refresh(self):
+        deadline = time.monotonic() + 5
+        while weather_service._revalidating and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertFalse(weather_service._revalidating)
+
+    def test_stale_forecast_is_served_while_one_refresh_runs(self):
+        self._store(60)
+        release = threading.Event()
+        refresh = WeatherService.refresh_forecasts
+
+        def blocked_refresh(points, temperature_unit):
+            release.wait(5)
+            return refresh(points, temperature_unit)
+
+        with mock.patch.object(WeatherService, 'refresh_forecasts', side_effect=blocked_refresh) as refreshes:
+            for _ in range(5):
+                forecast = self._get()
+                self.assertTrue(forecast.is_stale)
+                self.assertEqual(forecast.current_weather['temperature'], -40.0)
+            self.assertEqual(self.stub.request_count(), 0)
+            release.set()
+            self._wait_for_refresh()
+        self.assertEqual(refreshes.call_count, 1)
+        self.assertEqual(self.stub.request_count(), 1)
+
+        forecast = self._get()
+        self.assertFalse(forecast.is_stale)
+        self.assertNotEqual(forecast.current_weather['temperature'], -40.0)
+        self.assertEqual(self.stub.request_count(), 1)
+
+    def test_failed_refresh_keeps_serving_the_stale_forecast(self):
+        self._store(60)
+        self.stub.status = 503
+        self.assertTrue(self._get().is_stale)
+        self._wait_for_refresh()
+
+        forecast = self._get()
+        self.assertTrue(forecast.is_stale)
+        self.assertEqual(forecast.current_weather['temperature'], -40.0)
+        self._wait_for_refresh()
+        self.assertGreaterEqual(self.stub.request_count(), 2)  # Retried on the next read
+
+    def test_past_the_hard_ttl_the_forecast_is_fetched(self):
+        self._store(FORECAST_CACHE.stale_ttl + 1)
+        forecast = self._get()
+        self.assertFalse(forecast.is_stale)
+        self.assertEqual(forecast.forecast_age, 0)
+        self.assertNotEqual(forecast.current_weather['temperature'], -40.0)
+        self.assertEqual(self.stub.request_count(), 1)
+        self.assertFalse(weather_service._revalidating)
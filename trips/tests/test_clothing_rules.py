@@ -0,0 +1,95 @@
+import math
+
+from django.test import SimpleTestCase
+
+from trips.benchmarks.stub import forecast_payload
+from trips.services import clothing_rules
+from trips.services.clothing_rules import recommend
+from trips.services.forecast import Forecast
+from trips.services.weather_service import WeatherService
+
+
+def _reference(max_temp, rain_probability, is_business, fahrenheit):
+    """The if/elif chain the rule table replaced"""
+    hot, mild, cool = (77, 59, 41) if fahrenheit else (25, 15, 5)
+    if max_temp > hot:
+        advice = (["Light business suit or dress shirt with light trousers", "Consider a lightweight blazer for meetings"]
+                  if is_business else ["Light clothing like t-shirts and shorts", "Breathable fabrics recommended"])
+    elif max_temp > mild:
+        advice = (["Standard business suit or blouse with skirt/trousers", "Light jacket may be needed for morning/evening"]
+                  if is_business else ["Light jacket or sweater with pants", "Layered clothing recommended"])
+    elif max_temp > cool:
+        advice = (["Wool or heavier business suit", "Consider a topcoat or trench coat"]
+                  if is_business else ["Medium-weight jacket and layers", "Long sleeves and pants recommended"])
+    else:
+        advice = (["Heavier business suit with warm overcoat", "Scarf and gloves may be necessary"]
+                  if is_business else ["Heavy winter coat with layers", "Hat, scarf, and gloves recommended"])
+    if rain_probability > 60:
+        advice.append("Bring a formal umbrella and waterproof footwear" if is_business
+                      else "Bring a raincoat, umbrella, and waterproof footwear")
+    elif rain_probability > 30:
+        advice.append("Consider bringing a compact umbrella" if is_business
+                      else "Pack a light rain jacket or umbrella just in case")
+    return tuple(advice)
+
+
+class RecommendTests(SimpleTestCase):
+    def test_matches_the_original_rules(self):
+        temperatures = [t / 2 for t in range(-40, 221)] + [4.99, 5.01, 24.99, 25.01, 40.9, 41.1, 76.9, 77.1]
+        probabilities = list(range(101)) + [30.5, 60.01, 29.99]
+        for fahrenheit in (False, True):
+            for traveler_type in ('casual', 'business'):
+                with self.subTest(fahrenheit=fahrenheit, traveler_type=traveler_type):
+                    days = [(t, p) for t in temperatures for p in probabilities]
+                    expected = [_reference(t, p, traveler_type == 'business', fahrenheit) for t, p in days]
+                    actual = recommend([t for t, _ in days], [p for _, p in days], traveler_type, fahrenheit)
+                    self.assertEqual(actual, expected)
+
+    def test_missing_values(self):
+        self.assertEqual(recommend([None, math.nan], [80, 80]), [clothing_rules.NO_DATA] * 2)
+        # A missing probability counts as dry
+        self.assertEqual(recommend([20], [None]), [_reference(20, 0, False, False)])
+
+    def test_unknown_traveler_type_gets_the_default_advice(self):
+        self.assertEqual(recommend([20, 30], [50, 90], 'astronaut'), recommend([20, 30], [50, 90], 'casual'))
+
+    def test_days_with_the_same_weather_share_advice(self):
+        first, second = recommend([20, 20.5], [10, 12])
+        self.assertIs(first, second)
+
+    def test_compiled_table_follows_the_rules(self):
+        compiled = clothing_rules._compile({
+            **clothing_rules.RULES,
+            'casual': {**clothing_rules.RULES['casual'], 'precipitation': {
+                **clothing_rules.RULES['casual']['precipitation'], 'dry': ("Sunglasses",),
+            }},
+        })
+        self.assertNotEqual(compiled, clothing_rules.COMPILED_RULES)
+        self.assertEqual(compiled['casual'][0][-1], "Sunglasses")
+
+
+class ForecastRecommendationsTests(SimpleTestCase):
+    def test_recommendations_by_date(self):
+        for unit in ('fahrenheit', 'celsius'):
+            payload = forecast_payload(48.85, 2.35, 5, unit)
+            daily = payload['daily']
+            recommendations = WeatherService.get_clothing_recommendations(Forecast.from_api(payload), True)
+            self.assertEqual(list(recommendations), daily['time'])
+            for day, max_temp, probability in zip(
+                daily['time'], daily['temperature_2m_max'], daily['precipitation_probability_max']
+            ):
+                self.assertEqual(recommendations[day], _reference(max_temp, probability, True, unit == 'fahrenheit'))
+
+    def test_fingerprint_follows_the_inputs(self):
+        payload = forecast_payload(48.85, 2.35, 5)
+        forecast = Forecast.from_api(payload)
+        fingerprint = WeatherService.recommendations_fingerprint(forecast)
+        self.assertEqual(WeatherService.recommendations_fingerprint(Forecast.from_api(payload)), fingerprint)
+        self.assertNotEqual(WeatherService.recommendations_fingerprint(forecast, True), fingerprint)
+
+        # Minimum temperatures don't change the advice, maximums do
+        payload['daily']['temperature_2m_min'][0] -= 10
+        self.assertEqual(WeatherService.recommendations_fingerprint(Forecast.from_api(payload)), fingerprint)
+        payload['daily']['temperature_2m_max'][0] -= 10
+        self.assertNotEqual(WeatherService.recommendations_fingerprint(Forecast.from_api(payload)), fingerprint)
+        self.assertEqual(WeatherService.recommendations_fingerprint(None), '')
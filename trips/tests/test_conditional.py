@@ -0,0 +1,136 @@
+from datetime import date, timedelta
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.test import SimpleTestCase, TestCase
+from rest_framework.test import APIClient
+
+from trips.benchmarks.stub import forecast_payload
+from trips.models import Profile, Trip
+from trips.services.forecast import Forecast
+from trips.services.geocoding_service import AsyncGeocodingService, GeocodingService
+from trips.services.weather_service import WeatherService
+
+CITIES = [{'name': 'Paris', 'country': 'France', 'admin1': '', 'latitude': 48.85, 'longitude': 2.35,
+           'display_name': 'Paris, France'}]
+
+
+class CitySearchRevalidationTests(SimpleTestCase):
+    """A matching If-None-Match is answered without searching"""
+
+    def _search(self, url, service, method, cities=CITIES, **headers):
+        with mock.patch.object(service, 'search_cities', side_effect=method(cities)) as search:
+            response = self.client.get(url, {'q': 'Paris', 'limit': 5}, headers=headers)
+        return response, search.call_count
+
+    @staticmethod
+    def _sync(cities):
+        return lambda query, limit: cities
+
+    @staticmethod
+    def _async(cities):
+        async def search(query, limit):
+            return cities
+        return search
+
+    def test_revalidation_skips_the_search(self):
+        for url, service, method in (
+            ('/api/cities/search/', GeocodingService, self._sync),
+            ('/api/async/cities/search/', AsyncGeocodingService, self._async),
+        ):
+            with self.subTest(url=url):
+                response, searches = self._search(url, service, method)
+                self.assertEqual((response.status_code, searches), (200, 1))
+                self.assertIn('public', response['Cache-Control'])
+
+                response, searches = self._search(url, service, method, **{'If-None-Match': response['ETag']})
+                self.assertEqual((response.status_code, searches), (304, 0))
+
+    def test_limit_changes_the_etag(self):
+        first, _ = self._search('/api/cities/search/', GeocodingService, self._sync)
+        with mock.patch.object(GeocodingService, 'search_cities', return_value=CITIES):
+            second = self.client.get('/api/cities/search/', {'q': 'Paris', 'limit': 6})
+        self.assertNotEqual(first['ETag'], second['ETag'])
+
+    def test_empty_results_are_not_validated(self):
+        response, _ = self._search('/api/cities/search/', GeocodingService, self._sync, cities=[])
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('ETag', response)
+
+
+def _forecast(warmer=0):
+    payload = forecast_payload(48.85, 2.35, 7)
+    payload['daily']['temperature_2m_max'] = [value + warmer for value in payload['daily']['temperature_2m_max']]
+    return Forecast.from_api(payload)
+
+
+class TripRevalidationTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('traveler', password='secret')
+        Profile.objects.create(user=self.user, traveler_type='casual')
+        today = date.today()
+        self.trip = Trip.objects.create(
+            user=self.user, destination='Paris', latitude=48.85, longitude=2.35,
+            travel_start=today, travel_end=today + timedelta(days=3)
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        # The recommendations endpoint stores them, so it goes first
+        self.urls = {
+            'recommendations': f'/api/trips/{self.trip.pk}/clothing-recommendations/',
+            'list': '/api/trips/',
+            'detail': f'/api/trips/{self.trip.pk}/',
+            'weather': f'/api/trips/{self.trip.pk}/weather/',
+            'bundle': f'/api/trips/{self.trip.pk}/bundle/',
+        }
+
+    def _get(self, url, forecast=None, **headers):
+        with mock.patch.object(WeatherService, 'get_weather_forecast', return_value=forecast or _forecast()):
+            return self.client.get(url, headers=headers)
+
+    def _etags(self, forecast=None):
+        return {name: self._get(url, forecast)['ETag'] for name, url in self.urls.items()}
+
+    def test_matching_etag_is_not_modified(self):
+        for name, url in self.urls.items():
+            with self.subTest(endpoint=name):
+                response = self._get(url)
+                self.assertEqual(response.status_code, 200)
+                self.assertIn('private', response['Cache-Control'])
+                self.assertIn('Authorization', response['Vary'])
+
+                revalidated = self._get(url, **{'If-None-Match': response['ETag']})
+                self.assertEqual(revalidated.status_code, 304)
+                self.assertEqual(revalidated.content, b'')
+                self.assertEqual(revalidated['ETag'], response['ETag'])
+                self.assertIn('private', revalidated['Cache-Control'])
+
+                self.assertEqual(self._get(url, **{'If-None-Match': '"stale"'}).status_code, 200)
+
+    def test_trip_detail_last_modified(self):
+        response = self._get(self.urls['detail'])
+        revalidated = self._get(self.urls['detail'], **{'If-Modified-Since': response['Last-Modified']})
+        self.assertEqual(revalidated.status_code, 304)
+
+    def test_editing_the_trip_changes_every_etag(self):
+        before = self._etags()
+        response = self.client.patch(self.urls['detail'], {'activities': 'Museums'}, format='json')
+        self.assertEqual(response.status_code, 200)
+        after = self._etags()
+        for name in self.urls:
+            self.assertNotEqual(before[name], after[name], name)
+
+    def test_new_recommendations_change_the_etags(self):
+        before = self._etags()
+        self.assertEqual(before, self._etags())
+
+        after = self._etags(_forecast(warmer=30))
+        for name in self.urls:
+            self.assertNotEqual(before[name], after[name], name)
+
+    def test_forecast_etags_are_per_user(self):
+        etag = self._get(self.urls['weather'])['ETag']
+        other = User.objects.create_user('someone-else', password='secret')
+        self.client.force_authenticate(other)
+        response = self._get(self.urls['weather'], **{'If-None-Match': etag})
+        self.assertEqual(response.status_code, 404)
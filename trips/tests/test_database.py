@@ -0,0 +1,48 @@
+import os
+import sqlite3
+import tempfile
+from pathlib import Path
+
+from django.test import SimpleTestCase
+
+from travelmate import database
+
+
+class DatabaseProfileTests(SimpleTestCase):
+    def test_sqlite_defaults(self):
+        settings = database.build({}, Path('/srv/travelmate'))
+        self.assertEqual(settings['ENGINE'], 'django.db.backends.sqlite3')
+        self.assertEqual(settings['NAME'], Path('/srv/travelmate/db.sqlite3'))
+        self.assertEqual((settings['CONN_MAX_AGE'], settings['CONN_HEALTH_CHECKS']), (60, True))
+        self.assertEqual(settings['OPTIONS']['transaction_mode'], 'IMMEDIATE')
+        self.assertEqual(settings['OPTIONS']['timeout'], 5)
+        self.assertIn('PRAGMA journal_mode=WAL', settings['OPTIONS']['init_command'])
+        self.assertTrue(settings['OPTIONS']['init_command'].endswith('PRAGMA busy_timeout=5000'))
+
+    def test_sqlite_pragmas_apply_to_new_connections(self):
+        settings = database.build({'busy_timeout_ms': 2500, 'sqlite_pragmas': {'synchronous': 'FULL'}}, Path('.'))
+        with tempfile.TemporaryDirectory() as directory:
+            connection = sqlite3.connect(os.path.join(directory, 'test.sqlite3'))
+            try:
+                connection.executescript(settings['OPTIONS']['init_command'])
+                pragma = lambda name: connection.execute(f'PRAGMA {name}').fetchone()[0]
+                self.assertEqual(pragma('journal_mode'), 'wal')
+                self.assertEqual(pragma('synchronous'), 2)  # FULL
+                self.assertEqual(pragma('busy_timeout'), 2500)
+                self.assertEqual(pragma('temp_store'), 2)  # MEMORY
+            finally:
+                connection.close()
+
+    def test_postgresql(self):
+        settings = database.build({
+            'engine': 'postgresql', 'conn_max_age': None, 'busy_timeout_ms': 3000,
+            'statement_timeout_ms': 10000, 'postgresql': {'HOST': 'db', 'USER': 'app'},
+        }, Path('.'))
+        self.assertEqual(settings['ENGINE'], 'django.db.backends.postgresql')
+        self.assertEqual((settings['NAME'], settings['HOST'], settings['USER']), ('travelmate', 'db', 'app'))
+        self.assertIsNone(settings['CONN_MAX_AGE'])
+        self.assertEqual(settings['OPTIONS']['options'], '-c lock_timeout=3000 -c statement_timeout=10000')
+
+    def test_unknown_engine(self):
+        with self.assertRaisesMessage(ValueError, 'mysql'):
+            database.build({'engine': 'mysql'}, Path('.'))
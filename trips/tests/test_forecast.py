@@ -0,0 +1,195 @@
+import copy
+import math
+import pickle
+from datetime import date, timedelta
+
+from django.core.cache import caches
+from django.test import SimpleTestCase
+
+from trips.benchmarks.stub import forecast_payload
+from trips.models import Trip
+from trips.services.forecast import COLUMNS, Forecast
+from trips.services.weather_service import WeatherService
+from trips.views import trip_forecast_data
+
+START = date(2026, 3, 1)
+
+
+def _payload(days=7, start=START):
+    payload = forecast_payload(48.85, 2.35, days)
+    payload['daily']['time'] = [(start + timedelta(days=i)).isoformat() for i in range(days)]
+    return payload
+
+
+class ForecastTests(SimpleTestCase):
+    def test_to_api_matches_the_open_meteo_payload(self):
+        payload = _payload()
+        payload['daily']['temperature_2m_min'][2] = None
+        payload['daily']['precipitation_probability_max'][3] = None
+        forecast = Forecast.from_api(payload)
+
+        data = forecast.to_api()
+        self.assertEqual(data, {**payload, 'forecast_age': 0, 'is_stale': False})
+        self.assertIsInstance(data['daily']['precipitation_probability_max'][0], int)
+        # Each call hands out its own mutable copy
+        data['daily']['time'].clear()
+        data['current_weather']['temperature'] = -1
+        self.assertEqual(forecast.to_api(), {**payload, 'forecast_age': 0, 'is_stale': False})
+
+    def test_from_api_leaves_the_payload_alone(self):
+        payload = _payload()
+        original = copy.deepcopy(payload)
+        Forecast.from_api(payload)
+        self.assertEqual(payload, original)
+
+    def test_missing_columns_are_none(self):
+        payload = _payload(days=3)
+        del payload['daily']['precipitation_sum']
+        forecast = Forecast.from_api(payload)
+        self.assertEqual(forecast.values('precipitation_sum'), [None, None, None])
+        self.assertTrue(math.isnan(forecast.column('precipitation_sum')[0]))
+
+    def test_immutable(self):
+        forecast = Forecast.from_api(_payload())
+        with self.assertRaises(AttributeError):
+            forecast.is_stale = True
+        with self.assertRaises(AttributeError):
+            del forecast.meta
+        with self.assertRaises(TypeError):
+            forecast.meta['latitude'] = 0
+        with self.assertRaises(TypeError):
+            forecast.ordinals[0] = 0
+        with self.assertRaises(TypeError):
+            forecast.packed[0] = 0.0
+
+    def test_copies_are_the_same_object(self):
+        forecast = Forecast.from_api(_payload())
+        self.assertIs(copy.copy(forecast), forecast)
+        self.assertIs(copy.deepcopy(forecast), forecast)
+        self.assertIs(copy.deepcopy({'forecast': forecast})['forecast'], forecast)
+
+    def test_pickle_round_trip(self):
+        payload = _payload()
+        payload['daily']['temperature_2m_max'][0] = None
+        forecast = Forecast.from_api(payload).with_freshness(120, True)
+        for protocol in range(pickle.HIGHEST_PROTOCOL + 1):
+            with self.subTest(protocol=protocol):
+                restored = pickle.loads(pickle.dumps(forecast, protocol))
+                self.assertEqual(restored, forecast)
+                self.assertEqual(restored.to_api(), forecast.to_api())
+                self.assertEqual(restored.fingerprint, forecast.fingerprint)
+                with self.assertRaises(AttributeError):
+                    restored.is_stale = False
+
+    def test_shared_cache_round_trip(self):
+        forecast = Forecast.from_api(_payload())
+        cache = caches['default']
+        cache.set('test-forecast', forecast)
+        self.addCleanup(cache.delete, 'test-forecast')
+        self.assertEqual(cache.get('test-forecast'), forecast)
+
+    def test_freshness_is_not_part_of_the_fingerprint(self):
+        forecast = Forecast.from_api(_payload())
+        stale = forecast.with_freshness(600, True)
+        self.assertEqual((stale.forecast_age, stale.is_stale), (600, True))
+        self.assertEqual((forecast.forecast_age, forecast.is_stale), (0, False))
+        self.assertEqual(stale.fingerprint, forecast.fingerprint)
+        self.assertNotEqual(stale, forecast)
+
+        warmer = _payload()
+        warmer['daily']['temperature_2m_max'][6] += 1
+        self.assertNotEqual(Forecast.from_api(warmer).fingerprint, forecast.fingerprint)
+
+    def test_truncated(self):
+        forecast = Forecast.from_api(_payload(days=10))
+        short = forecast.truncated(4)
+        self.assertEqual(len(short), 4)
+        self.assertIs(forecast.truncated(10), forecast)
+        self.assertIs(forecast.truncated(16), forecast)
+        for name in COLUMNS:
+            self.assertEqual(short.values(name), forecast.values(name)[:4], name)
+        self.assertEqual(short.to_api(), Forecast.from_api(_payload(days=4)).to_api())
+
+    def test_with_extra_days(self):
+        forecast = Forecast.from_api(_payload(days=3))
+        last = forecast.ordinals[-1]
+        extra = {name: [1.0, 2.0] for name in COLUMNS}
+        extended = forecast.with_extra_days([last + 1, last + 2], extra)
+
+        self.assertEqual(len(forecast), 3)
+        self.assertEqual(len(extended), 5)
+        self.assertEqual(extended.dates[3:], [(START + timedelta(days=i)).isoformat() for i in (3, 4)])
+        for name in COLUMNS:
+            self.assertEqual(extended.values(name)[:3], forecast.values(name), name)
+            self.assertEqual(extended.values(name)[3:], [1, 2] if name == 'precipitation_probability_max' else [1.0, 2.0])
+        self.assertEqual(extended.meta, forecast.meta)
+
+    def test_empty_forecast(self):
+        forecast = Forecast.from_api({'latitude': 1.0, 'longitude': 2.0})
+        self.assertTrue(forecast)
+        self.assertEqual(len(forecast), 0)
+        self.assertIsNone(forecast.start_ordinal)
+        self.assertEqual(forecast.to_api()['daily'], {'time': [], **{name: [] for name in COLUMNS}})
+
+
+def _day(offset):
+    return START + timedelta(days=offset)
+
+
+def _naive_mask(forecast, first, last):
+    return [first.toordinal() <= ordinal <= last.toordinal() for ordinal in forecast.ordinals]
+
+
+class DayRangeTests(SimpleTestCase):
+    def setUp(self):
+        self.forecast = Forecast.from_api(_payload(days=7))  # START to START + 6
+
+    def test_edges(self):
+        cases = {
+            'before the first day': ((-5, -1), range(0, 0)),
+            'ending on the first day': ((-5, 0), range(0, 1)),
+            'overlapping the start': ((-2, 2), range(0, 3)),
+            'a single day': ((3, 3), range(3, 4)),
+            'inside': ((1, 4), range(1, 5)),
+            'the whole forecast': ((0, 6), range(0, 7)),
+            'wider than the forecast': ((-10, 30), range(0, 7)),
+            'starting on the last day': ((6, 9), range(6, 7)),
+            'after the last day': ((7, 12), range(7, 7)),
+            'ending before it starts': ((4, 2), range(4, 3)),
+        }
+        for label, ((first, last), expected) in cases.items():
+            with self.subTest(label):
+                selected = self.forecast.day_range(_day(first), _day(last))
+                self.assertEqual(list(selected), list(expected))
+                mask = self.forecast.day_mask(_day(first), _day(last))
+                self.assertEqual(mask, _naive_mask(self.forecast, _day(first), _day(last)))
+                self.assertEqual(len(mask), 7)
+
+    def test_empty_forecast(self):
+        forecast = Forecast.from_api({})
+        self.assertEqual(forecast.day_range(_day(0), _day(3)), range(0))
+        self.assertEqual(forecast.day_mask(_day(0), _day(3)), [])
+
+    def test_forecast_with_a_gap(self):
+        # Days 0-6, then 10-11: the index range is searched for instead
+        forecast = self.forecast.with_extra_days(
+            [_day(10).toordinal(), _day(11).toordinal()], {name: [1.0, 1.0] for name in COLUMNS}
+        )
+        for first, last in ((5, 10), (7, 9), (8, 11), (-1, 20), (11, 11)):
+            with self.subTest(first=first, last=last):
+                selected = forecast.day_range(_day(first), _day(last))
+                expected = _naive_mask(forecast, _day(first), _day(last))
+                self.assertEqual([index in selected for index in range(len(forecast))], expected)
+                self.assertEqual(forecast.day_mask(_day(first), _day(last)), expected)
+
+    def test_long_extended_forecast(self):
+        forecast = WeatherService.extend_forecast(Forecast.from_api(_payload(days=16)), 365)
+        first, last = _day(100), _day(250)
+        self.assertEqual(forecast.day_range(first, last), range(100, 251))
+        self.assertEqual(forecast.day_mask(first, last), _naive_mask(forecast, first, last))
+
+    def test_trip_forecast_data_flags_the_trip_days(self):
+        trip = Trip(travel_start=_day(2), travel_end=_day(4))
+        data = trip_forecast_data(self.forecast, trip)
+        self.assertEqual(data['trip_days'], [False, False, True, True, True, False, False])
+        self.assertEqual((data['trip_start_date'], data['trip_end_date']), (_day(2).isoformat(), _day(4).isoformat()))
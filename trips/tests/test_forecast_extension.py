@@ -0,0 +1,99 @@
+from datetime import date, timedelta
+
+from django.test import SimpleTestCase
+
+from trips.benchmarks.stub import forecast_payload
+from trips.services.forecast import Forecast
+from trips.services.forecast_extension import predict_days
+from trips.services.weather_service import WeatherService
+
+START = date(2026, 3, 1)
+VARIABLES = ('temperature_2m_max', 'temperature_2m_min', 'precipitation_sum', 'precipitation_probability_max')
+
+
+def _forecast(latitude=48.85, longitude=2.35, start=START, days=16):
+    payload = forecast_payload(latitude, longitude, days)
+    payload['daily']['time'] = [(start + timedelta(days=i)).isoformat() for i in range(days)]
+    return Forecast.from_api(payload)
+
+
+def _predict(forecast, total_days=60, **kwargs):
+    return predict_days(
+        forecast.ordinals, forecast.columns, total_days, forecast.latitude, forecast.longitude,
+        fahrenheit=forecast.is_fahrenheit, **kwargs
+    )
+
+
+class PredictDaysTests(SimpleTestCase):
+    def test_same_input_same_output(self):
+        for climatology in (True, False):
+            with self.subTest(climatology=climatology):
+                self.assertEqual(
+                    _predict(_forecast(), climatology=climatology),
+                    _predict(_forecast(), climatology=climatology),
+                )
+
+    def test_different_location_different_output(self):
+        _, paris = _predict(_forecast(48.85, 2.35))
+        _, tokyo = _predict(_forecast(35.69, 139.69))
+        for name in VARIABLES:
+            self.assertNotEqual(list(paris[name]), list(tokyo[name]), name)
+
+    def test_different_start_date_different_output(self):
+        march_ordinals, march = _predict(_forecast(start=START))
+        april_ordinals, april = _predict(_forecast(start=START + timedelta(days=1)))
+        self.assertEqual(april_ordinals, [ordinal + 1 for ordinal in march_ordinals])
+        for name in VARIABLES:
+            self.assertNotEqual(list(march[name]), list(april[name]), name)
+
+    def test_extra_days_follow_the_real_days(self):
+        forecast = _forecast()
+        ordinals, columns = _predict(forecast, total_days=40)
+        self.assertEqual(ordinals, list(range(forecast.ordinals[-1] + 1, forecast.ordinals[-1] + 25)))
+        for name in VARIABLES:
+            self.assertEqual(len(columns[name]), 24)
+
+    def test_days_dont_depend_on_the_number_predicted(self):
+        forecast = _forecast()
+        _, shorter = _predict(forecast, total_days=30)
+        _, longer = _predict(forecast, total_days=60)
+        for name in VARIABLES:
+            self.assertEqual(list(longer[name][:14]), list(shorter[name]), name)
+
+    def test_nothing_to_predict(self):
+        forecast = _forecast()
+        self.assertEqual(_predict(forecast, total_days=16)[0], [])
+        self.assertEqual(_predict(forecast, total_days=7)[0], [])
+
+
+class ExtendForecastTests(SimpleTestCase):
+    def test_deterministic(self):
+        self.assertEqual(
+            WeatherService.extend_forecast(_forecast(), 90).to_api(),
+            WeatherService.extend_forecast(_forecast(), 90).to_api(),
+        )
+
+    def test_real_days_are_never_overwritten(self):
+        forecast = _forecast()
+        original = forecast.to_api()
+        extended = WeatherService.extend_forecast(forecast, 45)
+
+        self.assertEqual(len(extended), 45)
+        self.assertEqual(forecast.to_api(), original)
+        daily = extended.to_api()['daily']
+        for name in ('time',) + VARIABLES:
+            self.assertEqual(daily[name][:16], original['daily'][name], name)
+
+    def test_extending_an_extended_forecast_keeps_its_days(self):
+        extended = WeatherService.extend_forecast(_forecast(), 30)
+        longer = WeatherService.extend_forecast(extended, 60)
+        daily, longer_daily = extended.to_api()['daily'], longer.to_api()['daily']
+        for name in ('time',) + VARIABLES:
+            self.assertEqual(longer_daily[name][:30], daily[name], name)
+
+    def test_shorter_extension_is_a_prefix_of_a_longer_one(self):
+        forecast = _forecast()
+        shorter = WeatherService.extend_forecast(forecast, 30).to_api()['daily']
+        longer = WeatherService.extend_forecast(forecast, 60).to_api()['daily']
+        for name in ('time',) + VARIABLES:
+            self.assertEqual(longer[name][:30], shorter[name], name)
@@ -0,0 +1,101 @@
+import asyncio
+import threading
+from datetime import timedelta
+from unittest import mock
+
+import requests
+from django.test import SimpleTestCase, TestCase
+from django.utils import timezone
+
+from trips import jsonlib
+from trips.models import GeocodeCacheEntry
+from trips.services import gazetteer
+from trips.services.geocoding_service import AsyncGeocodingService, GeocodingService
+
+CITY = {'name': 'Paris', 'country': 'France', 'admin1': '', 'latitude': 48.85, 'longitude': 2.35,
+        'display_name': 'Paris, France'}
+
+
+class AsyncCitySearchTests(SimpleTestCase):
+    def setUp(self):
+        gazetteer.reset_gazetteer()
+        self.addCleanup(gazetteer.reset_gazetteer)
+
+    def test_first_search_loads_the_gazetteer_off_the_event_loop(self):
+        threads = []
+
+        def load(path):
+            threads.append(threading.current_thread())
+            return mock.Mock(search=mock.Mock(return_value=[CITY]))
+
+        async def search():
+            return await AsyncGeocodingService.search_cities('Par'), threading.current_thread()
+
+        with mock.patch.object(gazetteer.Gazetteer, 'load', side_effect=load), \
+                mock.patch('os.path.exists', return_value=True):
+            cities, loop_thread = asyncio.run(search())
+            self.assertEqual(cities, [CITY])
+            self.assertEqual(len(threads), 1)
+            self.assertIsNot(threads[0], loop_thread)
+
+            # Once loaded, searches run on the event loop without reloading
+            self.assertEqual(asyncio.run(search())[0], [CITY])
+            self.assertEqual(len(threads), 1)
+
+
+def _response(*coordinates):
+    results = [{'latitude': latitude, 'longitude': longitude} for latitude, longitude in coordinates]
+    return mock.Mock(content=jsonlib.dumps({'results': results} if results else {}))
+
+
+class GeocodeCacheTests(TestCase):
+    def _geocode(self, name, *responses):
+        with mock.patch('trips.services.geocoding_service.http_client.get', side_effect=responses) as get:
+            coordinates = GeocodingService.get_coordinates(name)
+        return coordinates, get.call_count
+
+    def test_cached_names_make_no_request(self):
+        self.assertEqual(self._geocode('São Paulo', _response((-23.55, -46.63))), ((-23.55, -46.63), 1))
+        self.assertEqual(self._geocode('  SAO   paulo '), ((-23.55, -46.63), 0))
+        self.assertEqual(GeocodeCacheEntry.objects.get(name='sao paulo').hit_count, 1)
+
+    def test_not_found_is_cached_until_the_negative_ttl(self):
+        self.assertEqual(self._geocode('Atlantis', _response()), ((None, None), 1))
+        self.assertEqual(self._geocode('atlantis'), ((None, None), 0))
+
+        expired = timezone.now() - GeocodingService.NEGATIVE_CACHE_TTL - timedelta(seconds=1)
+        GeocodeCacheEntry.objects.filter(name='atlantis').update(updated_at=expired)
+        self.assertEqual(self._geocode('Atlantis', _response((1.0, 2.0))), ((1.0, 2.0), 1))
+        # Found coordinates don't expire
+        GeocodeCacheEntry.objects.filter(name='atlantis').update(updated_at=expired)
+        self.assertEqual(self._geocode('Atlantis'), ((1.0, 2.0), 0))
+
+    def test_transport_errors_are_not_cached(self):
+        self.assertEqual(self._geocode('Paris', requests.exceptions.ConnectionError()), ((None, None), 1))
+        self.assertFalse(GeocodeCacheEntry.objects.exists())
+        self.assertEqual(self._geocode('Paris', _response((48.85, 2.35))), ((48.85, 2.35), 1))
+
+    def test_many_names_look_up_each_normalized_name_once(self):
+        GeocodeCacheEntry.objects.create(name='lyon', latitude=45.76, longitude=4.84)
+        responses = {'paris': _response((48.85, 2.35)), 'atlantis': _response()}
+        looked_up = []
+
+        def get(url, params):
+            looked_up.append(params['name'])
+            if params['name'] == 'Rome':
+                raise requests.exceptions.Timeout()
+            return responses[gazetteer.fold(params['name'])]
+
+        with mock.patch('trips.services.geocoding_service.http_client.get', side_effect=get):
+            coordinates = GeocodingService.get_coordinates_many(
+                ['Paris', 'PARIS', ' paris ', 'Lyon', 'Atlantis', 'atlantis', 'Rome', '']
+            )
+
+        self.assertEqual(sorted(gazetteer.fold(name) for name in looked_up), ['atlantis', 'paris', 'rome'])
+        self.assertEqual(coordinates, {
+            'paris': (48.85, 2.35), 'lyon': (45.76, 4.84), 'atlantis': (None, None), 'rome': (None, None),
+        })
+        # The failed lookup is retried next time; the others are cached
+        self.assertEqual(
+            set(GeocodeCacheEntry.objects.values_list('name', flat=True)), {'paris', 'lyon', 'atlantis'}
+        )
@@ -0,0 +1,73 @@
+from datetime import date, timedelta
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase
+
+from trips.benchmarks.stub import forecast_payload
+from trips.models import Profile, Trip
+from trips.services.forecast import Forecast
+from trips.services.weather_service import WeatherService
+from trips.views import DASHBOARD_QUERY_BUDGET, TRIP_WEATHER_QUERY_BUDGET
+
+# Session and user lookups made by the middleware before a view runs
+MIDDLEWARE_QUERIES = 2
+
+
+def _forecasts(points, days=7, temperature_unit='fahrenheit'):
+    return [Forecast.from_api(forecast_payload(point[0], point[1], point[2])) for point in points]
+
+
+class HtmlViewQueryTests(TestCase):
+    """The HTML pages run a fixed number of queries, however many trips there are"""
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.user = User.objects.create_user('traveler', password='secret')
+        Profile.objects.create(user=self.user, traveler_type='business')
+        self.client.force_login(self.user)
+
+    def _create_trips(self, count):
+        today = date.today()
+        Trip.objects.bulk_create(
+            Trip(
+                user=self.user, destination=f'Place {i}', latitude=10 + i, longitude=20 + i,
+                travel_start=today + timedelta(days=i), travel_end=today + timedelta(days=i + 3)
+            )
+            for i in range(count)
+        )
+
+    def _dashboard(self, page=1):
+        with mock.patch.object(WeatherService, 'get_weather_forecasts', side_effect=_forecasts):
+            response = self.client.get('/trips/', {'page': page})
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def test_dashboard(self):
+        for count in (1, 5, 45):
+            with self.subTest(trips=count):
+                Trip.objects.all().delete()
+                self._create_trips(count)
+                with self.assertNumQueries(MIDDLEWARE_QUERIES + DASHBOARD_QUERY_BUDGET):
+                    self._dashboard()
+        with self.assertNumQueries(MIDDLEWARE_QUERIES + DASHBOARD_QUERY_BUDGET):
+            self._dashboard(page=3)
+
+    def test_dashboard_with_cached_fragments(self):
+        self._create_trips(10)
+        self._dashboard()
+        with self.assertNumQueries(MIDDLEWARE_QUERIES + DASHBOARD_QUERY_BUDGET):
+            response = self._dashboard()
+        self.assertContains(response, 'Place 9')
+
+    def test_trip_weather_page(self):
+        self._create_trips(1)
+        trip = Trip.objects.get()
+        forecast = Forecast.from_api(forecast_payload(trip.latitude, trip.longitude, 7))
+        for _ in range(2):  # Rendering the fragment, then reading it from the cache
+            with mock.patch.object(WeatherService, 'get_weather_forecast', return_value=forecast), \
+                    self.assertNumQueries(MIDDLEWARE_QUERIES + TRIP_WEATHER_QUERY_BUDGET):
+                response = self.client.get(f'/trips/{trip.pk}/weather/')
+            self.assertEqual(response.status_code, 200)
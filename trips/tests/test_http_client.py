@@ -0,0 +1,58 @@
+import asyncio
+from unittest import mock
+
+import httpx
+import requests
+from django.test import SimpleTestCase
+
+from trips.services.http_client import CircuitBreaker, CircuitOpenError, OutboundClient
+
+
+class CircuitBreakerTrialTests(SimpleTestCase):
+    """Whatever a half-open trial call raises, the breaker lets a later call through"""
+
+    def setUp(self):
+        self.breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+        self.breaker.record_failure()
+        self.client = OutboundClient('example.test', retries=0, breaker=self.breaker)
+
+    def _assert_trial_released(self):
+        self.assertTrue(self.breaker.allow())
+
+    def test_sync_unexpected_request_errors(self):
+        for error in (requests.exceptions.ChunkedEncodingError, requests.exceptions.ContentDecodingError,
+                      requests.exceptions.TooManyRedirects):
+            with self.subTest(error=error.__name__):
+                with mock.patch.object(self.client.session, 'get', side_effect=error()):
+                    with self.assertRaises(error):
+                        self.client.get('https://example.test/')
+                self.assertEqual(self.breaker.state, CircuitBreaker.OPEN)
+                self._assert_trial_released()
+                self.breaker.record_failure()
+
+    def test_sync_other_exception(self):
+        with mock.patch.object(self.client.session, 'get', side_effect=KeyboardInterrupt):
+            with self.assertRaises(KeyboardInterrupt):
+                self.client.get('https://example.test/')
+        self._assert_trial_released()
+
+    def test_async_decoding_error_and_cancellation(self):
+        async def decoding_error(*args, **kwargs):
+            raise httpx.DecodingError('bad gzip')
+
+        async def cancelled(*args, **kwargs):
+            raise asyncio.CancelledError
+
+        for side_effect, error in ((decoding_error, httpx.DecodingError), (cancelled, asyncio.CancelledError)):
+            with self.subTest(error=error.__name__):
+                async_client = mock.Mock(get=side_effect)
+                with mock.patch('trips.services.http_client.get_async_client', return_value=async_client):
+                    with self.assertRaises(error):
+                        asyncio.run(self.client.aget('https://example.test/'))
+                self._assert_trial_released()
+                self.breaker.record_failure()
+
+    def test_rejects_while_trial_in_flight(self):
+        self.assertTrue(self.breaker.allow())
+        with self.assertRaises(CircuitOpenError):
+            self.client.get('https://example.test/')
@@ -0,0 +1,109 @@
+from datetime import date, timedelta
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.utils import timezone
+
+from trips.benchmarks.stub import OpenMeteoStub
+from trips.benchmarks.utils import reset_caches, use_stub
+from trips.models import Trip
+from trips.services import prefetch
+from trips.services.weather_service import FORECAST_CACHE, WeatherService
+
+TODAY = date(2026, 6, 1)
+
+
+class PrefetchTestCase(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('traveler', password='secret')
+        reset_caches()
+        self.addCleanup(reset_caches)
+
+    def _trip(self, latitude, longitude, starts_in, length=3, today=TODAY):
+        start = today + timedelta(days=starts_in)
+        return Trip.objects.create(
+            user=self.user, destination='Somewhere', latitude=latitude, longitude=longitude,
+            travel_start=start, travel_end=start + timedelta(days=length - 1)
+        )
+
+
+class UpcomingPointsTests(PrefetchTestCase):
+    def test_trips_are_deduplicated_by_cache_key(self):
+        self._trip(48.851, 2.349, 1)
+        self._trip(48.849, 2.351, 2)  # Same rounded coordinate and day count
+        self._trip(48.85, 2.35, 3, length=10)
+        self.assertEqual(prefetch.upcoming_points(TODAY), [(48.85, 2.35, 7), (48.85, 2.35, 10)])
+
+    def test_soonest_trips_come_first(self):
+        self._trip(35.69, 139.69, 5)
+        self._trip(48.85, 2.35, 1)
+        self.assertEqual(prefetch.upcoming_points(TODAY), [(48.85, 2.35, 7), (35.69, 139.69, 7)])
+
+    def test_only_trips_in_the_horizon(self):
+        self._trip(1.0, 1.0, -5, length=3)  # Already over
+        self._trip(2.0, 2.0, -2, length=5)  # Under way
+        self._trip(3.0, 3.0, prefetch.HORIZON_DAYS)  # Starts on the last forecast day
+        self._trip(4.0, 4.0, prefetch.HORIZON_DAYS + 1)  # Too far ahead
+        self._trip(None, None, 1)  # Not geocoded
+        self.assertEqual({point[:2] for point in prefetch.upcoming_points(TODAY)}, {(2.0, 2.0), (3.0, 3.0)})
+
+    def test_long_trips_are_capped_at_the_horizon(self):
+        self._trip(48.85, 2.35, 1, length=30)
+        self.assertEqual(prefetch.upcoming_points(TODAY), [(48.85, 2.35, 16), (48.85, 2.35, 7)])
+
+
+class DuePointsTests(PrefetchTestCase):
+    def _cache(self, point, ttl):
+        key = WeatherService.forecast_cache_key(*point, prefetch.PREFETCH_UNIT)
+        FORECAST_CACHE.set(key, object(), ttl)
+
+    def test_missing_and_expiring_points_are_due(self):
+        fresh, expiring, missing = (1.0, 1.0, 7), (2.0, 2.0, 7), (3.0, 3.0, 7)
+        self._cache(fresh, 3600)
+        self._cache(expiring, 30)
+        points = [fresh, expiring, missing]
+        self.assertEqual(prefetch.due_points(points), [missing])
+        self.assertEqual(prefetch.due_points(points, lead=60), [expiring, missing])
+
+
+class BatchesTests(TestCase):
+    def test_day_counts_of_a_coordinate_stay_together(self):
+        points = [(1.0, 1.0, 7), (2.0, 2.0, 7), (1.0, 1.0, 12), (3.0, 3.0, 7), (2.0, 2.0, 16), (1.0, 1.0, 16)]
+        self.assertEqual(list(prefetch.batches(points, size=2)), [
+            [(1.0, 1.0, 7), (1.0, 1.0, 12), (1.0, 1.0, 16), (2.0, 2.0, 7), (2.0, 2.0, 16)],
+            [(3.0, 3.0, 7)],
+        ])
+
+    def test_default_size_is_the_weather_batch_size(self):
+        points = [(float(i), 0.0, 7) for i in range(WeatherService.BATCH_SIZE + 1)]
+        self.assertEqual([len(batch) for batch in prefetch.batches(points)], [WeatherService.BATCH_SIZE, 1])
+
+
+class PrefetchOnceTests(PrefetchTestCase):
+    def setUp(self):
+        super().setUp()
+        self.stub = OpenMeteoStub().start()
+        self.addCleanup(self.stub.stop)
+        context = use_stub(self.stub)
+        context.__enter__()
+        self.addCleanup(context.__exit__, None, None, None)
+
+    def test_only_missing_or_expiring_forecasts_are_fetched(self):
+        today = timezone.localdate()
+        self._trip(48.85, 2.35, 1, today=today)
+        self._trip(35.69, 139.69, 2, length=10, today=today)
+        WeatherService.get_weather_forecast(48.85, 2.35, 7, prefetch.PREFETCH_UNIT)
+        self.stub.reset()
+
+        # Tokyo's 7- and 10-day forecasts come from one request
+        stats = prefetch.prefetch_once(rate=0)
+        self.assertEqual(stats, {'points': 3, 'due': 2, 'refreshed': 1, 'failed': 0, 'requests': 1})
+        self.assertEqual(self.stub.request_count(), 1)
+        WeatherService.get_weather_forecast(35.69, 139.69, 10, prefetch.PREFETCH_UNIT)
+        self.assertEqual(self.stub.request_count(), 1)
+
+        # Nothing is due again until the forecasts near expiry
+        self.assertEqual(prefetch.prefetch_once(rate=0)['requests'], 0)
+        stats = prefetch.prefetch_once(rate=0, lead=24 * 3600)
+        self.assertEqual((stats['due'], stats['refreshed'], stats['requests']), (3, 2, 1))
+        self.assertEqual(self.stub.request_count(), 2)
@@ -0,0 +1,80 @@
+from collections import Counter
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from trips import profiling
+from trips.models import RequestProfile
+
+
+def _total(collapsed):
+    return sum(int(line.rsplit(' ', 1)[1]) for line in collapsed.splitlines())
+
+
+class CollapsedStacksTests(TestCase):
+    def test_small_stacks_are_pruned_and_the_total_kept(self):
+        counts = Counter({'a;b': 9000, 'a;c': 995, **{f'a;d{i}': 1 for i in range(5)}})
+        collapsed = profiling.format_collapsed(counts, min_fraction=0.001)
+        self.assertEqual(collapsed.splitlines(), ['a;b 9000', 'a;c 995', f'{profiling.PRUNED} 5'])
+
+    def test_output_is_capped(self):
+        counts = Counter({f'frame{i};' * 50: 1000 - i for i in range(500)})
+        collapsed = profiling.format_collapsed(counts, min_fraction=0, max_bytes=10_000)
+        self.assertLessEqual(len(collapsed), 10_000 + 100)
+        self.assertEqual(_total(collapsed), sum(counts.values()))
+
+    def test_deterministic_profile(self):
+        profiler = profiling.DeterministicProfiler()
+        profiler.start()
+        sum(sorted(str(i) for i in range(50_000)) and [1])
+        profiler.stop()
+        collapsed = profiler.collapsed()
+        self.assertLess(collapsed.count('\n'), 50)
+        self.assertIsNotNone(profiler.pstats())
+
+
+class ProfilingMiddlewareTests(TestCase):
+    def setUp(self):
+        self.staff = User.objects.create_user('staff', password='secret', is_staff=True, is_superuser=True)
+        self.user = User.objects.create_user('traveler', password='secret')
+        self.client = APIClient()
+
+    def _profiled(self, user, header):
+        if user is not None:
+            self.client.force_authenticate(user)
+        response = self.client.get('/api/trips/', HTTP_X_PROFILE=header)
+        self.assertEqual(response.status_code, 200)
+        return response.headers.get('X-Profile-Id')
+
+    def test_who_may_profile(self):
+        self.assertIsNone(self._profiled(self.user, 'deterministic'))
+        self.assertIsNone(self._profiled(self.user, 'not-a-token'))
+        self.assertIsNotNone(self._profiled(self.user, profiling.make_token(profiling.DETERMINISTIC)))
+        # API requests carry no session, so staff is recognised from the JWT
+        self.client.force_authenticate(None)
+        token = RefreshToken.for_user(self.staff).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+        self.assertIsNotNone(self._profiled(None, 'sampling'))
+        self.assertEqual(RequestProfile.objects.count(), 2)
+
+    def test_admin_list_doesnt_load_profiles(self):
+        self._profiled(self.user, profiling.make_token(profiling.DETERMINISTIC))
+        self._profiled(self.user, profiling.make_token(profiling.SAMPLING))
+        self.client.force_authenticate(None)
+        self.client.force_login(self.staff)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/admin/trips/requestprofile/')
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, '/download/pstats/', count=1)
+        self.assertContains(response, '/download/collapsed/', count=2)
+        listing = [query['sql'] for query in queries.captured_queries if 'trips_requestprofile' in query['sql']]
+        self.assertTrue(listing)
+        self.assertFalse(any('"pstats"' in sql or '"collapsed"' in sql for sql in listing))
+
+        profile = RequestProfile.objects.get(mode=profiling.DETERMINISTIC)
+        response = self.client.get(f'/admin/trips/requestprofile/{profile.pk}/download/pstats/')
+        self.assertEqual(response.content, bytes(profile.pstats))
@@ -0,0 +1,92 @@
+from datetime import date, timedelta
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from trips.benchmarks.stub import forecast_payload
+from trips.models import Profile, Trip
+from trips.services.forecast import Forecast
+from trips.services.weather_service import WeatherService
+
+
+def _forecast(days=7, warmer=0):
+    payload = forecast_payload(48.85, 2.35, days)
+    payload['daily']['temperature_2m_max'] = [value + warmer for value in payload['daily']['temperature_2m_max']]
+    return Forecast.from_api(payload)
+
+
+class StoredRecommendationsTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('traveler', password='secret')
+        Profile.objects.create(user=self.user, traveler_type='casual')
+        today = date.today()
+        self.trip = Trip.objects.create(
+            user=self.user, destination='Paris', latitude=48.85, longitude=2.35,
+            travel_start=today, travel_end=today + timedelta(days=3)
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def _get(self, url, forecast):
+        with mock.patch.object(WeatherService, 'get_weather_forecast', return_value=forecast):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def test_recommendation_changes_leave_updated_at_alone(self):
+        url = f'/api/trips/{self.trip.pk}/clothing-recommendations/'
+        updated_at = self.trip.updated_at
+
+        self._get(url, _forecast())
+        self.trip.refresh_from_db()
+        first = self.trip.recommendations_updated_at
+        self.assertIsNotNone(first)
+        self.assertEqual(self.trip.updated_at, updated_at)
+
+        self._get(url, _forecast(warmer=30))
+        self.trip.refresh_from_db()
+        self.assertGreater(self.trip.recommendations_updated_at, first)
+        self.assertEqual(self.trip.updated_at, updated_at)
+
+    def test_unchanged_forecast_is_not_written(self):
+        url = f'/api/trips/{self.trip.pk}/clothing-recommendations/'
+        self._get(url, _forecast())
+        with self.assertNumQueries(1):  # Just the trip
+            self._get(url, _forecast())
+
+    def test_trip_validators_follow_the_recommendations(self):
+        detail, listing = f'/api/trips/{self.trip.pk}/', '/api/trips/'
+        before = [self.client.get(url)['ETag'] for url in (detail, listing)]
+
+        self._get(f'/api/trips/{self.trip.pk}/clothing-recommendations/', _forecast())
+        after = [self.client.get(url)['ETag'] for url in (detail, listing)]
+        self.assertNotEqual(before[0], after[0])
+        self.assertNotEqual(before[1], after[1])
+
+        # Reads alone don't change them
+        self.assertEqual(after, [self.client.get(url)['ETag'] for url in (detail, listing)])
+
+    def test_bundle_and_clothing_endpoint_dont_alternate_writes(self):
+        self.trip.travel_end = self.trip.travel_start + timedelta(days=11)
+        self.trip.save()
+        bundle, clothing = f'/api/trips/{self.trip.pk}/bundle/', f'/api/trips/{self.trip.pk}/clothing-recommendations/'
+        self._get(clothing, _forecast())
+        self.trip.refresh_from_db()
+        stored = (self.trip.updated_at, self.trip.recommendations_updated_at)
+
+        for _ in range(2):
+            response = self._get(bundle, _forecast(days=12))
+            self.assertEqual(len(response.data['recommendations']['recommendations']), 12)
+            self._get(clothing, _forecast())
+        self.trip.refresh_from_db()
+        self.assertEqual((self.trip.updated_at, self.trip.recommendations_updated_at), stored)
+        self.assertEqual(len(self.trip.recommendations), 7)
+
+    def test_bundle_etag_follows_the_recommendations(self):
+        bundle = f'/api/trips/{self.trip.pk}/bundle/'
+        etag = self._get(bundle, _forecast()).headers['ETag']
+        self.assertEqual(self._get(bundle, _forecast()).headers['ETag'], etag)
+        Profile.objects.filter(user=self.user).update(traveler_type='business')
+        self.assertNotEqual(self._get(bundle, _forecast()).headers['ETag'], etag)
@@ -0,0 +1,208 @@
+import asyncio
+import threading
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import SimpleTestCase
+
+from trips import jsonlib
+from trips.benchmarks.stub import forecast_payload
+from trips.services import singleflight
+from trips.services.singleflight import SingleFlight
+from trips.services.weather_service import FORECAST_CACHE, AsyncWeatherService, WeatherService
+
+CALLERS = 8
+
+
+class _FakeResponse:
+    def __init__(self, payload):
+        self.content = jsonlib.dumps(payload)
+
+
+def _waiting_calls(waiting):
+    """A _Call whose event signals `waiting` whenever a follower starts waiting on it"""
+    class Event(threading.Event):
+        def wait(self, timeout=None):
+            waiting.release()
+            return super().wait(timeout)
+
+    class Call(singleflight._Call):
+        def __init__(self):
+            super().__init__()
+            self.event = Event()
+
+    return mock.patch.object(singleflight, '_Call', Call)
+
+
+def _run_threads(target, count=CALLERS):
+    results = [None] * count
+    errors = [None] * count
+
+    def call(i):
+        try:
+            results[i] = target()
+        except Exception as e:
+            errors[i] = e
+
+    threads = [threading.Thread(target=call, args=(i,)) for i in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=10)
+    return results, errors
+
+
+class SingleFlightThreadTests(SimpleTestCase):
+    def setUp(self):
+        self.flight = SingleFlight()
+        self.waiting = threading.Semaphore(0)
+        patcher = _waiting_calls(self.waiting)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _leader(self, result=None, error=None):
+        """Work that finishes only once every other caller is waiting on it"""
+        calls = []
+
+        def work():
+            calls.append(threading.get_ident())
+            for _ in range(CALLERS - 1):
+                self.assertTrue(self.waiting.acquire(timeout=5))
+            if error is not None:
+                raise error
+            return result
+
+        return work, calls
+
+    def test_concurrent_callers_share_one_call(self):
+        work, calls = self._leader(result={'value': 1})
+        results, errors = _run_threads(lambda: self.flight.do('key', work))
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(errors, [None] * CALLERS)
+        self.assertTrue(all(result is results[0] for result in results))
+        self.assertEqual(self.flight.in_flight(), 0)
+
+    def test_error_reaches_every_caller(self):
+        work, calls = self._leader(error=ValueError('upstream down'))
+        _, errors = _run_threads(lambda: self.flight.do('key', work))
+
+        self.assertEqual(len(calls), 1)
+        self.assertTrue(all(isinstance(error, ValueError) for error in errors))
+        self.assertEqual(self.flight.in_flight(), 0)
+
+    def test_later_calls_run_again(self):
+        work = mock.Mock(return_value=1)
+        self.flight.do('key', work)
+        self.flight.do('key', work)
+        self.assertEqual(work.call_count, 2)
+
+    def test_different_keys_run_separately(self):
+        work = mock.Mock(side_effect=lambda key: key)
+        self.assertEqual(self.flight.do('a', work, 'a'), 'a')
+        self.assertEqual(self.flight.do('b', work, 'b'), 'b')
+        self.assertEqual(work.call_count, 2)
+
+
+class SingleFlightAsyncTests(SimpleTestCase):
+    def test_concurrent_tasks_share_one_call(self):
+        flight = SingleFlight()
+        calls = []
+
+        async def work():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return {'value': 1}
+
+        async def main():
+            return await asyncio.gather(*(flight.do_async('key', work) for _ in range(CALLERS)))
+
+        results = asyncio.run(main())
+        self.assertEqual(len(calls), 1)
+        self.assertTrue(all(result is results[0] for result in results))
+        self.assertEqual(flight.in_flight(), 0)
+
+    def test_error_reaches_every_task(self):
+        flight = SingleFlight()
+        calls = []
+
+        async def work():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            raise ValueError('upstream down')
+
+        async def main():
+            return await asyncio.gather(
+                *(flight.do_async('key', work) for _ in range(CALLERS)), return_exceptions=True
+            )
+
+        errors = asyncio.run(main())
+        self.assertEqual(len(calls), 1)
+        self.assertTrue(all(isinstance(error, ValueError) for error in errors))
+
+    def test_cancelled_caller_does_not_cancel_the_others(self):
+        flight = SingleFlight()
+        calls = []
+
+        async def work():
+            calls.append(1)
+            await asyncio.sleep(0.05)
+            return 'done'
+
+        async def main():
+            first = asyncio.ensure_future(flight.do_async('key', work))
+            second = asyncio.ensure_future(flight.do_async('key', work))
+            await asyncio.sleep(0.01)
+            first.cancel()
+            return await second
+
+        self.assertEqual(asyncio.run(main()), 'done')
+        self.assertEqual(len(calls), 1)
+
+
+class ForecastCoalescingTests(SimpleTestCase):
+    """N concurrent forecast misses for one destination make one upstream call"""
+
+    def setUp(self):
+        self._clear_caches()
+        self.addCleanup(self._clear_caches)
+        self.response = _FakeResponse(forecast_payload(48.85, 2.35, 7))
+
+    @staticmethod
+    def _clear_caches():
+        FORECAST_CACHE.clear()
+        cache.clear()
+
+    def test_threads(self):
+        waiting = threading.Semaphore(0)
+        patcher = _waiting_calls(waiting)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        def upstream(url, params=None):
+            for _ in range(CALLERS - 1):
+                self.assertTrue(waiting.acquire(timeout=5))
+            return self.response
+
+        with mock.patch('trips.services.http_client.get', side_effect=upstream) as get:
+            results, errors = _run_threads(lambda: WeatherService.get_weather_forecast(48.85, 2.35, 7))
+
+        self.assertEqual(get.call_count, 1)
+        self.assertEqual(errors, [None] * CALLERS)
+        self.assertTrue(all(result is not None and len(result) == 7 for result in results))
+
+    def test_asyncio(self):
+        async def upstream(url, params=None):
+            await asyncio.sleep(0.01)
+            return self.response
+
+        async def main():
+            return await asyncio.gather(*(
+                AsyncWeatherService.get_weather_forecast(48.85, 2.35, 7) for _ in range(CALLERS)
+            ))
+
+        with mock.patch('trips.services.http_client.aget', side_effect=upstream) as aget:
+            results = asyncio.run(main())
+
+        self.assertEqual(aget.call_count, 1)
+        self.assertTrue(all(result is not None and len(result) == 7 for result in results))
@@ -0,0 +1,102 @@
+from datetime import date, timedelta
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from trips.models import Trip
+
+START = date(2026, 6, 1)
+
+
+def _trip(user, destination='Paris', days_from_start=0, length=3):
+    start = START + timedelta(days=days_from_start)
+    return Trip.objects.create(
+        user=user, destination=destination, latitude=48.85, longitude=2.35,
+        travel_start=start, travel_end=start + timedelta(days=length)
+    )
+
+
+class TripOwnershipTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('traveler', password='secret')
+        self.other = User.objects.create_user('someone-else', password='secret')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_other_users_trips_are_not_found(self):
+        trip = _trip(self.other, 'Rome')
+        url = f'/api/trips/{trip.pk}/'
+        before = Trip.objects.filter(pk=trip.pk).values().get()
+        replacement = {
+            'destination': 'Oslo', 'latitude': 59.91, 'longitude': 10.75,
+            'travel_start': '2026-07-01', 'travel_end': '2026-07-05',
+        }
+
+        for method, data in (('get', None), ('put', replacement), ('patch', {'destination': 'Oslo'}), ('delete', None)):
+            with self.subTest(method=method):
+                response = getattr(self.client, method)(url, data, format='json')
+                self.assertEqual(response.status_code, 404)
+                self.assertEqual(Trip.objects.filter(pk=trip.pk).values().get(), before)
+
+    def test_own_trip_can_be_changed(self):
+        trip = _trip(self.user)
+        response = self.client.patch(f'/api/trips/{trip.pk}/', {'activities': 'Museums'}, format='json')
+        self.assertEqual(response.status_code, 200)
+        trip.refresh_from_db()
+        self.assertEqual(trip.activities, 'Museums')
+
+    def test_list_only_has_own_trips(self):
+        mine = {_trip(self.user, 'Paris').pk, _trip(self.user, 'Lyon', 5).pk}
+        _trip(self.other, 'Rome')
+        response = self.client.get('/api/trips/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual({trip['id'] for trip in response.data['results']}, mine)
+
+
+class TripListPaginationTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('traveler', password='secret')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_cursor_pages_cover_every_trip_once_in_order(self):
+        # Several trips share a start date, so the id tie-break matters
+        for i in range(11):
+            _trip(self.user, f'City {i}', days_from_start=(i * 7) % 4)
+        expected = list(
+            Trip.objects.filter(user=self.user).order_by('travel_start', 'id').values_list('id', flat=True)
+        )
+
+        seen, url, pages = [], '/api/trips/?page_size=3', 0
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertLessEqual(len(response.data['results']), 3)
+            seen.extend(trip['id'] for trip in response.data['results'])
+            url, pages = response.data['next'], pages + 1
+        self.assertEqual(seen, expected)
+        self.assertEqual(pages, 4)
+
+    def test_sparse_fields(self):
+        trip = _trip(self.user)
+        response = self.client.get('/api/trips/', {'fields': 'id,destination'})
+        self.assertEqual(response.data['results'], [{'id': trip.pk, 'destination': 'Paris'}])
+
+        response = self.client.get(f'/api/trips/{trip.pk}/', {'fields': 'destination, travel_start'})
+        self.assertEqual(response.data, {'destination': 'Paris', 'travel_start': START.isoformat()})
+
+    def test_unknown_fields_are_ignored(self):
+        trip = _trip(self.user)
+        response = self.client.get('/api/trips/', {'fields': 'id,no_such_field'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['results'], [{'id': trip.pk}])
+
+        response = self.client.get('/api/trips/', {'fields': ''})
+        self.assertIn('recommendations', response.data['results'][0])
+
+    def test_sparse_fields_dont_apply_to_writes(self):
+        trip = _trip(self.user)
+        response = self.client.patch(f'/api/trips/{trip.pk}/?fields=id', {'activities': 'Hiking'}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['activities'], 'Hiking')
@@ -0,0 +1,76 @@
+import math
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from trips.benchmarks.stub import OpenMeteoStub
+from trips.benchmarks.utils import reset_caches, use_stub
+from trips.services.weather_service import WeatherService
+
+# Distinct after rounding to WeatherService.COORDINATE_PRECISION
+LOCATIONS = [(10 + i, 20 + i) for i in range(7)]
+
+
+class BatchedForecastTests(SimpleTestCase):
+    def setUp(self):
+        self.stub = OpenMeteoStub().start()
+        self.addCleanup(self.stub.stop)
+        context = use_stub(self.stub)
+        context.__enter__()
+        self.addCleanup(context.__exit__, None, None, None)
+
+    def _requests(self):
+        return self.stub.request_count('/v1/forecast')
+
+    def test_one_request_per_batch(self):
+        for batch_size in (3, 7, 100):
+            with self.subTest(batch_size=batch_size), \
+                    mock.patch.object(WeatherService, 'BATCH_SIZE', batch_size):
+                self.stub.reset()
+                reset_caches()
+                forecasts = WeatherService.get_weather_forecasts(LOCATIONS)
+                self.assertEqual(self._requests(), math.ceil(len(LOCATIONS) / batch_size))
+                self.assertTrue(all(forecast is not None for forecast in forecasts))
+
+    def test_each_location_gets_its_own_forecast(self):
+        # Two spellings of the first location share a forecast and a request slot
+        points = LOCATIONS + [(10.001, 19.999)]
+        with mock.patch.object(WeatherService, 'BATCH_SIZE', 3):
+            forecasts = WeatherService.get_weather_forecasts(points)
+        self.assertEqual(self._requests(), 3)
+        self.assertEqual(
+            [(forecast.latitude, forecast.longitude) for forecast in forecasts],
+            [(float(latitude), float(longitude)) for latitude, longitude in LOCATIONS] + [(10.0, 20.0)]
+        )
+
+    def test_shorter_day_counts_are_cut_from_the_longest_fetch(self):
+        latitude, longitude = LOCATIONS[0]
+        points = [(latitude, longitude, days) for days in (3, 10, 7)] + [(*LOCATIONS[1], 5)]
+        forecasts = WeatherService.get_weather_forecasts(points, temperature_unit='celsius')
+        self.assertEqual(self._requests(), 1)
+        self.assertEqual([len(forecast) for forecast in forecasts], [3, 10, 7, 5])
+
+        longest = forecasts[1].to_api()['daily']
+        for forecast in (forecasts[0], forecasts[2]):
+            daily = forecast.to_api()['daily']
+            for name, values in daily.items():
+                self.assertEqual(values, longest[name][:len(values)], name)
+
+        # Every day count was cached, so asking again costs nothing
+        again = WeatherService.get_weather_forecasts(points, temperature_unit='celsius')
+        self.assertEqual(self._requests(), 1)
+        self.assertEqual([forecast.to_api() for forecast in again], [forecast.to_api() for forecast in forecasts])
+
+    def test_failed_batch_only_loses_its_own_locations(self):
+        calls = []
+        real = WeatherService._fetch_forecast_batch
+
+        def fetch(coordinates, api_days, temperature_unit):
+            calls.append(coordinates)
+            self.stub.status = 503 if len(calls) == 2 else 200
+            return real(coordinates, api_days, temperature_unit)
+
+        with mock.patch.object(WeatherService, 'BATCH_SIZE', 3), \
+                mock.patch.object(WeatherService, '_fetch_forecast_batch', side_effect=fetch):
+            forecasts = WeatherService.get_weather_forecasts(LOCATIONS)
+        self.assertEqual([forecast is None for forecast in forecasts], [False] * 3 + [True] * 3 + [False])
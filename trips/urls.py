@@ -1,22 +1,33 @@
 # trips/urls.py
 from django.urls import path
-from . import views
+from . import views, async_views
 
 urlpatterns = [
     path('', views.home, name='home'),
     path('key-features/', views.key_features, name='key_features'),
     path('user-stories/', views.user_stories, name='user_stories'),
     # Web views
+    path('trips/', views.trip_dashboard, name='trip_dashboard'),
     path('trips/<int:trip_id>/weather/', views.trip_weather_view, name='trip_weather'),
     # API endpoints can remain as is:
     path('api/trips/', views.TripListCreateAPIView.as_view(), name='api_trip_list'),
     path('api/trips/<int:pk>/', views.TripDetailAPIView.as_view(), name='api_trip_detail'),
+    path('api/trips/import/', views.import_trips, name='api_trip_import'),
+    path('api/trips/export.<str:file_format>', views.export_trips, name='api_trip_export'),
     path('api/key-features/', views.KeyFeatureListAPIView.as_view(), name='api_key_features'),
     path('api/user-stories/', views.UserStoryListAPIView.as_view(), name='api_user_stories'),
     path('api/signup/', views.signup, name='api_signup'),
     # Weather API endpoints:
+    path('api/trips/weather/', views.trips_weather_forecasts, name='trips_weather_forecasts'),
     path('api/trips/<int:trip_id>/weather/', views.trip_weather_forecast, name='trip_weather_forecast'),
     path('api/trips/<int:trip_id>/clothing-recommendations/', views.trip_clothing_recommendations, name='trip_clothing_recommendations'),
+    path('api/trips/<int:trip_id>/bundle/', views.trip_bundle, name='trip_bundle'),
     # City search API endpoint:
     path('api/cities/search/', views.search_cities, name='search_cities'),
+    # Outbound HTTP client metrics (admin only):
+    path('api/metrics/outbound/', views.outbound_metrics, name='outbound_metrics'),
+    # Async versions of the endpoints that wait on Open-Meteo (for ASGI deployments):
+    path('api/async/trips/<int:trip_id>/weather/', async_views.trip_weather_forecast, name='async_trip_weather_forecast'),
+    path('api/async/trips/<int:trip_id>/clothing-recommendations/', async_views.trip_clothing_recommendations, name='async_trip_clothing_recommendations'),
+    path('api/async/cities/search/', async_views.search_cities, name='async_search_cities'),
 ]
@@ -3,24 +3,81 @@ from django.shortcuts import render
 from django.http import HttpResponse
 from rest_framework import generics
 from .models import Trip, KeyFeature, UserStory, Profile
-from .serializers import TripSerializer, KeyFeatureSerializer, UserStorySerializer
+from .serializers import TripSerializer, KeyFeatureSerializer, UserStorySerializer, requested_fields
+from .pagination import TripCursorPagination
 import json
 from django.contrib.auth.models import User
-from django.http import JsonResponse
+from django.http import JsonResponse, StreamingHttpResponse
 from django.views.decorators.csrf import csrf_exempt
-from rest_framework.permissions import IsAuthenticated, AllowAny
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAuthenticated, AllowAny, IsAdminUser
+from rest_framework.decorators import api_view, parser_classes, permission_classes
 from rest_framework.response import Response
 from rest_framework import status
-from .services.weather_service import WeatherService
+from .services import bulk_trips, gazetteer, http_client
+from .services.weather_service import WeatherService, FORECAST_CACHE
 from .services.geocoding_service import GeocodingService
-from datetime import datetime
+from datetime import date
+import hashlib
+from django.conf import settings
+from django.contrib.auth.decorators import login_required
+from django.core.paginator import Paginator
+from django.utils.functional import cached_property
+from django.utils import timezone
+from django.db.models import Count, Max
+from .conditional import (
+    SEARCH_CACHE_CONTROL, WEATHER_CACHE_CONTROL, add_validators, make_etag, not_modified, timestamp
+)
+from .query_budget import query_budget
+
+# Trips per page on the server-rendered dashboard
+DASHBOARD_PAGE_SIZE = getattr(settings, 'DASHBOARD_PAGE_SIZE', 20)
+
+# Queries each HTML view may run (see query_budget)
+DASHBOARD_QUERY_BUDGET = 3
+TRIP_WEATHER_QUERY_BUDGET = 1
+
+# Rendered weather fragments are keyed on the forecast fingerprint, so they
+# can live as long as the cache keeps them
+WEATHER_FRAGMENT_TTL = getattr(settings, 'WEATHER_FRAGMENT_TTL', 24 * 3600)
+WEATHER_FRAGMENT_CACHE = getattr(settings, 'WEATHER_CACHE_ALIAS', None) or 'default'
 
 # API Views (for JSON endpoints)
-class TripListCreateAPIView(generics.ListCreateAPIView):
-    queryset = Trip.objects.all()
+class UserTripsMixin:
+    """Restricts trip API views to the requesting user's trips"""
+
+    def get_queryset(self):
+        return Trip.objects.filter(user=self.request.user)
+
+class TripListCreateAPIView(UserTripsMixin, generics.ListCreateAPIView):
     serializer_class = TripSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = TripCursorPagination
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        requested = requested_fields(self.request)
+        if requested:
+            # Only load the requested columns (plus what the cursor needs)
+            columns = {field.name for field in Trip._meta.concrete_fields} & requested
+            queryset = queryset.only('id', 'travel_start', *columns)
+        return queryset
+
+    def list(self, request, *args, **kwargs):
+        # Revalidate against the user's newest trip version (and trip count,
+        # which catches deletions) before loading or serializing any trips
+        version = Trip.objects.filter(user=request.user).aggregate(
+            count=Count('id'), latest=Max('updated_at'), recommended=Max('recommendations_updated_at')
+        )
+        etag = make_etag(
+            'trips', request.user.pk, version['count'],
+            version['latest'].isoformat() if version['latest'] else None,
+            version['recommended'].isoformat() if version['recommended'] else None,
+            request.get_full_path()
+        )
+        response = not_modified(request, etag)
+        if response is not None:
+            return response
+        return add_validators(super().list(request, *args, **kwargs), etag)
 
     def perform_create(self, serializer):
         # Check if coordinates are provided from frontend
@@ -40,11 +97,20 @@ class TripListCreateAPIView(generics.ListCreateAPIView):
                 longitude=longitude
             )
 
-class TripDetailAPIView(generics.RetrieveUpdateDestroyAPIView):
-    queryset = Trip.objects.all()
+class TripDetailAPIView(UserTripsMixin, generics.RetrieveUpdateDestroyAPIView):
     serializer_class = TripSerializer
     permission_classes = [IsAuthenticated]
 
+    def retrieve(self, request, *args, **kwargs):
+        trip = self.get_object()
+        etag = make_etag('trip', trip.pk, trip.updated_at.isoformat(), trip.recommendations_fingerprint,
+                         request.get_full_path())
+        last_modified = timestamp(max(filter(None, (trip.updated_at, trip.recommendations_updated_at))))
+        response = not_modified(request, etag, last_modified)
+        if response is not None:
+            return response
+        return add_validators(Response(self.get_serializer(trip).data), etag, last_modified)
+
     def perform_update(self, serializer):
         # Check if latitude and longitude are provided directly
         latitude = serializer.validated_data.get('latitude')
@@ -87,10 +153,48 @@ def user_stories(request):
     stories = UserStory.objects.all()
     return render(request, 'trips/user_stories.html', {'stories': stories})
 
+@login_required
+@query_budget(DASHBOARD_QUERY_BUDGET)
 def trip_dashboard(request):
-    from .models import Trip
-    trips = Trip.objects.all()
-    return render(request, 'trips/trip_dashboard.html', {'trips': trips})
+    """
+    Render the user's trips, a page at a time, with a weather summary for each
+    
+    The page costs a fixed number of queries (trip count, trip page and
+    traveler type) however many trips the user has. Forecasts for the page
+    are looked up in one batch and each trip's weather is rendered from a
+    fragment cached under its forecast fingerprint.
+    """
+    trips = (
+        Trip.objects.filter(user=request.user)
+        .only('id', 'destination', 'latitude', 'longitude', 'travel_start', 'travel_end')
+        .order_by('travel_start', 'id')
+    )
+    page = Paginator(trips, DASHBOARD_PAGE_SIZE).get_page(request.GET.get('page'))
+    is_business = traveler_is_business(request.user)
+    
+    located = [trip for trip in page if trip.latitude and trip.longitude]
+    forecasts = WeatherService.get_weather_forecasts(
+        [(trip.latitude, trip.longitude, trip_forecast_days(trip)) for trip in located],
+        temperature_unit="fahrenheit"
+    )
+    forecast_by_trip = dict(zip((trip.id for trip in located), forecasts))
+    
+    cards = []
+    for trip in page:
+        if trip.id not in forecast_by_trip:
+            cards.append(TripWeatherCard(trip, error='No location coordinates available for this destination.'))
+        elif forecast_by_trip[trip.id] is None:
+            cards.append(TripWeatherCard(trip, error='Unable to fetch weather data at this time.'))
+        else:
+            cards.append(TripWeatherCard(trip, forecast_by_trip[trip.id], is_business))
+    
+    return render(request, 'trips/trip_dashboard.html', {
+        'page': page,
+        'cards': cards,
+        'fragment_ttl': WEATHER_FRAGMENT_TTL,
+        'fragment_cache': WEATHER_FRAGMENT_CACHE,
+        'temperature_unit': 'F'
+    })
 
 
 @csrf_exempt
@@ -123,6 +227,144 @@ def signup(request):
     else:
         return JsonResponse({'error': 'Only POST method is allowed.'}, status=405)
 
+def traveler_is_business(user):
+    """Whether a user travels for business (casual if they have no profile)"""
+    try:
+        return user.profile.traveler_type == 'business'
+    except Profile.DoesNotExist:
+        return False
+
+class TripWeatherCard:
+    """
+    A trip's forecast prepared for the HTML templates
+    
+    Templates cache the rendered weather under `fingerprint`, which changes
+    whenever the forecast, the trip dates or the traveler type do; `current`
+    and `days` are only built when that fragment has to be rendered.
+    """
+    
+    def __init__(self, trip, forecast=None, is_business=False, error=None):
+        self.trip = trip
+        self.forecast = forecast
+        self.is_business = is_business
+        self.error = error
+    
+    @cached_property
+    def fingerprint(self):
+        inputs = (
+            WeatherService.forecast_fingerprint(self.forecast),
+            self.trip.travel_start.isoformat(),
+            self.trip.travel_end.isoformat(),
+            self.is_business,
+        )
+        return hashlib.blake2b(repr(inputs).encode(), digest_size=16).hexdigest()
+    
+    @cached_property
+    def current(self):
+        current_data = self.forecast.current_weather
+        if current_data is None:
+            return {}
+        return {
+            'temperature': current_data.get('temperature'),
+            'windspeed': current_data.get('windspeed'),
+            'conditions': 'Varied'  # Open-Meteo doesn't provide text conditions
+        }
+    
+    @cached_property
+    def trip_range(self):
+        """Indices of the forecast days that fall within the trip"""
+        return trip_day_range(self.forecast, self.trip)
+    
+    def _rows(self, selected):
+        """Forecast rows for a range of day indices"""
+        forecast = self.forecast
+        window = slice(selected.start, selected.stop)
+        trip_range = self.trip_range
+        return [
+            {
+                'date': date.fromordinal(ordinal),
+                'temp_max': temp_max,
+                'temp_min': temp_min,
+                'precipitation': precipitation,
+                'recommendations': recommendations,
+                'is_trip_day': index in trip_range
+            }
+            for index, ordinal, temp_max, temp_min, precipitation, recommendations in zip(
+                selected,
+                forecast.ordinals[window].tolist(),
+                forecast.values('temperature_2m_max')[window],
+                forecast.values('temperature_2m_min')[window],
+                forecast.values('precipitation_probability_max')[window],
+                WeatherService.clothing_advice(forecast, self.is_business)[window]
+            )
+        ]
+    
+    @cached_property
+    def days(self):
+        """Daily forecast rows with recommendations and trip-day flags"""
+        return self._rows(range(len(self.forecast)))
+    
+    @cached_property
+    def trip_days(self):
+        """Just the forecast rows that fall within the trip"""
+        if 'days' in self.__dict__:
+            return self.days[self.trip_range.start:self.trip_range.stop]
+        return self._rows(self.trip_range)
+
+def trip_forecast_days(trip):
+    """Number of forecast days to request for a trip"""
+    return WeatherService.forecast_days(trip.travel_start, trip.travel_end)
+
+def trip_day_range(forecast, trip):
+    """Indices of a forecast's days that fall within a trip (O(1), see Forecast.day_range)"""
+    return forecast.day_range(trip.travel_start, trip.travel_end)
+
+def trip_forecast_data(forecast, trip):
+    """
+    A trip's forecast in the API's JSON shape, with the days that fall
+    within the trip flagged
+    """
+    data = forecast.to_api()
+    data['trip_days'] = forecast.day_mask(trip.travel_start, trip.travel_end)
+    data['trip_start_date'] = trip.travel_start.isoformat()
+    data['trip_end_date'] = trip.travel_end.isoformat()
+    return data
+
+def refresh_recommendations(trip, forecast, is_business):
+    """
+    Bring a trip's stored clothing recommendations up to date
+    
+    Recommendations are only rebuilt when the forecast inputs or traveler
+    type changed since they were stored (see recommendations_fingerprint).
+    
+    Returns:
+        list: Names of the fields that changed and need saving (empty if the
+            stored recommendations are current)
+    """
+    fingerprint = WeatherService.recommendations_fingerprint(forecast, is_business)
+    if fingerprint and fingerprint == trip.recommendations_fingerprint:
+        return []
+    
+    trip.recommendations = WeatherService.get_clothing_recommendations(
+        forecast=forecast,
+        is_business=is_business
+    )
+    trip.recommendations_fingerprint = fingerprint
+    # Not updated_at: a new forecast doesn't make the trip itself a new version
+    trip.recommendations_updated_at = timezone.now()
+    return ['recommendations', 'recommendations_fingerprint', 'recommendations_updated_at']
+
+def weather_etag(trip, forecast):
+    """ETag for a trip's forecast response (see trips/conditional.py)"""
+    return make_etag(
+        'weather', trip.pk, trip.updated_at.isoformat(),
+        WeatherService.forecast_fingerprint(forecast), forecast.is_stale
+    )
+
+def recommendations_etag(trip):
+    """ETag for a trip's clothing recommendations, once they are up to date"""
+    return make_etag('recommendations', trip.pk, trip.updated_at.isoformat(), trip.recommendations_fingerprint)
+
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def trip_weather_forecast(request, trip_id):
@@ -137,19 +379,11 @@ def trip_weather_forecast(request, trip_id):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        # Calculate number of days to forecast (from travel start to end)
-        travel_start = trip.travel_start
-        travel_end = trip.travel_end
-        trip_days = (travel_end - travel_start).days + 1
-        
-        # Ensure we get at least 7 days, but cover the entire trip if longer
-        forecast_days = max(7, trip_days)
-            
         # Get weather data from Open-Meteo (in Fahrenheit)
         weather_data = WeatherService.get_weather_forecast(
             latitude=trip.latitude,
             longitude=trip.longitude,
-            days=forecast_days,
+            days=trip_forecast_days(trip),
             temperature_unit="fahrenheit"
         )
         
@@ -158,23 +392,17 @@ def trip_weather_forecast(request, trip_id):
                 {"error": "Unable to fetch weather data at this time."},
                 status=status.HTTP_503_SERVICE_UNAVAILABLE
             )
+        
+        # Answer revalidations before building the response
+        etag = weather_etag(trip, weather_data)
+        response = not_modified(request, etag, cache_control=WEATHER_CACHE_CONTROL)
+        if response is not None:
+            return response
             
-        # Highlight which days are part of the trip
-        if 'daily' in weather_data:
-            # Add a flag for whether each date is during the trip
-            is_trip_day = []
-            for date_str in weather_data['daily']['time']:
-                date = datetime.strptime(date_str, "%Y-%m-%d").date()
-                is_during_trip = travel_start <= date <= travel_end
-                is_trip_day.append(is_during_trip)
-            
-            # Add to the response
-            weather_data['trip_days'] = is_trip_day
-            weather_data['trip_start_date'] = travel_start.strftime("%Y-%m-%d")
-            weather_data['trip_end_date'] = travel_end.strftime("%Y-%m-%d")
-            
-        # Return the weather data
-        return Response(weather_data)
+        # Return the weather data, highlighting which days are part of the trip
+        return add_validators(
+            Response(trip_forecast_data(weather_data, trip)), etag, cache_control=WEATHER_CACHE_CONTROL
+        )
     
     except Trip.DoesNotExist:
         return Response(
@@ -182,6 +410,164 @@ def trip_weather_forecast(request, trip_id):
             status=status.HTTP_404_NOT_FOUND
         )
 
+# Parts of a trip bundle, selectable with ?include=
+BUNDLE_PARTS = ('trip', 'forecast', 'recommendations')
+
+def bundle_parts(request):
+    """
+    Bundle parts named in a request's `include` query parameter
+    
+    Returns:
+        tuple: Requested names from BUNDLE_PARTS, in that order (all of them
+            if the parameter is absent or empty)
+    """
+    requested = {name.strip() for name in request.query_params.get('include', '').split(',') if name.strip()}
+    return tuple(name for name in BUNDLE_PARTS if name in requested) or BUNDLE_PARTS
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def trip_bundle(request, trip_id):
+    """
+    Get a trip, its forecast and clothing recommendations in one request
+    
+    Loads the trip and its owner's profile in one query and fetches a single
+    forecast (in Fahrenheit, covering the trip), from which the trip-day flags
+    and the recommendations are derived. `?include=trip,forecast,recommendations`
+    selects the parts returned, and `?fields=` applies to the trip as it does
+    on /api/trips/<id>/. If the forecast isn't available, the trip is still
+    returned with an `error`.
+    """
+    try:
+        trip = Trip.objects.select_related('user__profile').get(pk=trip_id, user=request.user)
+    except Trip.DoesNotExist:
+        return Response(
+            {"error": "Trip not found or unauthorized."},
+            status=status.HTTP_404_NOT_FOUND
+        )
+    
+    parts = bundle_parts(request)
+    forecast = None
+    error = None
+    if 'forecast' in parts or 'recommendations' in parts:
+        if not trip.latitude or not trip.longitude:
+            error = "No location coordinates available for this destination."
+        else:
+            forecast = WeatherService.get_weather_forecast(
+                latitude=trip.latitude,
+                longitude=trip.longitude,
+                days=trip_forecast_days(trip),
+                temperature_unit="fahrenheit"
+            )
+            if not forecast:
+                error = "Unable to fetch weather data at this time."
+    
+    # Recommendations cover the bundle's (trip-length) forecast, so they are
+    # not stored: the trip's stored ones come from the 7-day forecast of
+    # /clothing-recommendations/, and storing both would rewrite the trip on
+    # alternate reads
+    is_business = traveler_is_business(trip.user)
+    
+    etag = make_etag(
+        'bundle', trip.pk, trip.updated_at.isoformat(),
+        WeatherService.recommendations_fingerprint(forecast, is_business) if 'recommendations' in parts else None,
+        WeatherService.forecast_fingerprint(forecast), forecast.is_stale if forecast else None,
+        error, request.get_full_path()
+    )
+    cache_control = WEATHER_CACHE_CONTROL if forecast else None
+    response = not_modified(request, etag, cache_control=cache_control)
+    if response is not None:
+        return response
+    
+    data = {}
+    if 'trip' in parts:
+        data['trip'] = TripSerializer(trip, context={'request': request}).data
+    if forecast and 'forecast' in parts:
+        data['forecast'] = trip_forecast_data(forecast, trip)
+    if forecast and 'recommendations' in parts:
+        data['recommendations'] = {
+            "traveler_type": "business" if is_business else "casual",
+            "recommendations": WeatherService.get_clothing_recommendations(forecast, is_business)
+        }
+    if error:
+        data['error'] = error
+    return add_validators(Response(data), etag, cache_control=cache_control)
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+@parser_classes([])  # The body is streamed, not parsed up front
+def import_trips(request):
+    """
+    Create trips in bulk from an NDJSON or CSV request body
+    
+    The format comes from the Content-Type (application/x-ndjson or
+    text/csv), or `?file_format=`. Rows are validated and written in chunks
+    (see services/bulk_trips.py); invalid rows are skipped and reported.
+    """
+    file_format = request.GET.get('file_format') or bulk_trips.format_for(request.content_type)
+    lines = request.stream if request.stream is not None else []
+    try:
+        result = bulk_trips.import_trips(request.user, lines, file_format)
+    except bulk_trips.ImportFormatError as e:
+        return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    
+    if result['created']:
+        result_status = status.HTTP_201_CREATED
+    elif result['failed']:
+        result_status = status.HTTP_400_BAD_REQUEST
+    else:
+        result_status = status.HTTP_200_OK
+    return Response(result, status=result_status)
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def export_trips(request, file_format):
+    """Stream all of the user's trips as NDJSON or CSV (export.ndjson / export.csv)"""
+    if file_format not in bulk_trips.FORMATS:
+        return Response(
+            {"error": f"Unknown export format. Use one of: {', '.join(bulk_trips.FORMATS)}."},
+            status=status.HTTP_404_NOT_FOUND
+        )
+    
+    response = StreamingHttpResponse(
+        bulk_trips.export_trips(request.user, file_format),
+        content_type=bulk_trips.CONTENT_TYPES[file_format]
+    )
+    response['Content-Disposition'] = f'attachment; filename="trips.{file_format}"'
+    return response
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def trips_weather_forecasts(request):
+    """Get weather forecasts for all of the user's trips in one request"""
+    trips = list(
+        Trip.objects.filter(user=request.user)
+        .only('id', 'destination', 'latitude', 'longitude', 'travel_start', 'travel_end')
+    )
+    located = [trip for trip in trips if trip.latitude and trip.longitude]
+    
+    # Fetch every destination at once; Open-Meteo takes lists of coordinates
+    forecasts = WeatherService.get_weather_forecasts(
+        [(trip.latitude, trip.longitude, trip_forecast_days(trip)) for trip in located],
+        temperature_unit="fahrenheit"
+    )
+    forecast_by_trip = dict(zip((trip.id for trip in located), forecasts))
+    
+    results = []
+    for trip in trips:
+        entry = {"trip_id": trip.id, "destination": trip.destination}
+        if trip.id not in forecast_by_trip:
+            entry["error"] = "No location coordinates available for this destination."
+        elif forecast_by_trip[trip.id] is None:
+            entry["error"] = "Unable to fetch weather data at this time."
+        else:
+            entry["forecast"] = trip_forecast_data(forecast_by_trip[trip.id], trip)
+        results.append(entry)
+    
+    return Response({
+        "count": len(results),
+        "trips": results
+    })
+
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def trip_clothing_recommendations(request, trip_id):
@@ -197,12 +583,7 @@ def trip_clothing_recommendations(request, trip_id):
             )
             
         # Get user's traveler type
-        try:
-            profile = request.user.profile
-            is_business = profile.traveler_type == 'business'
-        except Profile.DoesNotExist:
-            # Default to casual traveler if no profile
-            is_business = False
+        is_business = traveler_is_business(request.user)
             
         # Get weather data
         weather_data = WeatherService.get_weather_forecast(
@@ -216,20 +597,21 @@ def trip_clothing_recommendations(request, trip_id):
                 status=status.HTTP_503_SERVICE_UNAVAILABLE
             )
             
-        # Generate clothing recommendations
-        recommendations = WeatherService.get_clothing_recommendations(
-            weather_data=weather_data,
-            is_business=is_business
-        )
+        # Regenerate clothing recommendations only if the forecast changed,
+        # so steady-state reads don't write to the database
+        changed_fields = refresh_recommendations(trip, weather_data, is_business)
+        if changed_fields:
+            trip.save(update_fields=changed_fields)
         
-        # Update trip with recommendations
-        trip.recommendations = recommendations
-        trip.save()
+        etag = recommendations_etag(trip)
+        response = not_modified(request, etag, cache_control=WEATHER_CACHE_CONTROL)
+        if response is not None:
+            return response
         
-        return Response({
+        return add_validators(Response({
             "traveler_type": "business" if is_business else "casual",
-            "recommendations": recommendations
-        })
+            "recommendations": trip.recommendations
+        }), etag, cache_control=WEATHER_CACHE_CONTROL)
         
     except Trip.DoesNotExist:
         return Response(
@@ -237,92 +619,77 @@ def trip_clothing_recommendations(request, trip_id):
             status=status.HTTP_404_NOT_FOUND
         )
 
+@login_required
+@query_budget(TRIP_WEATHER_QUERY_BUDGET)
 def trip_weather_view(request, trip_id):
     """
     View to render the weather forecast template for a trip
+    
+    The trip and its owner's profile are loaded in one query; the forecast
+    and recommendations are only turned into HTML when the cached fragment
+    for the current forecast is missing.
     """
     try:
-        trip = Trip.objects.get(pk=trip_id, user=request.user)
-        
-        # Check if we have coordinates
-        if not trip.latitude or not trip.longitude:
-            return render(request, 'trips/trip_weather.html', {
-                'trip': trip,
-                'error': 'No location coordinates available for this destination.'
-            })
-        
-        # Calculate number of days to forecast (from travel start to end)
-        travel_start = trip.travel_start
-        travel_end = trip.travel_end
-        trip_days = (travel_end - travel_start).days + 1
-        
-        # Ensure we get at least 7 days, but cover the entire trip if longer
-        forecast_days = max(7, trip_days)
-            
-        # Get weather data
-        weather_data = WeatherService.get_weather_forecast(
-            latitude=trip.latitude,
-            longitude=trip.longitude,
-            days=forecast_days,
-            temperature_unit="fahrenheit"
-        )
-        
-        if not weather_data:
-            return render(request, 'trips/trip_weather.html', {
-                'trip': trip,
-                'error': 'Unable to fetch weather data at this time.'
-            })
-            
-        # Get user's traveler type for recommendations
-        try:
-            profile = request.user.profile
-            is_business = profile.traveler_type == 'business'
-        except Profile.DoesNotExist:
-            is_business = False
-            
-        # Generate clothing recommendations
-        recommendations = WeatherService.get_clothing_recommendations(
-            weather_data=weather_data,
-            is_business=is_business
-        )
-        
-        # Extract and format the data for the template
-        current = {}
-        if 'current_weather' in weather_data:
-            current_data = weather_data['current_weather']
-            current = {
-                'temperature': current_data.get('temperature'),
-                'windspeed': current_data.get('windspeed'),
-                'conditions': 'Varied'  # Open-Meteo doesn't provide text conditions
-            }
-            
-        # Format daily forecast
-        forecast = []
-        if 'daily' in weather_data:
-            daily = weather_data['daily']
-            for i, date in enumerate(daily['time']):
-                date_obj = datetime.strptime(date, "%Y-%m-%d").date()
-                is_during_trip = trip.travel_start <= date_obj <= trip.travel_end
-                
-                day_data = {
-                    'date': date,
-                    'temp_max': daily['temperature_2m_max'][i],
-                    'temp_min': daily['temperature_2m_min'][i],
-                    'precipitation': daily['precipitation_probability_max'][i],
-                    'recommendations': recommendations.get(date, []),
-                    'is_trip_day': is_during_trip
-                }
-                forecast.append(day_data)
-                
-        return render(request, 'trips/trip_weather.html', {
-            'trip': trip,
-            'current': current,
-            'forecast': forecast,
-            'temperature_unit': 'F'  # Indicate Fahrenheit
-        })
-        
+        trip = Trip.objects.select_related('user__profile').get(pk=trip_id, user=request.user)
     except Trip.DoesNotExist:
         return HttpResponse("Trip not found or unauthorized.", status=404)
+    
+    context = {
+        'trip': trip,
+        'fragment_ttl': WEATHER_FRAGMENT_TTL,
+        'fragment_cache': WEATHER_FRAGMENT_CACHE,
+        'temperature_unit': 'F'  # Indicate Fahrenheit
+    }
+    
+    # Check if we have coordinates
+    if not trip.latitude or not trip.longitude:
+        context['error'] = 'No location coordinates available for this destination.'
+        return render(request, 'trips/trip_weather.html', context)
+    
+    # Get weather data
+    weather_data = WeatherService.get_weather_forecast(
+        latitude=trip.latitude,
+        longitude=trip.longitude,
+        days=trip_forecast_days(trip),
+        temperature_unit="fahrenheit"
+    )
+    
+    if not weather_data:
+        context['error'] = 'Unable to fetch weather data at this time.'
+        return render(request, 'trips/trip_weather.html', context)
+    
+    context['card'] = TripWeatherCard(trip, weather_data, traveler_is_business(trip.user))
+    return render(request, 'trips/trip_weather.html', context)
+
+def search_limit(request):
+    """Get the number of city search results to return (default: 10)"""
+    limit = request.GET.get('limit', 10)
+    try:
+        limit = int(limit)
+        if limit < 1 or limit > 50:
+            limit = 10  # Reset to default if outside range
+    except ValueError:
+        limit = 10
+    return limit
+
+def search_etag(query, limit):
+    """
+    ETag for city search results, known before searching: results only
+    change with the query, the limit and the installed gazetteer
+    """
+    return make_etag('cities', query, limit, gazetteer.file_version())
+
+def search_validators(response, etag, cities):
+    """
+    Tag city search results with their ETag and (public) Cache-Control
+    
+    Empty results may be an upstream failure rather than a real answer, so
+    they are neither validated nor cached.
+    """
+    if not cities:
+        return response
+    # Results don't depend on the user, so shared caches may keep them too
+    return add_validators(response, etag, cache_control=SEARCH_CACHE_CONTROL)
 
 @api_view(['GET'])
 @permission_classes([AllowAny])  # Allow any user to search cities
@@ -337,20 +704,27 @@ def search_cities(request):
             status=status.HTTP_400_BAD_REQUEST
         )
         
-    # Get the number of results to return (default: 10)
-    limit = request.GET.get('limit', 10)
-    try:
-        limit = int(limit)
-        if limit < 1 or limit > 50:
-            limit = 10  # Reset to default if outside range
-    except ValueError:
-        limit = 10
+    # Revalidations are answered before searching
+    limit = search_limit(request)
+    etag = search_etag(query, limit)
+    response = not_modified(request, etag, cache_control=SEARCH_CACHE_CONTROL)
+    if response is not None:
+        return response
     
     # Search for cities
     cities = GeocodingService.search_cities(query, limit)
     
-    return Response({
+    return search_validators(Response({
         "query": query,
         "count": len(cities),
         "cities": cities
+    }), etag, cities)
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def outbound_metrics(request):
+    """Connection pool, circuit breaker and forecast cache state for each upstream host"""
+    return Response({
+        "hosts": http_client.metrics(),
+        "forecast_cache": FORECAST_CACHE.stats()
     })